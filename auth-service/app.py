@@ -1,35 +1,55 @@
-from flask import Flask, session
-from controllers.auth_controller import auth_bp
 from dotenv import load_dotenv
+
+# Carrega as variáveis de ambiente do arquivo .env antes dos demais imports:
+# vários módulos leem a configuração (os.getenv) ao serem importados
+load_dotenv()
+
+from flask import Flask, session, jsonify
+from controllers.auth_controller import auth_bp
+from config.database import init_indexes, get_pool_stats
+from config.compression import init_compression
+from config.json_provider import init_json
 from flask import redirect, url_for
 
 import os
 
-# Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
+def create_app():
+    """Cria e configura a aplicação Flask do auth-service"""
+    app = Flask(__name__)
 
-# Cria a instância da aplicação Flask
-app = Flask(__name__)
+    # Define a chave secreta para a sessão
+    app.secret_key = os.getenv("SECRET_KEY")
+    if not app.secret_key:
+        print("⚠️ SECRET_KEY não definida: as sessões de login não vão funcionar")
 
-secret_key = os.getenv("SECRET_KEY")
+    # Registra o blueprint de autenticação
+    app.register_blueprint(auth_bp, url_prefix='/auth')
 
-print(f"SECRET_KEY carregada: {secret_key}")  # DEBUG: deve imprimir o valor correto
+    # jsonify/get_json com orjson (datetime e ObjectId codificados nativamente)
+    init_json(app)
 
+    # Compressão gzip/brotli das respostas e cache de longa duração dos arquivos estáticos
+    init_compression(app)
 
+    # Garante os índices do MongoDB usados pelas consultas do serviço (idempotente)
+    init_indexes()
 
-#Define a chave secreta para a sessão
-app.secret_key = os.getenv("SECRET_KEY")
+    # Estatísticas do pool de conexões do MongoDB do processo que atendeu a requisição
+    @app.route('/health/db')
+    def db_health():
+        return jsonify(get_pool_stats())
 
+    # Redireciona a rota raiz para a página de login
+    @app.route('/')
+    def index():
+        return redirect(url_for('auth.login_page'))
 
-# Registra o blueprint de autenticação
-app.register_blueprint(auth_bp, url_prefix='/auth')
+    return app
 
-# Redireciona a rota raiz para a página de login
-@app.route('/')
-def index():
-    return redirect(url_for('auth.login_page'))
+# Instância usada pelo gunicorn (app:app) e pelo servidor de desenvolvimento
+app = create_app()
 
 if __name__ == '__main__':
-    # Executa a aplicação Flask
-    app.run(host="0.0.0.0", port=5000, debug=True)
-    # O debug=True permite recarregar automaticamente a aplicação ao fazer alterações no código
\ No newline at end of file
+    # Servidor de desenvolvimento do Flask; em produção use: gunicorn -c gunicorn.conf.py app:app
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5000")), debug=os.getenv("FLASK_DEBUG", "1") == "1")
+    # O debug recarrega automaticamente a aplicação ao fazer alterações no código
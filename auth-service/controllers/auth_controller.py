@@ -1,6 +1,8 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
 from services.auth_service import login_user
 from models.user_model import serialize_user
+from config.auth import JWT_TTL
+from config.passwords import PasswordBusyError
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -11,7 +13,11 @@ def login_page():
 @auth_bp.route("/login", methods=["POST"])
 def login():
     data = request.form
-    user = login_user(data["email"], data["password"])
+    try:
+        user = login_user(data["email"], data["password"])
+    except PasswordBusyError:
+        flash("Muitas tentativas de login no momento. Tente novamente em instantes.")
+        return redirect(url_for("auth.login_page"))
     if not user:
         flash("Credenciais inválidas")
         return redirect(url_for("auth.login_page"))
@@ -19,6 +25,18 @@ def login():
     session["user"] = serialize_user(user)
     return redirect(url_for("auth.dashboard"))
 
+@auth_bp.route("/api/token", methods=["POST"])
+def api_token():
+    """Emite um token JWT (Bearer) para as APIs dos outros serviços"""
+    data = request.get_json(silent=True) or {}
+    try:
+        user = login_user(data.get("email", ""), data.get("password", ""))
+    except PasswordBusyError:
+        return jsonify({"error": "Muitas tentativas de login no momento"}), 503, {"Retry-After": "1"}
+    if not user:
+        return jsonify({"error": "Credenciais inválidas"}), 401
+    return jsonify({"token": user["token"], "token_type": "Bearer", "expires_in": JWT_TTL})
+
 @auth_bp.route("/register", methods=["GET"])
 def register_page():
     # Redirect to user-service for user creation
@@ -1,14 +1,32 @@
-from werkzeug.security import check_password_hash
 from config.database import get_db
+from config.passwords import verify_password_bounded, needs_rehash, hash_password, submit, PasswordBusyError
+from pymongo.errors import PyMongoError
 from utils.jwt_handler import generate_token
 
 db = get_db()
 users_col = db["users"]
 
+def rehash_password(user, password):
+    """Regrava o hash com a política atual (só se a senha não mudou nesse meio tempo)"""
+    try:
+        users_col.update_one(
+            {"_id": user["_id"], "password": user["password"]},
+            {"$set": {"password": hash_password(password)}}
+        )
+    except PyMongoError as e:
+        print(f"⚠️ Não foi possível atualizar o hash da senha de {user['email']}: {e}")
+
 def login_user(email, password):
+    """Valida as credenciais; levanta PasswordBusyError se o pool de senhas estiver saturado"""
     user = users_col.find_one({"email": email})
-    if not user or not check_password_hash(user["password"], password):
+    if not user or not verify_password_bounded(user["password"], password):
         return None
+    if needs_rehash(user["password"]):
+        # Hash de uma política antiga: refeito em segundo plano, sem atrasar o login
+        try:
+            submit(rehash_password, user, password)
+        except PasswordBusyError:
+            pass  # fica para o próximo login
     token = generate_token(user["email"], user["role"])
     # Retorna token e os dados do usuário para a sessão
     return {
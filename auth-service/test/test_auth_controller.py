@@ -2,6 +2,7 @@
 from unittest.mock import patch, MagicMock
 from flask import Flask
 from controllers.auth_controller import auth_bp
+from config.passwords import PasswordBusyError
 
 @pytest.fixture
 def app():
@@ -99,3 +100,37 @@ class TestAuthController:
 
         with client.session_transaction() as sess:
             assert 'user' not in sess
+
+    @patch('controllers.auth_controller.login_user')
+    def test_api_token(self, mock_login, client):
+        mock_login.return_value = {'email': 'teste@email.com', 'role': 'cliente', 'token': 'fake_token'}
+
+        response = client.post('/auth/api/token', json={'email': 'teste@email.com', 'password': '123'})
+
+        assert response.status_code == 200
+        assert response.json['token'] == 'fake_token'
+        assert response.json['token_type'] == 'Bearer'
+        mock_login.assert_called_once_with('teste@email.com', '123')
+
+    @patch('controllers.auth_controller.login_user')
+    def test_api_token_invalid_credentials(self, mock_login, client):
+        mock_login.return_value = None
+
+        response = client.post('/auth/api/token', json={'email': 'teste@email.com', 'password': 'errada'})
+
+        assert response.status_code == 401
+
+    @patch('controllers.auth_controller.login_user', side_effect=PasswordBusyError)
+    def test_api_token_busy(self, mock_login, client):
+        response = client.post('/auth/api/token', json={'email': 'teste@email.com', 'password': '123'})
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+    @patch('controllers.auth_controller.login_user', side_effect=PasswordBusyError)
+    def test_login_post_busy(self, mock_login, client):
+        response = client.post('/auth/login', data={'email': 'teste@email.com', 'password': '123'})
+
+        assert response.status_code == 302
+        assert response.headers['Location'].endswith('/auth/login')
+
@@ -1,6 +1,8 @@
 ﻿import pytest
 from unittest.mock import patch, MagicMock
-from services.auth_service import login_user
+from services.auth_service import login_user, rehash_password
+from config.passwords import PasswordBusyError
+from pymongo.errors import PyMongoError
 
 @pytest.fixture
 def mock_users_col():
@@ -9,12 +11,12 @@ def mock_users_col():
 
 class TestAuthService:
 
-    @patch('services.auth_service.check_password_hash')
+    @patch('services.auth_service.verify_password_bounded')
     @patch('services.auth_service.generate_token')
     def test_login_user_success(self, mock_generate_token, mock_check_password, mock_users_col):
         mock_users_col.find_one.return_value = {
             'email': 'teste@email.com',
-            'password': 'hashed_password',
+            'password': 'scrypt:32768:8:1$salt$hash',
             'name': 'João Silva',
             'address': 'Rua Teste, 123',
             'role': 'cliente'
@@ -37,7 +39,7 @@ class TestAuthService:
 
         assert result is None
 
-    @patch('services.auth_service.check_password_hash')
+    @patch('services.auth_service.verify_password_bounded')
     def test_login_user_wrong_password(self, mock_check_password, mock_users_col):
         mock_users_col.find_one.return_value = {
             'email': 'teste@email.com',
@@ -49,3 +51,62 @@ class TestAuthService:
         result = login_user('teste@email.com', 'senha_errada')
 
         assert result is None
+
+    @patch('services.auth_service.submit')
+    @patch('services.auth_service.verify_password_bounded', return_value=True)
+    @patch('services.auth_service.generate_token', return_value='fake_token_123')
+    def test_login_current_hash_not_rehashed(self, mock_generate_token, mock_verify, mock_submit, mock_users_col):
+        mock_users_col.find_one.return_value = {'email': 'teste@email.com', 'role': 'cliente',
+                                                'password': 'scrypt:32768:8:1$salt$hash'}
+
+        login_user('teste@email.com', 'senha123')
+
+        mock_submit.assert_not_called()
+
+    @patch('services.auth_service.submit')
+    @patch('services.auth_service.verify_password_bounded', return_value=True)
+    @patch('services.auth_service.generate_token', return_value='fake_token_123')
+    def test_login_outdated_hash_rehashed(self, mock_generate_token, mock_verify, mock_submit, mock_users_col):
+        user = {'_id': 'u1', 'email': 'teste@email.com', 'role': 'cliente', 'password': 'pbkdf2:sha256:260000$salt$hash'}
+        mock_users_col.find_one.return_value = user
+
+        result = login_user('teste@email.com', 'senha123')
+
+        assert result['token'] == 'fake_token_123'
+        mock_submit.assert_called_once_with(rehash_password, user, 'senha123')
+
+    @patch('services.auth_service.submit', side_effect=PasswordBusyError)
+    @patch('services.auth_service.verify_password_bounded', return_value=True)
+    @patch('services.auth_service.generate_token', return_value='fake_token_123')
+    def test_login_rehash_skipped_when_busy(self, mock_generate_token, mock_verify, mock_submit, mock_users_col):
+        mock_users_col.find_one.return_value = {'email': 'teste@email.com', 'role': 'cliente',
+                                                'password': 'pbkdf2:sha256:260000$salt$hash'}
+
+        assert login_user('teste@email.com', 'senha123') is not None
+
+    @patch('services.auth_service.verify_password_bounded', side_effect=PasswordBusyError)
+    def test_login_busy(self, mock_verify, mock_users_col):
+        mock_users_col.find_one.return_value = {'email': 'teste@email.com', 'role': 'cliente', 'password': 'x'}
+
+        with pytest.raises(PasswordBusyError):
+            login_user('teste@email.com', 'senha123')
+
+    @patch('services.auth_service.hash_password', return_value='scrypt:32768:8:1$novo$hash')
+    def test_rehash_password(self, mock_hash, mock_users_col):
+        user = {'_id': 'u1', 'email': 'teste@email.com', 'password': 'pbkdf2:sha256:260000$salt$hash'}
+
+        rehash_password(user, 'senha123')
+
+        # Só substitui se o hash gravado ainda for o antigo
+        mock_users_col.update_one.assert_called_once_with(
+            {'_id': 'u1', 'password': 'pbkdf2:sha256:260000$salt$hash'},
+            {'$set': {'password': 'scrypt:32768:8:1$novo$hash'}}
+        )
+
+    def test_rehash_password_database_error(self, mock_users_col):
+        mock_users_col.update_one.side_effect = PyMongoError('down')
+        user = {'_id': 'u1', 'email': 'teste@email.com', 'password': 'pbkdf2:sha256:1$salt$hash'}
+
+        with patch('services.auth_service.hash_password', return_value='novo'):
+            rehash_password(user, 'senha123')
+
@@ -5,6 +5,9 @@ from unittest.mock import patch, MagicMock
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__))))
 
+from config import database
+from config.database import get_client, get_db, client_options, get_pool_stats, LazyCollection
+
 def test_get_db():
 
     with patch("pymongo.MongoClient") as mock_client:
@@ -17,3 +20,72 @@ def test_get_db():
             db_instance = get_db()
             assert db_instance is not None
 
+@pytest.fixture
+def mock_mongo_client():
+    with patch('config.database.MongoClient') as mock:
+        database._reset_after_fork()
+        yield mock
+    database._reset_after_fork()
+
+class TestDatabase:
+
+    def test_client_is_created_once_per_process(self, mock_mongo_client):
+        first = get_client()
+        second = get_client()
+
+        assert first is second
+        mock_mongo_client.assert_called_once()
+        assert mock_mongo_client.call_args.kwargs['event_listeners'] == [database.pool_stats]
+
+    def test_new_client_after_fork(self, mock_mongo_client):
+        get_client()
+
+        with patch('config.database.os.getpid', return_value=os.getpid() + 1):
+            get_client()
+
+        assert mock_mongo_client.call_count == 2
+
+    def test_get_db_returns_lazy_collections(self, mock_mongo_client):
+        orders = get_db()['orders']
+
+        assert isinstance(orders, LazyCollection)
+        mock_mongo_client.assert_not_called()
+
+        orders.find_one({'_id': 1})
+
+        mock_mongo_client.return_value['burguer_app_db']['orders'].find_one.assert_called_once_with({'_id': 1})
+
+    def test_client_options_from_env(self):
+        env = {'MONGO_URI': 'mongodb://mongo:27017', 'MONGO_MAX_POOL_SIZE': '200',
+               'MONGO_READ_PREFERENCE': 'secondaryPreferred', 'MONGO_WRITE_CONCERN': 'majority'}
+        with patch.dict(os.environ, env):
+            options = client_options()
+
+        assert options['maxPoolSize'] == 200
+        assert options['readPreference'] == 'secondaryPreferred'
+        assert options['w'] == 'majority'
+        assert options['waitQueueTimeoutMS'] == 2000
+
+    def test_uri_options_take_precedence_over_defaults(self):
+        with patch.dict(os.environ, {'MONGO_URI': 'mongodb://mongo:27017/?maxPoolSize=5'}):
+            options = client_options()
+
+        assert 'maxPoolSize' not in options
+
+    def test_pool_stats(self):
+        stats = database.PoolStats()
+        event = MagicMock()
+
+        stats.connection_created(event)
+        stats.connection_checked_out(event)
+        stats.connection_checked_out(event)
+        stats.connection_checked_in(event)
+        stats.connection_check_out_failed(event)
+
+        snapshot = stats.snapshot()
+        assert snapshot['created'] == 1
+        assert snapshot['checkouts'] == 2
+        assert snapshot['checked_out'] == 1
+        assert snapshot['max_checked_out'] == 2
+        assert snapshot['checkout_failures'] == 1
+        assert 'pid' in get_pool_stats()
@@ -2,18 +2,25 @@
 from unittest.mock import patch
 import jwt
 import datetime
+from config import auth
 from utils.jwt_handler import generate_token, decode_token
 
+@pytest.fixture(autouse=True)
+def jwt_keys():
+    with patch.object(auth, 'JWT_KEYS', {'default': 'test-secret'}), patch.object(auth, 'ACTIVE_KID', 'default'):
+        auth.clear_token_cache()
+        yield
+    auth.clear_token_cache()
+
 class TestJWTHandler:
 
-    @patch('utils.jwt_handler.SECRET', 'test-secret')
     def test_generate_token(self):
         token = generate_token('teste@email.com', 'cliente')
 
         assert token is not None
         assert isinstance(token, str)
+        assert jwt.get_unverified_header(token)['kid'] == 'default'
 
-    @patch('utils.jwt_handler.SECRET', 'test-secret')
     def test_decode_token_valid(self):
         token = generate_token('teste@email.com', 'admin')
         decoded = decode_token(token)
@@ -22,7 +29,6 @@ class TestJWTHandler:
         assert decoded['email'] == 'teste@email.com'
         assert decoded['role'] == 'admin'
 
-    @patch('utils.jwt_handler.SECRET', 'test-secret')
     def test_decode_token_expired(self):
         # Create an expired token
         payload = {
@@ -35,3 +41,11 @@ class TestJWTHandler:
         decoded = decode_token(expired_token)
 
         assert decoded is None
+
+    def test_decode_token_invalid_signature(self):
+        payload = {'email': 'teste@email.com', 'role': 'admin',
+                   'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)}
+        forged_token = jwt.encode(payload, 'other-secret', algorithm='HS256')
+
+        assert decode_token(forged_token) is None
+        assert decode_token('not-a-token') is None
@@ -0,0 +1,74 @@
+import threading
+import pytest
+from unittest.mock import patch
+from config import passwords
+from config.passwords import (
+    hash_password, verify_password, needs_rehash, current_method, submit, run_bounded,
+    verify_password_bounded, PasswordBusyError
+)
+
+@pytest.fixture(autouse=True)
+def cheap_policy():
+    # Custos baixos para os testes rodarem rápido
+    with patch.object(passwords, 'SCRYPT_N', 1024), patch.object(passwords, 'PBKDF2_ITERATIONS', 1000):
+        yield
+
+class TestPasswords:
+
+    def test_scrypt_roundtrip(self):
+        stored = hash_password('senha123')
+
+        assert stored.startswith('scrypt:1024:8:1$')
+        assert verify_password(stored, 'senha123')
+        assert not verify_password(stored, 'senha124')
+        assert not needs_rehash(stored)
+
+    def test_pbkdf2_policy(self):
+        with patch.object(passwords, 'PASSWORD_HASH_ALGORITHM', 'pbkdf2'):
+            stored = hash_password('senha123')
+
+            assert stored.startswith('pbkdf2:sha256:1000$')
+            assert verify_password(stored, 'senha123')
+
+    def test_needs_rehash_on_policy_change(self):
+        stored = hash_password('senha123')
+
+        with patch.object(passwords, 'SCRYPT_N', 2048):
+            assert needs_rehash(stored)
+            # O hash antigo continua válido até ser refeito
+            assert verify_password(stored, 'senha123')
+        with patch.object(passwords, 'PASSWORD_HASH_ALGORITHM', 'pbkdf2'):
+            assert needs_rehash(stored)
+
+    def test_argon2_falls_back_without_package(self):
+        with patch.object(passwords, 'PASSWORD_HASH_ALGORITHM', 'argon2'), patch.object(passwords, 'PasswordHasher', None):
+            assert current_method() == 'scrypt:1024:8:1'
+            assert not verify_password('$argon2id$v=19$m=65536,t=3,p=1$c2FsdA$aGFzaA', 'senha123')
+
+    def test_verify_invalid_hash(self):
+        assert not verify_password('texto-puro', 'senha123')
+        assert not verify_password('', 'senha123')
+        assert not verify_password(hash_password('senha123'), '')
+
+    def test_verify_bounded(self):
+        stored = hash_password('senha123')
+
+        assert verify_password_bounded(stored, 'senha123')
+
+    def test_pool_rejects_when_full(self):
+        release = threading.Event()
+        with patch.object(passwords, '_slots', threading.BoundedSemaphore(1)):
+            future = submit(release.wait)
+            with pytest.raises(PasswordBusyError):
+                submit(release.wait)
+            release.set()
+            future.result(timeout=1)
+            # A vaga é liberada quando a tarefa termina
+            assert submit(lambda: 'ok').result(timeout=1) == 'ok'
+
+    def test_run_bounded_timeout(self):
+        release = threading.Event()
+        with patch.object(passwords, 'PASSWORD_TIMEOUT', 0.01):
+            with pytest.raises(PasswordBusyError):
+                run_bounded(release.wait)
+        release.set()
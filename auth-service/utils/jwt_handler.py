@@ -1,19 +1,12 @@
-import jwt
-import datetime
-import os
-
-SECRET = os.getenv("JWT_SECRET")
+from config.auth import encode_token, verify_token, AuthError
 
 def generate_token(email, role):
-    payload = {
-        "email": email,
-        "role": role,
-        "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=12)
-    }
-    return jwt.encode(payload, SECRET, algorithm="HS256")
+    """Token assinado com a chave ativa (header kid) para os demais serviços"""
+    return encode_token({"email": email, "role": role})
 
 def decode_token(token):
+    """Claims do token, ou None se malformado, expirado ou com assinatura inválida"""
     try:
-        return jwt.decode(token, SECRET, algorithms=["HS256"])
-    except jwt.ExpiredSignatureError:
+        return verify_token(token)
+    except AuthError:
         return None
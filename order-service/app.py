@@ -1,24 +1,53 @@
-from flask import Flask, redirect, url_for
-from controllers.order_controller import order_bp
 from dotenv import load_dotenv
-import os
 
-# Carrega as variáveis de ambiente do arquivo .env
+# Carrega as variáveis de ambiente do arquivo .env antes dos demais imports:
+# vários módulos (ex.: services/product_client.py) leem a configuração ao serem importados
 load_dotenv()
 
-# Cria a instância da aplicação Flask
-app = Flask(__name__)
-app.secret_key = os.getenv("SECRET_KEY")
+from flask import Flask, redirect, url_for, jsonify
+from controllers.order_controller import order_bp
+from config.database import init_indexes, get_pool_stats
+from config.compression import init_compression
+from config.json_provider import init_json
+from config.auth import init_auth
+import os
+
+def create_app():
+    """Cria e configura a aplicação Flask do order-service"""
+    app = Flask(__name__)
+    app.secret_key = os.getenv("SECRET_KEY")
+
+    # Registra o blueprint de pedidos
+    app.register_blueprint(order_bp, url_prefix='/order')
+
+    # Tokens Bearer inválidos são recusados antes das rotas (verificação local, com cache)
+    init_auth(app)
+
+    # jsonify/get_json com orjson (datetime e ObjectId codificados nativamente)
+    init_json(app)
+
+    # Compressão gzip/brotli das respostas e cache de longa duração dos arquivos estáticos
+    init_compression(app)
+
+    # Garante os índices do MongoDB usados pelas consultas do serviço (idempotente)
+    init_indexes()
+
+    # Estatísticas do pool de conexões do MongoDB do processo que atendeu a requisição
+    @app.route('/health/db')
+    def db_health():
+        return jsonify(get_pool_stats())
+
+    # Redireciona a rota raiz para a lista de pedidos
+    @app.route('/')
+    def index():
+        return redirect(url_for('order.list_orders'))
 
-# Registra o blueprint de pedidos
-app.register_blueprint(order_bp, url_prefix='/order')
+    return app
 
-# Redireciona a rota raiz para a lista de pedidos
-@app.route('/')
-def index():
-    return redirect(url_for('order.list_orders'))
+# Instância usada pelo gunicorn (app:app) e pelo servidor de desenvolvimento
+app = create_app()
 
 if __name__ == '__main__':
-    # Executa a aplicação Flask
-    app.run(host="0.0.0.0", port=5002, debug=True)
-    # O debug=True permite recarregar automaticamente a aplicação ao fazer alterações no código
+    # Servidor de desenvolvimento do Flask; em produção use: gunicorn -c gunicorn.conf.py app:app
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5002")), debug=os.getenv("FLASK_DEBUG", "1") == "1")
+    # O debug recarrega automaticamente a aplicação ao fazer alterações no código
@@ -0,0 +1,61 @@
+# Benchmark da codificação JSON das listagens de pedidos e da leitura do catálogo
+#
+#     cd order-service
+#     python -m benchmarks.bench_json [pedidos]
+#
+# Compara o provedor JSON padrão do Flask (json da stdlib) com o FastJSONProvider
+# (orjson) ao responder uma página de pedidos serializados, e response.json() com o
+# orjson ao decodificar o catálogo recebido do product-service.
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from config.json_provider import FastJSONProvider, dumps, loads, orjson
+from models.order_model import serialize_order
+from benchmarks.bench_serialize_order import make_orders
+import json
+import sys
+import time
+
+def make_catalog(count=200):
+    return [{
+        "id": f"65a1b2c3d4e5f60718{i:06d}", "sku": f"SKU-{i}", "name": f"Hambúrguer {i}",
+        "description": "Pão, carne, queijo, alface e tomate", "category": "Hambúrgueres",
+        "price": 19.9 + i, "available": True, "ingredients": ["pão", "carne", "queijo", "alface", "tomate"]
+    } for i in range(count)]
+
+def best_of(function, repeat=5, number=200):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def report(name, before, after):
+    print(f"{name:<36} stdlib {before * 1e6:9.1f} µs   orjson {after * 1e6:9.1f} µs   {before / after:5.2f}x")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 50
+    if orjson is None:
+        print("⚠️ orjson não instalado: o provedor usa o json da stdlib")
+
+    app = Flask(__name__)
+    providers = {"stdlib": DefaultJSONProvider(app), "orjson": FastJSONProvider(app)}
+    page = {"orders": [serialize_order(order) for order in make_orders(count)], "next_cursor": "abc", "has_more": True}
+    catalog = make_catalog()
+    catalog_body = json.dumps(catalog).encode()
+
+    print(f"página com {count} pedidos, catálogo com {len(catalog)} produtos ({len(catalog_body)} bytes)")
+    with app.app_context():
+        timings = {name: best_of(lambda: provider.response(page).get_data()) for name, provider in providers.items()}
+        report("jsonify(página de pedidos)", timings["stdlib"], timings["orjson"])
+        timings = {name: best_of(lambda: provider.response(catalog).get_data()) for name, provider in providers.items()}
+        report("jsonify(catálogo)", timings["stdlib"], timings["orjson"])
+    report("decodificar catálogo", best_of(lambda: json.loads(catalog_body)), best_of(lambda: loads(catalog_body)))
+    report("dumps(catálogo)", best_of(lambda: json.dumps(catalog)), best_of(lambda: dumps(catalog)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
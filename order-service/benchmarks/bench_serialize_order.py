@@ -0,0 +1,76 @@
+# Micro-benchmark da serialização de pedidos (sem MongoDB)
+#
+#     cd order-service
+#     python -m benchmarks.bench_serialize_order [quantidade]
+#
+# Compara a serialização original (closure + strftime a cada chamada) com a atual e
+# com o serializador resumido das listagens, em uma listagem de pedidos sintéticos.
+
+from datetime import datetime, timedelta
+from bson import ObjectId
+from models.order_model import serialize_order, serialize_order_summary
+import sys
+import time
+
+def legacy_serialize_order(order):
+    # Versão anterior de serialize_order, mantida aqui só para comparação
+    def format_datetime(dt):
+        if dt and hasattr(dt, 'strftime'):
+            return dt.strftime('%d/%m/%Y %H:%M')
+        return None
+
+    return {
+        "id": str(order["_id"]),
+        "user_email": order.get("user_email"),
+        "user_id": order.get("user_id"),
+        "items": order.get("items", []),
+        "total": order.get("total", 0.0),
+        "status": order.get("status", "pending"),
+        "created_at": order.get("created_at"),
+        "updated_at": order.get("updated_at"),
+        "created_at_formatted": format_datetime(order.get("created_at")),
+        "updated_at_formatted": format_datetime(order.get("updated_at"))
+    }
+
+def make_orders(count):
+    """Pedidos com um intervalo médio de 20s entre eles, do mais recente para o mais antigo"""
+    now = datetime(2026, 1, 1, 12, 0)
+    items = [{"name": "Burger", "quantity": 2, "unit_price": 10.0, "total": 20.0}]
+    orders = []
+    for i in range(count):
+        created_at = now - timedelta(seconds=20 * i, microseconds=i)
+        orders.append({
+            "_id": ObjectId(), "user_email": f"cliente{i % 500}@email.com", "user_id": "u1",
+            "items": items, "total": 20.0, "status": "pending", "version": 0,
+            "created_at": created_at, "updated_at": created_at + timedelta(minutes=5)
+        })
+    return orders
+
+def measure(name, serializer, orders, repeat=5):
+    best = min(_run(serializer, orders) for _ in range(repeat))
+    print(f"{name:<32} {best * 1000:8.1f} ms   {best / len(orders) * 1e9:7.0f} ns/pedido")
+    return best
+
+def _run(serializer, orders):
+    start = time.perf_counter()
+    [serializer(order) for order in orders]
+    return time.perf_counter() - start
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 100_000
+    orders = make_orders(count)
+    print(f"{count} pedidos")
+    baseline = measure("original (strftime)", legacy_serialize_order, orders)
+    for name, serializer in (
+        ("serialize_order", serialize_order),
+        ("serialize_order (epoch)", lambda order: serialize_order(order, epoch=True)),
+        ("serialize_order_summary", serialize_order_summary),
+        ("serialize_order_summary (epoch)", lambda order: serialize_order_summary(order, epoch=True)),
+    ):
+        elapsed = measure(name, serializer, orders)
+        print(f"{'':<32} {baseline / elapsed:8.2f}x mais rápido")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# Compressão de respostas (gzip/brotli) e cache dos arquivos estáticos
+#
+# init_compression(app) registra um after_request que comprime as respostas de texto
+# e JSON acima de COMPRESS_MIN_SIZE bytes conforme o Accept-Encoding do cliente (br
+# quando o pacote brotli está instalado, senão gzip). Respostas em streaming (SSE da
+# cozinha, exportação) passam sem compressão para não segurar os eventos no buffer.
+#
+# Os arquivos de static/ são lidos e comprimidos uma única vez na subida. O
+# url_for('static', ...) ganha ?v=<hash do conteúdo>, e as URLs com a versão atual
+# recebem Cache-Control de um ano (immutable): um arquivo alterado muda de URL.
+
+from collections import namedtuple
+from flask import request
+import gzip
+import hashlib
+import mimetypes
+import os
+
+try:
+    import brotli
+except ImportError:
+    # Opcional: sem o pacote brotli as respostas são comprimidas só com gzip
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+# Arquivos estáticos pré-comprimidos usam o nível máximo (custo pago só na subida)
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", str(365 * 24 * 3600)))
+# URL sem versão (ou com versão antiga): cache curto
+STATIC_UNVERSIONED_MAX_AGE = int(os.getenv("STATIC_UNVERSIONED_MAX_AGE", "300"))
+
+COMPRESSIBLE_TYPES = {
+    "text/html", "text/css", "text/plain", "text/csv", "text/javascript", "text/xml",
+    "application/javascript", "application/json", "application/x-ndjson", "application/xml",
+    "image/svg+xml",
+}
+
+# version: hash do conteúdo; encoded: codificação -> bytes pré-comprimidos
+StaticAsset = namedtuple("StaticAsset", ["version", "encoded"])
+
+def supported_encodings():
+    """Codificações oferecidas, em ordem de preferência"""
+    return ["br", "gzip"] if brotli else ["gzip"]
+
+def compress(data, encoding, static=False):
+    """Comprime os bytes com a codificação informada (br ou gzip)"""
+    if encoding == "br":
+        return brotli.compress(data, quality=STATIC_BROTLI_QUALITY if static else BROTLI_QUALITY)
+    # mtime=0: o mesmo conteúdo gera sempre os mesmos bytes
+    return gzip.compress(data, compresslevel=STATIC_GZIP_LEVEL if static else GZIP_LEVEL, mtime=0)
+
+def choose_encoding(accept_encodings, available=None):
+    """Melhor codificação aceita pelo cliente entre as disponíveis (None = sem compressão)"""
+    return accept_encodings.best_match(available or supported_encodings())
+
+def is_compressible(mimetype):
+    return mimetype in COMPRESSIBLE_TYPES
+
+def precompress_static(static_folder):
+    """Lê os arquivos estáticos uma vez: versão (hash) de todos e variantes comprimidas dos textuais"""
+    assets = {}
+    if not static_folder or not os.path.isdir(static_folder):
+        return assets
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            filename = os.path.relpath(path, static_folder).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                data = f.read()
+            encoded = {}
+            if is_compressible(mimetypes.guess_type(name)[0]) and len(data) >= COMPRESS_MIN_SIZE:
+                for encoding in supported_encodings():
+                    compressed = compress(data, encoding, static=True)
+                    if len(compressed) < len(data):
+                        encoded[encoding] = compressed
+            assets[filename] = StaticAsset(hashlib.sha256(data).hexdigest()[:12], encoded)
+    return assets
+
+def _weaken_etag(response):
+    # O corpo comprimido não é byte a byte igual ao original: o ETag passa a ser fraco
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+def _encode(response, encoding, data):
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    _weaken_etag(response)
+
+def _static_response(response, assets):
+    """Cache-Control dos estáticos e troca do corpo pela variante pré-comprimida"""
+    filename = (request.view_args or {}).get("filename")
+    asset = assets.get(filename)
+    if asset is None:
+        return response
+
+    if request.args.get("v") == asset.version:
+        response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE}, immutable"
+    else:
+        response.headers["Cache-Control"] = f"public, max-age={STATIC_UNVERSIONED_MAX_AGE}"
+
+    if asset.encoded:
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.accept_encodings, list(asset.encoded))
+        if response.status_code == 200 and encoding:
+            # send_file devolve o arquivo aberto em modo passthrough: fecha e usa os bytes prontos
+            if hasattr(response.response, "close"):
+                response.response.close()
+            response.direct_passthrough = False
+            _encode(response, encoding, asset.encoded[encoding])
+    return response
+
+def compress_response(response, assets):
+    """Comprime a resposta se o tipo, o tamanho e o Accept-Encoding permitirem"""
+    if request.endpoint == "static":
+        return _static_response(response, assets)
+
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers or not is_compressible(response.mimetype)
+            or "no-transform" in response.headers.get("Cache-Control", "")):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    if response.content_length is not None and response.content_length < COMPRESS_MIN_SIZE:
+        return response
+    encoding = choose_encoding(request.accept_encodings)
+    if not encoding:
+        return response
+    _encode(response, encoding, compress(response.get_data(), encoding))
+    return response
+
+def init_compression(app):
+    """Registra a compressão de respostas e a versão/cache dos arquivos estáticos na aplicação"""
+    assets = precompress_static(app.static_folder)
+    app.extensions["compression"] = assets
+
+    @app.url_defaults
+    def static_version(endpoint, values):
+        if endpoint == "static" and "v" not in values:
+            asset = assets.get(values.get("filename"))
+            if asset:
+                values["v"] = asset.version
+
+    @app.after_request
+    def compress_after_request(response):
+        return compress_response(response, assets)
+
+    return assets
@@ -1,16 +1,173 @@
+# Conecta ao banco de dados MongoDB utilizando as variáveis de ambiente
+#
+# O MongoClient é criado sob demanda e uma única vez por processo: depois de um
+# fork (workers do gunicorn com preload) o processo filho cria o seu próprio
+# cliente e pool de conexões em vez de reaproveitar os sockets do processo pai.
+# As opções do pool podem ser definidas por variáveis de ambiente ou na MONGO_URI.
+
 from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+from config.indexes import ensure_indexes
 import os
+import threading
 from dotenv import load_dotenv
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
 
-# Cria a conexão com o banco de dados MongoDB
-client = MongoClient(os.getenv("MONGO_URI"))
+DB_NAME = "burguer_app_db"
+
+# Variável de ambiente -> opção do MongoClient (valor padrão, conversão)
+CLIENT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", "50", int),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", "0", int),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", "2000", int),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", "5000", int),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", "5000", int),
+    "MONGO_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", "10000", int),
+    "MONGO_READ_PREFERENCE": ("readPreference", None, str),
+    "MONGO_WRITE_CONCERN": ("w", None, lambda value: int(value) if value.isdigit() else value),
+}
+
+class PoolStats(ConnectionPoolListener):
+    """Contadores de uso do pool de conexões do processo atual"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {
+                "created": 0, "closed": 0, "checked_out": 0, "checkouts": 0,
+                "checkout_failures": 0, "max_checked_out": 0, "pools_cleared": 0
+            }
+
+    def _inc(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+            if name == "checked_out":
+                self.counters["max_checked_out"] = max(self.counters["max_checked_out"], self.counters["checked_out"])
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def connection_created(self, event):
+        self._inc("created")
+
+    def connection_closed(self, event):
+        self._inc("closed")
+
+    def connection_checked_out(self, event):
+        self._inc("checkouts")
+        self._inc("checked_out")
+
+    def connection_checked_in(self, event):
+        self._inc("checked_out", -1)
+
+    def connection_check_out_failed(self, event):
+        # Inclui as esperas que estouraram o waitQueueTimeoutMS
+        self._inc("checkout_failures")
+
+    def pool_cleared(self, event):
+        self._inc("pools_cleared")
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
 
-# Seleciona o banco de dados
-db = client["burguer_app_db"]
+pool_stats = PoolStats()
+
+client = None
+_client_pid = None
+_client_lock = threading.Lock()
+_collections = {}
+
+def client_options():
+    """Opções do MongoClient vindas das variáveis de ambiente (a MONGO_URI tem precedência sobre os padrões)"""
+    uri = (os.getenv("MONGO_URI") or "").lower()
+    options = {}
+    for env_name, (option, default, convert) in CLIENT_OPTIONS.items():
+        value = os.getenv(env_name)
+        if value is None:
+            if default is None or f"{option.lower()}=" in uri:
+                continue
+            value = default
+        options[option] = convert(value)
+    return options
+
+def _reset_after_fork():
+    global client, _client_pid, _client_lock
+    client, _client_pid = None, None
+    _client_lock = threading.Lock()
+    _collections.clear()
+    pool_stats.reset()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+# função para retornar o cliente do MongoDB do processo atual (criado na primeira chamada)
+def get_client():
+    global client, _client_pid
+    if client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if client is None or _client_pid != os.getpid():
+                _collections.clear()
+                client = MongoClient(os.getenv("MONGO_URI"), event_listeners=[pool_stats], **client_options())
+                _client_pid = os.getpid()
+    return client
+
+def _collection(name):
+    collection = _collections.get(name)
+    if collection is None:
+        collection = _collections[name] = get_client()[DB_NAME][name]
+    return collection
+
+class LazyCollection:
+    """Coleção resolvida no cliente do processo atual a cada uso"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(_collection(self.name), attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self.name!r})"
+
+class LazyDatabase:
+    """Banco de dados cujas coleções são resolvidas sob demanda (seguro após fork)"""
+
+    def __getitem__(self, name):
+        return LazyCollection(name)
+
+    def __getattr__(self, attr):
+        return getattr(get_client()[DB_NAME], attr)
+
+db = LazyDatabase()
 
 # função para retornar a instância do banco de dados
 def get_db():
     return db
+
+# função para retornar as estatísticas de uso do pool de conexões deste processo
+def get_pool_stats():
+    return {"pid": os.getpid(), "connected": client is not None, **pool_stats.snapshot()}
+
+# Coleções consultadas por este serviço (índices garantidos na inicialização)
+SERVICE_COLLECTIONS = ["orders", "users", "order_stats", "orders_archive", "order_idempotency"]
+
+# função para garantir os índices das consultas deste serviço (idempotente)
+def init_indexes():
+    return ensure_indexes(db, SERVICE_COLLECTIONS)
@@ -1,31 +1,56 @@
-from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify
-import requests
+from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify, Response, stream_with_context
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+import json
+import os
+import queue
+import time
+import uuid
+from services import product_client
+from services.pricing_service import price_order_items
+from services.stats_service import get_stats
+from services.export_service import export_orders
+from services import events
+from services.idempotency_service import run_idempotent, IDEMPOTENCY_HEADER, IDEMPOTENCY_FIELD
 from services.order_service import (
-    create_order, get_order_by_id, get_orders_by_user, 
-    get_all_orders, update_order_status, delete_order, get_all_users
+    create_order, get_order_by_id, update_order_status, delete_order, get_orders_page,
+    search_users, create_orders_batch, get_active_orders, update_orders_status_bulk
 )
+from models.order_model import STATUS_TRANSITIONS, STATUS_LABELS
+from config.auth import require_auth
 
 def get_products_from_service():
-    """Busca produtos do product-service"""
-    try:
-        response = requests.get("http://localhost:5003/product/api/products")
-        if response.status_code == 200:
-            return response.json()
-        return []
-    except Exception as e:
-        print(f"Erro ao buscar produtos: {e}")
-        return []
+    """Busca produtos do product-service (cache local com revalidação)"""
+    return product_client.get_products()
 
 def get_categories_from_service():
-    """Busca categorias do product-service"""
-    try:
-        response = requests.get("http://localhost:5003/product/api/categories")
-        if response.status_code == 200:
-            return response.json()
-        return []
-    except Exception as e:
-        print(f"Erro ao buscar categorias: {e}")
-        return []
+    """Busca categorias do product-service (cache local com revalidação)"""
+    return product_client.get_categories()
+
+# Pool compartilhado para buscar em paralelo as dependências das páginas
+_fanout_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ORDER_FANOUT_WORKERS", "16")),
+    thread_name_prefix="order-fanout"
+)
+# Prazo (segundos) de cada dependência da página de criação de pedido
+CATALOG_TIMEOUT = float(os.getenv("ORDER_PAGE_CATALOG_TIMEOUT", "3.0"))
+
+def gather(dependencies):
+    """Executa em paralelo as dependências {nome: (função, padrão, prazo)}; retorna (resultados, falhas)"""
+    # Dependências que falham ou estouram o prazo ficam com o valor padrão e a página é renderizada mesmo assim
+    start = time.monotonic()
+    futures = {name: _fanout_executor.submit(fn) for name, (fn, _, _) in dependencies.items()}
+    results, failed = {}, []
+    for name, (_, default, timeout) in dependencies.items():
+        try:
+            results[name] = futures[name].result(timeout=max(0, start + timeout - time.monotonic()))
+        except Exception as e:
+            print(f"Dependência '{name}' indisponível: {e!r}")
+            futures[name].cancel()
+            results[name] = default
+            failed.append(name)
+    return results, failed
 
 order_bp = Blueprint("order", __name__)
 
@@ -36,34 +61,31 @@ def create():
         data = request.form
         user_email = data.get("user_email")
         
-        # Processa os itens do pedido
-        items = []
-        total = 0.0
-        
-        # Exemplo simples - você pode expandir isso
-        item_names = request.form.getlist("item_name")
-        item_quantities = request.form.getlist("item_quantity")
-        item_prices = request.form.getlist("item_price")
-        
-        for name, qty, price in zip(item_names, item_quantities, item_prices):
-            if name and qty and price:
-                quantity = int(qty)
-                unit_price = float(price)
-                item_total = quantity * unit_price
-                
-                items.append({
-                    "name": name,
-                    "quantity": quantity,
-                    "unit_price": unit_price,
-                    "total": item_total
-                })
-                total += item_total
+        # Os itens chegam como ids de produto + quantidade; preços e totais são
+        # calculados no servidor a partir da tabela de preços do catálogo
+        requested_items = [
+            {"product_id": product_id, "name": name, "quantity": quantity, "expected_price": price}
+            for product_id, name, quantity, price in zip_longest(
+                request.form.getlist("item_id"),
+                request.form.getlist("item_name"),
+                request.form.getlist("item_quantity"),
+                request.form.getlist("item_price")
+            )
+            if product_id or name
+        ]
         
-        if not items:
+        if not requested_items:
             flash("Adicione pelo menos um item ao pedido", "error")
             return redirect(url_for("order.create"))
         
-        response, status = create_order(user_email, items, total)
+        # Reenvios do mesmo formulário (ou retentativas do cliente) com a mesma chave
+        # devolvem o resultado da primeira requisição em vez de duplicar o pedido
+        key = request.headers.get(IDEMPOTENCY_HEADER) or request.form.get(IDEMPOTENCY_FIELD)
+        response, status, _ = run_idempotent(
+            key,
+            {"user_email": user_email, "items": requested_items},
+            lambda: _place_order(user_email, requested_items)
+        )
         
         if status == 201:
             flash("Pedido criado com sucesso!", "success")
@@ -75,20 +97,40 @@ def create():
             flash(response.get("error", "Erro ao criar pedido"), "error")
             return redirect(url_for("order.create"))
     
-    # Get all users for reference in the form
-    users = get_all_users()
+    # Produtos e categorias são buscados em paralelo: a latência da página é a da
+    # dependência mais lenta, não a soma delas. Os clientes são buscados sob demanda
+    # pelo autocompletar (/order/api/users/search).
+    data, unavailable = gather({
+        "products": (get_products_from_service, [], CATALOG_TIMEOUT),
+        "categories": (get_categories_from_service, [], CATALOG_TIMEOUT)
+    })
     
-    # Get products from product service
-    products = get_products_from_service()
-    categories = get_categories_from_service()
-    
-    return render_template("create_order.html", users=users, products=products, categories=categories)
+    # Uma chave de idempotência nova a cada exibição do formulário
+    return render_template("create_order.html", unavailable=unavailable, idempotency_key=uuid.uuid4().hex, **data)
+
+def _place_order(user_email, requested_items):
+    """Calcula os preços no servidor e cria o pedido"""
+    priced, status = price_order_items(requested_items)
+    if status != 200:
+        return {"error": priced.get("error", "Não foi possível calcular o pedido")}, status
+    return create_order(user_email, priced["items"], priced["total"])
+
+def _page_args():
+    """Extrai os parâmetros de paginação da query string"""
+    return {
+        "cursor": request.args.get("cursor"),
+        "direction": request.args.get("direction", "next"),
+        "page_size": request.args.get("page_size")
+    }
 
 @order_bp.route("/list")
 def list_orders():
-    """Lista todos os pedidos"""
-    orders = get_all_orders()
-    return render_template("order_list.html", orders=orders)
+    """Lista os pedidos, uma página por vez"""
+    page, status = get_orders_page(summary=True, **_page_args())
+    if status != 200:
+        flash(page.get("error", "Erro ao paginar pedidos"), "error")
+        return redirect(url_for("order.list_orders"))
+    return render_template("order_list.html", orders=page["orders"], page=page)
 
 @order_bp.route("/details/<order_id>")
 def order_details(order_id):
@@ -97,13 +139,17 @@ def order_details(order_id):
     if not order:
         flash("Pedido não encontrado", "error")
         return redirect(url_for("order.list_orders"))
-    return render_template("order_details.html", order=order)
+    next_statuses = STATUS_TRANSITIONS.get(order.get("status"), ())
+    return render_template("order_details.html", order=order, next_statuses=next_statuses, status_labels=STATUS_LABELS)
 
 @order_bp.route("/user/<user_email>")
 def user_orders(user_email):
-    """Lista pedidos de um usuário específico"""
-    orders = get_orders_by_user(user_email)
-    return render_template("order_list.html", orders=orders, user_email=user_email)
+    """Lista pedidos de um usuário específico, uma página por vez"""
+    page, status = get_orders_page(user_email=user_email, summary=True, **_page_args())
+    if status != 200:
+        flash(page.get("error", "Erro ao paginar pedidos"), "error")
+        return redirect(url_for("order.user_orders", user_email=user_email))
+    return render_template("order_list.html", orders=page["orders"], page=page, user_email=user_email)
 
 @order_bp.route("/update_status/<order_id>", methods=["POST"])
 def update_status(order_id):
@@ -113,7 +159,8 @@ def update_status(order_id):
         flash("Status é obrigatório", "error")
         return redirect(url_for("order.order_details", order_id=order_id))
     
-    response, status = update_order_status(order_id, new_status)
+    # A versão exibida na tela evita sobrescrever uma alteração feita em outro terminal
+    response, status = update_order_status(order_id, new_status, expected_version=request.form.get("expected_version"))
     
     if status == 200:
         flash("Status atualizado com sucesso!", "success")
@@ -133,3 +180,103 @@ def delete(order_id):
         flash(response.get("error", "Erro ao deletar pedido"), "error")
     
     return redirect(url_for("order.list_orders"))
+
+# Intervalo entre comentários de keep-alive do SSE (proxies encerram conexões ociosas)
+SSE_HEARTBEAT = float(os.getenv("KITCHEN_HEARTBEAT", "15"))
+
+@order_bp.route("/kitchen")
+def kitchen():
+    """Fila da cozinha: pedidos pendentes e em preparo, atualizados em tempo real"""
+    return render_template("kitchen.html", orders=get_active_orders(), active_statuses=events.ACTIVE_STATUSES)
+
+@order_bp.route("/api/kitchen")
+def api_kitchen():
+    """API JSON da fila da cozinha"""
+    return jsonify(get_active_orders())
+
+def _sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['order'], ensure_ascii=False)}\n\n"
+
+@order_bp.route("/api/kitchen/stream")
+def kitchen_stream():
+    """Server-Sent Events com as alterações de pedidos"""
+    subscriber = events.bus.subscribe()
+    if subscriber is None:
+        return jsonify({"error": "Muitas telas conectadas. Tente novamente."}), 503
+    events.ensure_order_watcher()
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = subscriber.get(timeout=SSE_HEARTBEAT)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                if event is events.CLOSED:
+                    return
+                yield _sse(event)
+        finally:
+            events.bus.unsubscribe(subscriber)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@order_bp.route("/api/orders")
+def api_orders():
+    """API JSON paginada de pedidos (filtro opcional por user_email; view=summary e epoch=1 opcionais)"""
+    page, status = get_orders_page(
+        user_email=request.args.get("user_email"),
+        summary=request.args.get("view") == "summary",
+        epoch=request.args.get("epoch") == "1",
+        **_page_args()
+    )
+    return jsonify(page), status
+
+@order_bp.route("/api/orders/export")
+@require_auth("admin")
+def api_export_orders():
+    """Exportação de pedidos em streaming (format=ndjson|csv, from, to, status)"""
+    try:
+        chunks, content_type, extension = export_orders(
+            request.args.get("format", "ndjson"), request.args.get("from"),
+            request.args.get("to"), request.args.get("status")
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    filename = f"pedidos-{datetime.utcnow():%Y%m%d%H%M%S}.{extension}"
+    return Response(stream_with_context(chunks), content_type=content_type,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+@order_bp.route("/api/stats")
+@require_auth("admin")
+def api_stats():
+    """Estatísticas pré-agregadas de pedidos (days, hours e top opcionais)"""
+    return jsonify(get_stats(request.args.get("days"), request.args.get("hours"), request.args.get("top")))
+
+@order_bp.route("/api/users/search")
+def api_search_users():
+    """Autocompletar de clientes pelo prefixo do email"""
+    users = search_users(request.args.get("q"), request.args.get("limit"))
+    return jsonify(users)
+
+@order_bp.route("/api/orders/batch", methods=["POST"])
+@require_auth()
+def api_create_orders_batch():
+    """Importação em lote de pedidos (JSON: {"orders": [{user_email, items: [{product_id, quantity}]}]})"""
+    payload = request.get_json(silent=True)
+    orders = payload.get("orders") if isinstance(payload, dict) else payload
+    response, status, replayed = run_idempotent(
+        request.headers.get(IDEMPOTENCY_HEADER), orders, lambda: create_orders_batch(orders)
+    )
+    return jsonify(response), status, {"Idempotent-Replayed": "true"} if replayed else {}
+
+@order_bp.route("/api/orders/status", methods=["POST"])
+@require_auth("admin")
+def api_update_orders_status():
+    """Transições de status em lote (JSON: {"transitions": [{order_id, status, expected_status?, expected_version?}]})"""
+    payload = request.get_json(silent=True)
+    transitions = payload.get("transitions") if isinstance(payload, dict) else payload
+    response, status = update_orders_status_bulk(transitions)
+    return jsonify(response), status
@@ -1,11 +1,49 @@
+from datetime import datetime
+from functools import lru_cache
+
+# Máquina de estados do pedido: status atual -> status para os quais pode mudar
+STATUS_TRANSITIONS = {
+    "pending": ("preparing", "cancelled"),
+    "preparing": ("ready", "cancelled"),
+    "ready": ("completed", "cancelled"),
+    "completed": (),
+    "cancelled": (),
+}
+
+STATUS_LABELS = {
+    "pending": "Pendente",
+    "preparing": "Preparando",
+    "ready": "Pronto",
+    "completed": "Concluído",
+    "cancelled": "Cancelado",
+}
+
+def allowed_previous_statuses(status):
+    """Status a partir dos quais um pedido pode passar para o status informado"""
+    return [current for current, targets in STATUS_TRANSITIONS.items() if status in targets]
+
+EPOCH = datetime(1970, 1, 1)
+
+@lru_cache(maxsize=4096)
+def _format_minute(year, month, day, hour, minute):
+    return f"{day:02d}/{month:02d}/{year} {hour:02d}:{minute:02d}"
+
+def format_datetime(dt):
+    """Data no formato dd/mm/aaaa hh:mm (pedidos da mesma listagem costumam repetir o minuto)"""
+    if dt and hasattr(dt, 'strftime'):
+        return _format_minute(dt.year, dt.month, dt.day, dt.hour, dt.minute)
+    return None
+
+def to_epoch_ms(dt):
+    """Data UTC (sem fuso, como vem do MongoDB) em milissegundos desde 1970"""
+    if dt and hasattr(dt, 'strftime'):
+        return int((dt - EPOCH).total_seconds() * 1000)
+    return None
+
 # Serialização para retorno de pedidos (removendo dados sensíveis)
-def serialize_order(order):
-    # Helper function to format datetime
-    def format_datetime(dt):
-        if dt and hasattr(dt, 'strftime'):
-            return dt.strftime('%d/%m/%Y %H:%M')
-        return None
-    
+def serialize_order(order, epoch=False):
+    created_at = order.get("created_at")
+    updated_at = order.get("updated_at")
     return {
         "id": str(order["_id"]),
         "user_email": order.get("user_email"),
@@ -13,8 +51,25 @@ def serialize_order(order):
         "items": order.get("items", []),
         "total": order.get("total", 0.0),
         "status": order.get("status", "pending"),
-        "created_at": order.get("created_at"),
-        "updated_at": order.get("updated_at"),
-        "created_at_formatted": format_datetime(order.get("created_at")),
-        "updated_at_formatted": format_datetime(order.get("updated_at"))
+        "version": order.get("version", 0),
+        "created_at": to_epoch_ms(created_at) if epoch else created_at,
+        "updated_at": to_epoch_ms(updated_at) if epoch else updated_at,
+        "created_at_formatted": format_datetime(created_at),
+        "updated_at_formatted": format_datetime(updated_at)
+    }
+
+# Campos lidos do banco para as listagens (serialize_order_summary)
+SUMMARY_PROJECTION = {"user_email": 1, "total": 1, "status": 1, "version": 1, "created_at": 1}
+
+# Serialização resumida para listagens: só os campos exibidos na tabela de pedidos
+def serialize_order_summary(order, epoch=False):
+    created_at = order.get("created_at")
+    return {
+        "id": str(order["_id"]),
+        "user_email": order.get("user_email"),
+        "total": order.get("total", 0.0),
+        "status": order.get("status", "pending"),
+        "version": order.get("version", 0),
+        "created_at": to_epoch_ms(created_at) if epoch else created_at,
+        "created_at_formatted": format_datetime(created_at)
     }
@@ -0,0 +1,85 @@
+# Arquivamento de pedidos finalizados na coleção orders_archive
+#
+# Pedidos concluídos ou cancelados há mais de ORDER_ARCHIVE_AFTER_DAYS dias são
+# copiados em lotes para orders_archive e então removidos de orders, mantendo a
+# coleção principal (e seus índices) pequena. As consultas por id e o histórico do
+# cliente também leem o arquivo (order_service), e as estatísticas continuam
+# contando os pedidos arquivados.
+#
+#     python -m services.archive_service [--days 90] [--batch-size 500] [--dry-run]
+
+from config.database import get_db
+from models.order_model import STATUS_TRANSITIONS
+from datetime import datetime, timedelta
+from pymongo.errors import BulkWriteError
+import argparse
+import os
+import sys
+
+db = get_db()
+orders_col = db["orders"]
+archive_col = db["orders_archive"]
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", "500"))
+
+# Só pedidos em status final (que não mudam mais) são arquivados
+ARCHIVABLE_STATUSES = [status for status, targets in STATUS_TRANSITIONS.items() if not targets]
+
+DUPLICATE_KEY = 11000
+
+def archive_query(older_than_days=None, now=None):
+    """Filtro dos pedidos finalizados criados antes do limite"""
+    days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    return {"status": {"$in": ARCHIVABLE_STATUSES}, "created_at": {"$lt": cutoff}}
+
+def _copy_to_archive(docs):
+    """Insere os pedidos no arquivo; os que já estavam lá (execução interrompida) são ignorados"""
+    try:
+        archive_col.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY]
+        if errors:
+            raise
+
+def archive_orders(older_than_days=None, batch_size=None, max_batches=None, dry_run=False):
+    """Move os pedidos finalizados antigos para orders_archive, um lote por vez"""
+    query = archive_query(older_than_days)
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    if dry_run:
+        return {"archived": 0, "batches": 0, "pending": orders_col.count_documents(query)}
+
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        docs = list(orders_col.find(query).sort("created_at", 1).limit(batch_size))
+        if not docs:
+            break
+        ids = [doc["_id"] for doc in docs]
+        # Copia antes de remover: uma falha no meio deixa o pedido nas duas coleções
+        # (as leituras priorizam orders), nunca em nenhuma
+        _copy_to_archive(docs)
+        archived += orders_col.delete_many({"_id": {"$in": ids}, "status": {"$in": ARCHIVABLE_STATUSES}}).deleted_count
+        batches += 1
+        if len(docs) < batch_size:
+            break
+    return {"archived": archived, "batches": batches}
+
+def main(argv=None):
+    """Ponto de entrada do comando de arquivamento"""
+    parser = argparse.ArgumentParser(description="Arquiva pedidos concluídos/cancelados antigos")
+    parser.add_argument("--days", type=int, default=None, help=f"idade mínima em dias (padrão: {ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--batch-size", type=int, default=None, help=f"pedidos por lote (padrão: {ARCHIVE_BATCH_SIZE})")
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="só conta os pedidos que seriam arquivados")
+    args = parser.parse_args(argv)
+
+    result = archive_orders(args.days, args.batch_size, args.max_batches, args.dry_run)
+    if args.dry_run:
+        print(f"📦 {result['pending']} pedidos seriam arquivados")
+    else:
+        print(f"📦 {result['archived']} pedidos arquivados em {result['batches']} lotes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
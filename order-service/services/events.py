@@ -0,0 +1,235 @@
+# Barramento de eventos de pedidos para a fila da cozinha (Server-Sent Events)
+#
+# Cada conexão SSE recebe uma fila limitada, alimentada por uma das fontes de eventos
+# (ORDER_EVENTS):
+#
+# - "poll" (padrão): as escritas deste processo são publicadas na hora, e as feitas
+#   pelos outros workers chegam pela consulta da fila da cozinha (pedidos ativos,
+#   índice status_created_at) a cada KITCHEN_POLL_INTERVAL segundos enquanto houver
+#   telas conectadas. Funciona com vários workers do gunicorn e com o MongoDB
+#   standalone do docker-compose. Uma escrita local é publicada de novo pela consulta
+#   seguinte; a tela ignora eventos com versão anterior à exibida.
+# - "change_stream": cada processo publica o change stream de orders (requer replica
+#   set; ORDER_CHANGE_STREAM=1 também seleciona este modo).
+# - "memory": o próprio order_service publica ao criar, atualizar ou excluir um pedido.
+#   Sem atraso, mas só vale com um único processo: um pedido gravado em um worker não
+#   é visto pelas telas conectadas a outro.
+#
+# Cada conexão SSE prende uma thread do worker gthread enquanto a tela estiver aberta;
+# por isso o limite de conexões por processo fica abaixo de GUNICORN_THREADS (veja
+# max_streams). Mais telas pedem mais threads ou mais workers.
+
+from config.database import get_db
+from pymongo.errors import PyMongoError
+import itertools
+import os
+import queue
+import threading
+import time
+
+db = get_db()
+orders_col = db["orders"]
+
+# Status exibidos na fila da cozinha
+ACTIVE_STATUSES = ("pending", "preparing")
+
+EVENT_SOURCES = ("poll", "change_stream", "memory")
+EVENT_SOURCE = "change_stream" if os.getenv("ORDER_CHANGE_STREAM", "0") == "1" else os.getenv("ORDER_EVENTS", "poll")
+if EVENT_SOURCE not in EVENT_SOURCES:
+    raise ValueError(f"ORDER_EVENTS inválido: '{EVENT_SOURCE}' (use {', '.join(EVENT_SOURCES)})")
+POLL_INTERVAL = float(os.getenv("KITCHEN_POLL_INTERVAL", "2"))
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("KITCHEN_QUEUE_SIZE", "100"))
+
+def max_streams(threads, configured=None):
+    """Conexões SSE por processo: cada uma ocupa uma thread do worker (gthread) enquanto durar
+
+    Padrão: metade das threads; nunca mais que threads - 1, para sobrar ao menos uma
+    thread para as demais requisições do worker.
+    """
+    limit = max(0, threads - 1)
+    if configured is None:
+        return min(max(1, threads // 2), limit)
+    return min(configured, limit)
+
+# Mesmo valor usado pelo gunicorn.conf.py (threads por worker)
+SERVER_THREADS = int(os.getenv("GUNICORN_THREADS", "4"))
+_configured_streams = os.getenv("KITCHEN_MAX_STREAMS")
+MAX_SUBSCRIBERS = max_streams(SERVER_THREADS, int(_configured_streams) if _configured_streams else None)
+WATCH_RETRY_DELAY = 5
+
+def kitchen_order(order):
+    """Dados do pedido usados pela tela da cozinha"""
+    created_at = order.get("created_at")
+    return {
+        "id": str(order["_id"]),
+        "user_email": order.get("user_email"),
+        "status": order.get("status", "pending"),
+        "items": [{"name": item.get("name"), "quantity": item.get("quantity")} for item in order.get("items", [])],
+        "total": order.get("total", 0.0),
+        "version": order.get("version", 0),
+        "created_at": created_at.isoformat() if hasattr(created_at, "isoformat") else created_at
+    }
+
+class OrderEventBus:
+    """Distribui eventos para as filas dos assinantes (uma por conexão SSE)"""
+
+    def __init__(self, max_subscribers=MAX_SUBSCRIBERS, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self):
+        """Nova fila de eventos, ou None se o limite de conexões foi atingido"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscriber = queue.Queue(maxsize=self.queue_size)
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event_type, order):
+        """Envia o evento a todos os assinantes; quem não está consumindo é desconectado"""
+        event = {"id": next(self._ids), "type": event_type, "order": order}
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # A tela perdeu eventos: encerra o stream para ela reconectar e recarregar a fila
+                self.unsubscribe(subscriber)
+                _close(subscriber)
+        return event
+
+    def reset(self):
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, set()
+        for subscriber in subscribers:
+            _close(subscriber)
+
+# Marcador que encerra o stream de um assinante
+CLOSED = object()
+
+def _close(subscriber):
+    try:
+        subscriber.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        subscriber.put_nowait(CLOSED)
+    except queue.Full:
+        pass
+
+bus = OrderEventBus()
+
+def emit(event_type, order):
+    """Publica um evento de pedido ("created", "updated" ou "deleted") vindo deste processo"""
+    # O change stream já entrega as escritas deste processo; nos demais modos elas são
+    # publicadas na hora (no modo poll a consulta periódica traz só as dos outros workers)
+    if EVENT_SOURCE == "change_stream":
+        return None
+    return bus.publish(event_type, kitchen_order(order))
+
+CHANGE_TYPES = {"insert": "created", "update": "updated", "replace": "updated", "delete": "deleted"}
+
+def _publish_change(change):
+    event_type = CHANGE_TYPES.get(change.get("operationType"))
+    if event_type is None:
+        return None
+    if event_type == "deleted":
+        order = {"_id": change["documentKey"]["_id"], "status": "deleted"}
+    else:
+        order = change.get("fullDocument") or {"_id": change["documentKey"]["_id"]}
+    return bus.publish(event_type, kitchen_order(order))
+
+def watch_order_changes():
+    """Publica no barramento as alterações da coleção de pedidos (requer replica set)"""
+    pipeline = [{"$match": {"operationType": {"$in": list(CHANGE_TYPES)}}}]
+    while True:
+        try:
+            with orders_col.watch(pipeline, full_document="updateLookup") as stream:
+                for change in stream:
+                    _publish_change(change)
+        except PyMongoError as e:
+            print(f"⚠️ Change stream de pedidos indisponível: {e}")
+            time.sleep(WATCH_RETRY_DELAY)
+
+# Campos lidos pela consulta periódica da fila da cozinha
+KITCHEN_PROJECTION = {"user_email": 1, "items": 1, "status": 1, "total": 1, "created_at": 1, "version": 1}
+
+class ActiveOrdersPoller:
+    """Detecta as alterações da fila da cozinha comparando consultas sucessivas dos pedidos ativos"""
+
+    def __init__(self):
+        self._snapshot = None  # _id -> (status, versão) da última consulta
+
+    def idle(self):
+        """True enquanto a fila de referência ainda não foi consultada"""
+        return self._snapshot is None
+
+    def poll(self):
+        """Consulta os pedidos ativos e publica o que mudou desde a consulta anterior"""
+        orders = {
+            order["_id"]: order
+            for order in orders_col.find({"status": {"$in": list(ACTIVE_STATUSES)}}, KITCHEN_PROJECTION)
+        }
+        previous = self._snapshot
+        self._snapshot = {order_id: (order.get("status"), order.get("version", 0)) for order_id, order in orders.items()}
+        if previous is None:
+            # As telas carregam a fila inicial pela página; daqui em diante só as diferenças
+            return []
+
+        published = []
+        for order_id, order in orders.items():
+            state = previous.get(order_id)
+            if state is None:
+                event_type = "created" if not order.get("version") else "updated"
+                published.append(bus.publish(event_type, kitchen_order(order)))
+            elif state != self._snapshot[order_id]:
+                published.append(bus.publish("updated", kitchen_order(order)))
+
+        # Pedidos que saíram da fila: mudaram para um status final ou foram excluídos
+        gone = [order_id for order_id in previous if order_id not in orders]
+        if gone:
+            found = {order["_id"]: order for order in orders_col.find({"_id": {"$in": gone}}, {"status": 1, "version": 1})}
+            for order_id in gone:
+                if order_id in found:
+                    published.append(bus.publish("updated", kitchen_order(found[order_id])))
+                else:
+                    published.append(bus.publish("deleted", kitchen_order({"_id": order_id, "status": "deleted"})))
+        return published
+
+def poll_order_changes(poller=None):
+    """Publica no barramento as alterações da fila da cozinha, consultada a cada POLL_INTERVAL"""
+    poller = poller or ActiveOrdersPoller()
+    while True:
+        # Sem telas conectadas não há por que consultar o banco; a próxima consulta
+        # publica tudo o que mudou nesse intervalo (aplicar de novo é inofensivo na tela)
+        if bus.subscriber_count() or poller.idle():
+            try:
+                poller.poll()
+            except PyMongoError as e:
+                print(f"⚠️ Consulta da fila da cozinha falhou: {e}")
+        time.sleep(POLL_INTERVAL)
+
+# Processo em que a fonte de eventos foi iniciada: threads não sobrevivem ao fork dos workers
+_watcher_pid = None
+
+def ensure_order_watcher():
+    """Inicia a fonte de eventos (poll ou change stream) uma vez por processo"""
+    global _watcher_pid
+    if EVENT_SOURCE == "memory" or _watcher_pid == os.getpid():
+        return
+    _watcher_pid = os.getpid()
+    target = watch_order_changes if EVENT_SOURCE == "change_stream" else poll_order_changes
+    threading.Thread(target=target, name="order-watcher", daemon=True).start()
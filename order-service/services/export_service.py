@@ -0,0 +1,159 @@
+# Exportação de pedidos em NDJSON ou CSV
+#
+# Os pedidos são lidos de um cursor do MongoDB (projeção + batch_size) e convertidos
+# linha a linha por geradores: nem a rota nem o comando montam a lista completa, então
+# o uso de memória não depende do tamanho da exportação.
+#
+#     python -m services.export_service --format csv --from 2026-01-01 --to 2026-01-31 --status completed -o pedidos.csv
+
+from config.database import get_db
+from datetime import datetime, timedelta
+import argparse
+import csv
+import heapq
+import io
+import json
+import os
+import sys
+
+db = get_db()
+orders_col = db["orders"]
+archive_col = db["orders_archive"]
+
+EXPORT_BATCH_SIZE = int(os.getenv("ORDER_EXPORT_BATCH_SIZE", "1000"))
+EXPORT_PROJECTION = {
+    "user_email": 1, "user_id": 1, "items": 1, "total": 1,
+    "status": 1, "created_at": 1, "updated_at": 1
+}
+CSV_COLUMNS = ["id", "user_email", "user_id", "status", "total", "items_count", "items", "created_at", "updated_at"]
+
+def _parse_date(value, end=False):
+    """Data ISO (AAAA-MM-DD ou com horário); uma data final sem horário inclui o dia inteiro"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Data inválida: '{value}' (use AAAA-MM-DD)")
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def build_export_query(start=None, end=None, status=None):
+    """Filtro do MongoDB por intervalo de created_at [start, end) e status (separados por vírgula)"""
+    query = {}
+    created_at = {}
+    if start:
+        created_at["$gte"] = _parse_date(start)
+    if end:
+        created_at["$lt"] = _parse_date(end, end=True)
+    if created_at:
+        query["created_at"] = created_at
+    statuses = [value.strip() for value in (status or "").split(",") if value.strip()]
+    if statuses:
+        query["status"] = statuses[0] if len(statuses) == 1 else {"$in": statuses}
+    return query
+
+def _sort_key(order):
+    return (order.get("created_at") or datetime.min, order["_id"])
+
+def iter_orders(query):
+    """Percorre os pedidos (inclusive os arquivados) em ordem de criação, EXPORT_BATCH_SIZE documentos por vez"""
+    cursors = [
+        col.find(query, EXPORT_PROJECTION).sort([("created_at", 1), ("_id", 1)]).batch_size(EXPORT_BATCH_SIZE)
+        for col in (orders_col, archive_col)
+    ]
+    try:
+        # As duas coleções já vêm ordenadas: o merge mantém só um documento de cada em memória
+        last_id = None
+        for order in heapq.merge(*cursors, key=_sort_key):
+            # Pedido nas duas coleções (arquivamento interrompido) sai uma vez só
+            if order["_id"] != last_id:
+                last_id = order["_id"]
+                yield order
+    finally:
+        # Cliente que desconecta no meio do download não deixa o cursor aberto no servidor
+        for cursor in cursors:
+            cursor.close()
+
+def _isoformat(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+def export_row(order):
+    """Linha exportada de um pedido (datas em ISO 8601)"""
+    return {
+        "id": str(order["_id"]),
+        "user_email": order.get("user_email"),
+        "user_id": order.get("user_id"),
+        "status": order.get("status", "pending"),
+        "total": order.get("total", 0.0),
+        "items": order.get("items", []),
+        "created_at": _isoformat(order.get("created_at")),
+        "updated_at": _isoformat(order.get("updated_at"))
+    }
+
+def iter_ndjson(orders):
+    """Um objeto JSON por linha"""
+    for order in orders:
+        yield json.dumps(export_row(order), ensure_ascii=False, default=str) + "\n"
+
+def iter_csv(orders):
+    """CSV com cabeçalho; os itens ficam resumidos em uma coluna ("2x Burger; 1x Fritas")"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writeheader()
+    yield flush()
+    for order in orders:
+        row = export_row(order)
+        items = row["items"]
+        row["items_count"] = len(items)
+        row["items"] = "; ".join(f"{item.get('quantity')}x {item.get('name')}" for item in items)
+        writer.writerow(row)
+        yield flush()
+
+# formato -> (gerador, content type, extensão)
+EXPORT_FORMATS = {
+    "ndjson": (iter_ndjson, "application/x-ndjson", "ndjson"),
+    "csv": (iter_csv, "text/csv; charset=utf-8", "csv"),
+}
+
+def export_orders(fmt="ndjson", start=None, end=None, status=None):
+    """Valida os filtros e retorna (gerador de trechos, content type, extensão); levanta ValueError"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato inválido: '{fmt}' (use {', '.join(EXPORT_FORMATS)})")
+    serializer, content_type, extension = EXPORT_FORMATS[fmt]
+    query = build_export_query(start, end, status)
+    return serializer(iter_orders(query)), content_type, extension
+
+def main(argv=None):
+    """Ponto de entrada do comando de exportação"""
+    parser = argparse.ArgumentParser(description="Exporta pedidos em NDJSON ou CSV")
+    parser.add_argument("--format", default="ndjson", choices=sorted(EXPORT_FORMATS))
+    parser.add_argument("--from", dest="start", help="data inicial (AAAA-MM-DD)")
+    parser.add_argument("--to", dest="end", help="data final, inclusiva (AAAA-MM-DD)")
+    parser.add_argument("--status", help="status separados por vírgula")
+    parser.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        chunks, _, _ = export_orders(args.format, args.start, args.end, args.status)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# Chaves de idempotência para a criação de pedidos
+#
+# O cliente envia uma chave única por tentativa lógica (header Idempotency-Key ou
+# campo idempotency_key do formulário). A primeira requisição reserva a chave com um
+# único upsert indexado (_id) e grava a resposta ao terminar; repetições com a mesma
+# chave recebem a resposta original em vez de criar outro pedido. As chaves expiram
+# pelo índice TTL de created_at (config/indexes.py).
+#
+# A reserva vale por IDEMPOTENCY_LEASE segundos (lease_until). Se o processo morrer no
+# meio da requisição, a chave não fica presa como "pending" até o TTL: depois do prazo
+# a próxima tentativa com o mesmo conteúdo assume a reserva e executa de novo. O prazo
+# precisa ser maior que a duração máxima de uma requisição (GUNICORN_TIMEOUT).
+
+from config.database import get_db
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import hashlib
+import json
+import os
+import re
+
+db = get_db()
+idempotency_col = db["order_idempotency"]
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_FIELD = "idempotency_key"
+KEY_PATTERN = re.compile(r"^[A-Za-z0-9_.:-]{8,128}$")
+IDEMPOTENCY_LEASE = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+
+def fingerprint(payload):
+    """Hash do conteúdo da requisição: a mesma chave não pode ser reutilizada com outro pedido"""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def _lease_expired(record, now):
+    """True se a reserva pendente passou do prazo (o processo que a fez provavelmente morreu)"""
+    return record["lease_until"] <= now
+
+def claim(key, request_hash):
+    """Reserva a chave; retorna None se é a primeira vez (ou a reserva anterior expirou), ou o registro já existente"""
+    now = datetime.utcnow()
+    lease_until = now + timedelta(seconds=IDEMPOTENCY_LEASE)
+    try:
+        existing = idempotency_col.find_one_and_update(
+            {"_id": key},
+            {"$setOnInsert": {"state": "pending", "fingerprint": request_hash, "created_at": now, "lease_until": lease_until}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        # Duas requisições com a mesma chave ao mesmo tempo: o upsert da outra venceu
+        return idempotency_col.find_one({"_id": key}) or {"state": "pending", "fingerprint": request_hash}
+
+    if (existing is not None and existing.get("state") == "pending"
+            and existing.get("fingerprint") == request_hash and _lease_expired(existing, now)):
+        # Assume a reserva vencida; o filtro pelo prazo antigo garante um único sucessor
+        taken = idempotency_col.find_one_and_update(
+            {"_id": key, "state": "pending", "lease_until": existing["lease_until"]},
+            {"$set": {"lease_until": lease_until}}
+        )
+        if taken is not None:
+            return None
+    return existing
+
+def complete(key, response, status):
+    """Grava a resposta final para ser repetida nas próximas requisições com a chave"""
+    idempotency_col.update_one(
+        {"_id": key},
+        {"$set": {"state": "done", "response": response, "status": status, "completed_at": datetime.utcnow()}}
+    )
+
+def release(key):
+    """Libera a chave (falha temporária): uma nova tentativa pode executar de novo"""
+    idempotency_col.delete_one({"_id": key, "state": "pending"})
+
+def run_idempotent(key, payload, operation):
+    """Executa operation() -> (resposta, status) uma única vez por chave; retorna (resposta, status, repetida)"""
+    if not key:
+        response, status = operation()
+        return response, status, False
+    if not KEY_PATTERN.match(key):
+        return {"error": "Chave de idempotência inválida (8 a 128 caracteres: letras, números, _ . : -)"}, 400, False
+
+    request_hash = fingerprint(payload)
+    existing = claim(key, request_hash)
+    if existing is not None:
+        if existing.get("fingerprint") != request_hash:
+            return {"error": "Chave de idempotência já usada com outro pedido"}, 422, False
+        if existing.get("state") == "done":
+            return existing["response"], existing["status"], True
+        return {"error": "Pedido com esta chave ainda está sendo processado. Tente novamente em instantes."}, 409, False
+
+    try:
+        response, status = operation()
+    except Exception:
+        release(key)
+        raise
+    if status >= 500:
+        release(key)
+    else:
+        # Erros de validação (4xx) também são definitivos para esta chave
+        complete(key, response, status)
+    return response, status, False
@@ -1,11 +1,34 @@
 from config.database import get_db
-from models.order_model import serialize_order
+from models.order_model import serialize_order, serialize_order_summary, SUMMARY_PROJECTION, STATUS_TRANSITIONS, STATUS_LABELS, allowed_previous_statuses
+from services.pricing_service import load_price_table, price_order_items
+from services.stats_service import record_orders, record_status_change, record_status_changes
+from services import events
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+import base64
+import heapq
+import json
+import os
+import re
 
 db = get_db()
 orders_col = db["orders"]
 users_col = db["users"]  # Add reference to users collection
+archive_col = db["orders_archive"]  # Pedidos finalizados antigos (services/archive_service.py)
+
+# Paginação por cursor (keyset) sobre (created_at, _id), ambos decrescentes
+DEFAULT_PAGE_SIZE = int(os.getenv("ORDER_PAGE_SIZE", "20"))
+MAX_PAGE_SIZE = int(os.getenv("ORDER_MAX_PAGE_SIZE", "100"))
+ORDER_SORT = [("created_at", -1), ("_id", -1)]
+
+# Quantidade máxima de pedidos por chamada da importação em lote
+ORDER_BATCH_MAX_SIZE = int(os.getenv("ORDER_BATCH_MAX_SIZE", "500"))
+
+# Autocompletar de clientes por prefixo do email
+USER_SEARCH_LIMIT = int(os.getenv("USER_SEARCH_LIMIT", "10"))
+USER_SEARCH_MAX_LIMIT = 50
 
 def create_order(user_email, items, total):
     """Cria um novo pedido no banco de dados"""
@@ -14,61 +37,396 @@ def create_order(user_email, items, total):
     if not user:
         return {"error": f"Usuário com email '{user_email}' não encontrado. Verifique se o email está correto."}, 404
     
-    order = {
+    order = _new_order(user_email, user["_id"], items, total)
+    result = orders_col.insert_one(order)
+    order["_id"] = result.inserted_id
+    record_orders([order])
+    events.emit("created", order)
+    return {"message": "Pedido criado com sucesso", "order_id": str(result.inserted_id)}, 201
+
+def _new_order(user_email, user_id, items, total):
+    """Monta o documento de um novo pedido"""
+    now = datetime.utcnow()
+    return {
         "user_email": user_email,
-        "user_id": str(user["_id"]),  # Store user reference for future use
+        "user_id": str(user_id),  # Store user reference for future use
         "items": items,
         "total": total,
         "status": "pending",
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "version": 0,
+        "created_at": now,
+        "updated_at": now
     }
-    result = orders_col.insert_one(order)
-    return {"message": "Pedido criado com sucesso", "order_id": str(result.inserted_id)}, 201
+
+def create_orders_batch(orders):
+    """Cria vários pedidos com uma consulta de usuários e um insert_many; retorna o resultado de cada pedido"""
+    if not isinstance(orders, list) or not orders:
+        return {"error": "Envie uma lista de pedidos"}, 400
+    if len(orders) > ORDER_BATCH_MAX_SIZE:
+        return {"error": f"Máximo de {ORDER_BATCH_MAX_SIZE} pedidos por lote"}, 413
+
+    results = [None] * len(orders)
+    valid = []  # (índice no lote, pedido)
+    for index, order in enumerate(orders):
+        if (not isinstance(order, dict) or not isinstance(order.get("user_email"), str) or not order["user_email"]
+                or not isinstance(order.get("items"), list)):
+            results[index] = {"index": index, "status": 400, "error": "Pedido deve ter user_email e items"}
+        elif not all(isinstance(item, dict) and isinstance(item.get("product_id"), str) for item in order["items"]):
+            results[index] = {"index": index, "status": 400, "error": "Cada item deve ter um product_id (texto)"}
+        else:
+            valid.append((index, order))
+
+    # Todos os usuários e preços do lote são resolvidos de uma vez
+    emails = list({order["user_email"] for _, order in valid})
+    users = {user["email"]: user["_id"] for user in users_col.find({"email": {"$in": emails}}, {"email": 1})} if emails else {}
+    price_table = load_price_table([item["product_id"] for _, order in valid for item in order["items"]])
+
+    docs, doc_indexes = [], []
+    for index, order in valid:
+        user_id = users.get(order["user_email"])
+        if user_id is None:
+            results[index] = {"index": index, "status": 404, "error": f"Usuário com email '{order['user_email']}' não encontrado"}
+            continue
+        requested = [
+            {"product_id": item["product_id"], "quantity": item.get("quantity"), "expected_price": item.get("unit_price")}
+            for item in order["items"]
+        ]
+        priced, status = price_order_items(requested, price_table=price_table)
+        if status != 200:
+            results[index] = {"index": index, "status": status, "error": priced["error"]}
+            continue
+        doc = _new_order(order["user_email"], user_id, priced["items"], priced["total"])
+        doc["_id"] = ObjectId()  # id gerado no cliente para mapear o resultado de cada pedido
+        docs.append(doc)
+        doc_indexes.append(index)
+
+    failed_docs = {}
+    if docs:
+        # ordered=False: um pedido com erro não impede a gravação dos demais
+        try:
+            orders_col.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            failed_docs = {error["index"]: error.get("errmsg", "Erro ao gravar pedido") for error in e.details.get("writeErrors", [])}
+
+    inserted = []
+    for position, (index, doc) in enumerate(zip(doc_indexes, docs)):
+        if position in failed_docs:
+            results[index] = {"index": index, "status": 500, "error": failed_docs[position]}
+        else:
+            results[index] = {"index": index, "status": 201, "order_id": str(doc["_id"]), "total": doc["total"]}
+            inserted.append(doc)
+    record_orders(inserted)
+    for doc in inserted:
+        events.emit("created", doc)
+
+    created = sum(1 for result in results if result["status"] == 201)
+    summary = {"created": created, "failed": len(results) - created, "results": results}
+    return summary, 200 if created == len(results) else 207
 
 def get_order_by_id(order_id):
     """Busca um pedido pelo ID"""
     try:
-        order = orders_col.find_one({"_id": ObjectId(order_id)})
+        order_id = ObjectId(order_id)
+        order = orders_col.find_one({"_id": order_id})
         if order:
             return serialize_order(order)
+        # Pedido antigo já arquivado
+        order = archive_col.find_one({"_id": order_id})
+        if order:
+            return {**serialize_order(order), "archived": True}
         return None
     except:
         return None
 
-def get_orders_by_user(user_email):
-    """Busca todos os pedidos de um usuário"""
-    orders = orders_col.find({"user_email": user_email}).sort("created_at", -1)
-    return [serialize_order(order) for order in orders]
+def encode_cursor(order):
+    """Gera o token de cursor (opaco) a partir de um documento de pedido"""
+    created_at = order.get("created_at")
+    payload = {
+        "t": created_at.isoformat() if created_at else None,
+        "id": str(order["_id"])
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-def get_all_orders():
-    """Busca todos os pedidos"""
-    orders = orders_col.find().sort("created_at", -1)
-    return [serialize_order(order) for order in orders]
+def decode_cursor(token):
+    """Decodifica um token de cursor; levanta ValueError se for inválido"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        created_at = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+        return created_at, ObjectId(payload["id"])
+    except Exception:
+        raise ValueError("Cursor inválido")
 
-def update_order_status(order_id, status):
-    """Atualiza o status de um pedido"""
+def _clamp_page_size(page_size):
     try:
-        result = orders_col.update_one(
-            {"_id": ObjectId(order_id)},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
-        )
-        if result.modified_count > 0:
-            return {"message": "Status do pedido atualizado com sucesso"}, 200
+        page_size = int(page_size) if page_size else DEFAULT_PAGE_SIZE
+    except (ValueError, TypeError):
+        page_size = DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+def _keyset_filter(created_at, order_id, op):
+    """Filtro de pedidos estritamente antes ($lt) ou depois ($gt) da posição do cursor"""
+    return {"$or": [
+        {"created_at": {op: created_at}},
+        {"created_at": created_at, "_id": {op: order_id}}
+    ]}
+
+def _sort_key(order):
+    return (order.get("created_at") or datetime.min, order["_id"])
+
+def _merge_sorted(sources, sort, limit=None):
+    """Une resultados já ordenados de orders e orders_archive (um pedido em ambas aparece uma vez)"""
+    descending = sort[0][1] < 0
+    merged, seen = [], set()
+    for order in heapq.merge(*sources, key=_sort_key, reverse=descending):
+        if order["_id"] in seen:
+            continue
+        seen.add(order["_id"])
+        merged.append(order)
+        if limit is not None and len(merged) >= limit:
+            break
+    return merged
+
+def get_orders_page(user_email=None, cursor=None, direction="next", page_size=None, summary=False, epoch=False):
+    """Busca uma página de pedidos (mais recentes primeiro) usando paginação por cursor
+
+    Com summary=True só os campos das listagens são lidos do banco; com epoch=True as
+    datas saem em milissegundos desde 1970 (para APIs JSON).
+    """
+    page_size = _clamp_page_size(page_size)
+    query = {"user_email": user_email} if user_email else {}
+    backwards = direction == "prev" and bool(cursor)
+
+    if cursor:
+        try:
+            created_at, order_id = decode_cursor(cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        query = {"$and": [query, _keyset_filter(created_at, order_id, "$gt" if backwards else "$lt")]}
+
+    sort = [(field, -order) for field, order in ORDER_SORT] if backwards else ORDER_SORT
+    # Busca um item a mais para saber se existe outra página na mesma direção
+    projection = SUMMARY_PROJECTION if summary else None
+    docs = list(orders_col.find(query, projection).sort(sort).limit(page_size + 1))
+    if user_email:
+        # O histórico do cliente continua nos pedidos arquivados, com o mesmo cursor
+        archived = list(archive_col.find(query, projection).sort(sort).limit(page_size + 1))
+        if archived:
+            docs = _merge_sorted([docs, archived], sort, limit=page_size + 1)
+    has_more = len(docs) > page_size
+    docs = docs[:page_size]
+    if backwards:
+        docs.reverse()
+
+    serializer = serialize_order_summary if summary else serialize_order
+    if backwards:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(cursor)
+
+    return {
+        "orders": [serializer(order, epoch) for order in docs],
+        "page_size": page_size,
+        "next_cursor": encode_cursor(docs[-1]) if docs and has_next else None,
+        "prev_cursor": encode_cursor(docs[0]) if docs and has_prev else None
+    }, 200
+
+# Campos do pedido usados pelas estatísticas e pela fila da cozinha após uma transição
+TRANSITION_PROJECTION = {"user_email": 1, "items": 1, "status": 1, "total": 1, "created_at": 1, "version": 1}
+# Entradas temporárias de update_orders_status_bulk: {id da chamada, status de origem, nova versão}
+BULK_TRANSITIONS_FIELD = "bulk_transitions"
+
+def _parse_version(value):
+    """Versão esperada enviada pelo cliente (None quando não informada); levanta ValueError"""
+    if value in (None, ""):
+        return None
+    return int(value)
+
+def _transition_filter(id_filter, status, expected_status=None, expected_version=None):
+    """Filtro que só casa com pedidos em um status de origem válido (e na versão esperada)"""
+    from_statuses = allowed_previous_statuses(status)
+    if expected_status:
+        from_statuses = [expected_status] if expected_status in from_statuses else []
+    query = {"_id": id_filter, "status": {"$in": from_statuses}}
+    if expected_version is not None:
+        # Pedidos gravados antes do controle de versão não têm o campo (versão 0)
+        query["version"] = {"$in": [0, None]} if expected_version == 0 else expected_version
+    return query
+
+def _transition_failure(order, status, expected_status=None, expected_version=None):
+    """Explica por que a transição condicional não alterou o pedido (404 ou 409)"""
+    if order is None:
         return {"error": "Pedido não encontrado"}, 404
-    except:
+    current, version = order.get("status", "pending"), order.get("version", 0)
+    if (expected_version is not None and version != expected_version) or (expected_status and current != expected_status):
+        error = "O pedido foi alterado por outra pessoa. Recarregue e tente novamente."
+    else:
+        error = f"Não é possível mudar o status de '{STATUS_LABELS.get(current, current)}' para '{STATUS_LABELS.get(status, status)}'"
+    return {"error": error, "current_status": current, "version": version}, 409
+
+def update_order_status(order_id, status, expected_status=None, expected_version=None):
+    """Atualiza o status de um pedido respeitando a máquina de estados (atualização condicional)"""
+    if status not in STATUS_TRANSITIONS:
+        return {"error": f"Status inválido: '{status}'"}, 400
+    try:
+        order_id = ObjectId(order_id)
+        expected_version = _parse_version(expected_version)
+    except Exception:
         return {"error": "ID de pedido inválido"}, 400
 
-def get_all_users():
-    """Busca todos os usuários cadastrados para referência"""
-    users = users_col.find({}, {"email": 1, "name": 1, "_id": 0}).sort("email", 1)
+    # Uma única operação atômica: o filtro garante o status de origem (e a versão), então
+    # dois terminais alterando o mesmo pedido não sobrescrevem um ao outro. O documento
+    # anterior à alteração traz o status antigo usado pelas estatísticas.
+    previous = orders_col.find_one_and_update(
+        _transition_filter(order_id, status, expected_status, expected_version),
+        {"$set": {"status": status, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+        projection=TRANSITION_PROJECTION,
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
+        # Só no caminho de erro: descobre se o pedido não existe ou se houve conflito
+        current = orders_col.find_one({"_id": order_id}, {"status": 1, "version": 1})
+        return _transition_failure(current, status, expected_status, expected_version)
+
+    version = previous.get("version", 0) + 1
+    record_status_change(previous, status)
+    events.emit("updated", {**previous, "status": status, "version": version})
+    return {"message": "Status do pedido atualizado com sucesso", "status": status, "version": version}, 200
+
+def update_orders_status_bulk(transitions):
+    """Aplica várias transições [{order_id, status, expected_status?, expected_version?}] com um update_many por grupo"""
+    if not isinstance(transitions, list) or not transitions:
+        return {"error": "Envie uma lista de transições"}, 400
+    if len(transitions) > ORDER_BATCH_MAX_SIZE:
+        return {"error": f"Máximo de {ORDER_BATCH_MAX_SIZE} transições por lote"}, 413
+
+    results = [None] * len(transitions)
+    requested = {}  # ObjectId -> (índice, status, status esperado, versão esperada)
+    groups = {}  # (status, status esperado, versão esperada) -> [ObjectId]
+    for index, transition in enumerate(transitions):
+        transition = transition if isinstance(transition, dict) else {}
+        status = transition.get("status")
+        expected_status = transition.get("expected_status") or None
+        try:
+            order_id = ObjectId(transition.get("order_id"))
+            expected_version = _parse_version(transition.get("expected_version"))
+        except Exception:
+            results[index] = {"index": index, "status": 400, "error": "ID de pedido ou versão inválidos"}
+            continue
+        if not isinstance(status, str) or status not in STATUS_TRANSITIONS:
+            results[index] = {"index": index, "status": 400, "order_id": str(order_id), "error": f"Status inválido: '{status}'"}
+            continue
+        if expected_status is not None and not isinstance(expected_status, str):
+            results[index] = {"index": index, "status": 400, "order_id": str(order_id), "error": "expected_status deve ser um texto"}
+            continue
+        if order_id in requested:
+            results[index] = {"index": index, "status": 409, "order_id": str(order_id), "error": "Pedido repetido no lote"}
+            continue
+        requested[order_id] = (index, status, expected_status, expected_version)
+        groups.setdefault((status, expected_status, expected_version), []).append(order_id)
+
+    # Cada grupo é um update_many condicional (atômico por documento). A atualização em
+    # pipeline acrescenta ao pedido uma entrada desta chamada com o status de origem e a
+    # nova versão; só esta chamada a remove, então transições concorrentes (individuais
+    # ou de outro lote) não alteram o resultado lido de volta.
+    transition_id, now = ObjectId(), datetime.utcnow()
+    for (status, expected_status, expected_version), order_ids in groups.items():
+        version = {"$add": [{"$ifNull": ["$version", 0]}, 1]}
+        orders_col.update_many(
+            _transition_filter({"$in": order_ids}, status, expected_status, expected_version),
+            [{"$set": {
+                "status": status,
+                "updated_at": now,
+                "version": version,
+                BULK_TRANSITIONS_FIELD: {"$concatArrays": [
+                    {"$ifNull": [f"${BULK_TRANSITIONS_FIELD}", []]},
+                    [{"id": transition_id, "from": "$status", "version": version}]
+                ]}
+            }}]
+        )
+
+    order_ids = list(requested)
+    changed = {}  # ObjectId -> (pedido, entrada desta chamada)
+    if order_ids:
+        for order in orders_col.find({"_id": {"$in": order_ids}, f"{BULK_TRANSITIONS_FIELD}.id": transition_id},
+                                     {**TRANSITION_PROJECTION, BULK_TRANSITIONS_FIELD: 1}):
+            entry = next(item for item in order[BULK_TRANSITIONS_FIELD] if item["id"] == transition_id)
+            changed[order["_id"]] = (order, entry)
+        if changed:
+            _clear_bulk_transition(transition_id, list(changed))
+    unmatched = [order_id for order_id in order_ids if order_id not in changed]
+    current = {
+        order["_id"]: order for order in orders_col.find({"_id": {"$in": unmatched}}, {"status": 1, "version": 1})
+    } if unmatched else {}
+
+    applied = []  # (pedido com o status de origem, status aplicado, nova versão)
+    for order_id, (index, status, expected_status, expected_version) in requested.items():
+        if order_id in changed:
+            order, entry = changed[order_id]
+            # O resultado é o da transição desta chamada, mesmo que o pedido já tenha mudado de novo
+            applied.append(({**order, "status": entry["from"]}, status, entry["version"]))
+            results[index] = {"index": index, "status": 200, "order_id": str(order_id),
+                              "order_status": status, "version": entry["version"]}
+        else:
+            response, code = _transition_failure(current.get(order_id), status, expected_status, expected_version)
+            results[index] = {"index": index, "status": code, "order_id": str(order_id), **response}
+
+    record_status_changes([(order, status) for order, status, _ in applied])
+    for order, status, version in applied:
+        events.emit("updated", {**order, "status": status, "version": version})
+
+    updated = len(changed)
+    summary = {"updated": updated, "failed": len(results) - updated, "results": results}
+    return summary, 200 if updated == len(results) else 207
+
+def _clear_bulk_transition(transition_id, order_ids):
+    """Remove dos pedidos a entrada de uma chamada de update_orders_status_bulk (e o campo, se vazio)"""
+    remaining = {"$filter": {
+        "input": f"${BULK_TRANSITIONS_FIELD}",
+        "cond": {"$ne": ["$$this.id", transition_id]}
+    }}
+    orders_col.update_many(
+        {"_id": {"$in": order_ids}, f"{BULK_TRANSITIONS_FIELD}.id": transition_id},
+        [{"$set": {BULK_TRANSITIONS_FIELD: remaining}},
+         {"$set": {BULK_TRANSITIONS_FIELD: {"$cond": [
+             {"$eq": [f"${BULK_TRANSITIONS_FIELD}", []]}, "$$REMOVE", f"${BULK_TRANSITIONS_FIELD}"
+         ]}}}]
+    )
+
+def get_active_orders():
+    """Pedidos ainda em preparo (fila da cozinha), do mais antigo para o mais recente"""
+    orders = orders_col.find(
+        {"status": {"$in": list(events.ACTIVE_STATUSES)}},
+        {"user_email": 1, "items": 1, "status": 1, "total": 1, "created_at": 1, "version": 1}
+    ).sort("created_at", 1)
+    return [events.kitchen_order(order) for order in orders]
+
+def search_users(prefix, limit=None):
+    """Busca usuários cujo email começa com o prefixo informado (sem diferenciar maiúsculas)"""
+    prefix = (prefix or "").strip().lower()
+    if not prefix:
+        return []
+    try:
+        limit = int(limit) if limit else USER_SEARCH_LIMIT
+    except (ValueError, TypeError):
+        limit = USER_SEARCH_LIMIT
+    limit = max(1, min(limit, USER_SEARCH_MAX_LIMIT))
+    # Regex ancorada sem a opção "i" sobre o email em minúsculas (gravado pelo user-service):
+    # o MongoDB a converte em um intervalo do índice email_lower
+    users = users_col.find(
+        {"email_lower": {"$regex": "^" + re.escape(prefix)}},
+        {"email": 1, "name": 1, "_id": 0}
+    ).sort("email_lower", 1).limit(limit)
     return list(users)
 
 def delete_order(order_id):
     """Deleta um pedido"""
     try:
-        result = orders_col.delete_one({"_id": ObjectId(order_id)})
-        if result.deleted_count > 0:
+        order = orders_col.find_one_and_delete({"_id": ObjectId(order_id)})
+        if order:
+            record_orders([order], sign=-1)
+            events.emit("deleted", {"_id": order["_id"], "status": "deleted"})
             return {"message": "Pedido deletado com sucesso"}, 200
         return {"error": "Pedido não encontrado"}, 404
     except:
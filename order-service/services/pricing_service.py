@@ -0,0 +1,90 @@
+# Cálculo dos totais do pedido no servidor, com os preços da tabela local do catálogo
+# (product_client): nenhum preço enviado pelo formulário é usado no total.
+#
+# A tabela vem de /product/api/products, que só lista produtos disponíveis: um produto
+# indisponível é recusado como fora do cardápio. Os preços vêm de um catálogo com no
+# máximo PRODUCT_PRICE_MAX_AGE segundos (product_client).
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from services import product_client
+
+CENTS = Decimal("0.01")
+
+def _to_money(value):
+    return value.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+def _parse_quantity(value):
+    """Quantidade inteira positiva (int, 2.0 ou "2"); 0 para qualquer outro valor (2.5, "2.5", True...)"""
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, float):
+        return int(value) if value.is_integer() and value > 0 else 0
+    if isinstance(value, str):
+        value = value.strip()
+        return int(value) if value.isascii() and value.isdigit() else 0
+    return value if isinstance(value, int) and value > 0 else 0
+
+def _resolve(requested_items, table):
+    """Calcula os itens e o total com os preços da tabela; retorna (itens, total, erros)"""
+    items, errors = [], []
+    total = Decimal("0")
+
+    for requested in requested_items:
+        product_id = requested.get("product_id")
+        product = table.get(product_id)
+        if product is None:
+            errors.append(f"Produto '{requested.get('name') or product_id}' não encontrado no cardápio ou indisponível")
+            continue
+
+        quantity = _parse_quantity(requested.get("quantity"))
+        if quantity <= 0:
+            errors.append(f"Quantidade inválida para '{product['name']}'")
+            continue
+
+        unit_price = product["price"]
+        # O preço que o cliente viu (opcional) precisa bater com o atual: evita cobrar um valor diferente do exibido
+        expected = requested.get("expected_price")
+        if expected not in (None, ""):
+            try:
+                expected = _to_money(Decimal(str(expected)))
+            except InvalidOperation:
+                expected = None
+            if expected != _to_money(unit_price):
+                errors.append(f"O preço de '{product['name']}' mudou para R$ {_to_money(unit_price)}; revise o pedido")
+                continue
+
+        line_total = _to_money(unit_price * quantity)
+        items.append({
+            "product_id": product_id,
+            "name": product["name"],
+            "quantity": quantity,
+            "unit_price": float(unit_price),
+            "total": float(line_total)
+        })
+        total += line_total
+
+    return items, _to_money(total), errors
+
+def load_price_table(product_ids=()):
+    """Tabela de preços local; revalida o catálogo uma vez se algum dos ids não estiver nela"""
+    revision, table = product_client.get_price_table()
+    # Produto desconhecido pode ser só um cache desatualizado
+    if any(product_id not in table for product_id in product_ids):
+        revision, table = product_client.get_price_table(revalidate=True)
+    return revision, table
+
+def price_order_items(requested_items, price_table=None):
+    """Resolve os itens pedidos [{product_id, quantity, expected_price}] e calcula os totais no servidor"""
+    if not requested_items:
+        return {"error": "Adicione pelo menos um item ao pedido"}, 400
+
+    if price_table is None:
+        price_table = load_price_table([item.get("product_id") for item in requested_items])
+    revision, table = price_table
+
+    if not table:
+        return {"error": "Catálogo de produtos indisponível no momento. Tente novamente."}, 503
+    items, total, errors = _resolve(requested_items, table)
+    if errors:
+        return {"error": "; ".join(errors), "errors": errors}, 409
+    return {"items": items, "total": float(total), "catalog_revision": revision}, 200
@@ -0,0 +1,154 @@
+# Cliente HTTP do product-service com cache local do catálogo
+#
+# Usa uma única requests.Session (pool de conexões keep-alive) com timeouts de
+# conexão/leitura. Produtos e categorias ficam em cache por PRODUCT_CACHE_TTL
+# segundos; depois disso a resposta em cache continua sendo servida enquanto uma
+# revalidação com If-None-Match roda em segundo plano (stale-while-revalidate).
+# Se o product-service estiver fora do ar, a última cópia conhecida é usada.
+#
+# A tabela de preços dos pedidos é a exceção: ela nunca usa um catálogo com mais de
+# PRODUCT_PRICE_MAX_AGE segundos (padrão: PRODUCT_CACHE_TTL). Acima disso o catálogo é
+# revalidado na hora e, sem resposta do product-service, não há tabela (o pedido é
+# recusado com 503 em vez de cobrar um preço antigo).
+
+from collections import namedtuple
+from config.json_provider import loads as json_loads
+from decimal import Decimal
+from requests.adapters import HTTPAdapter
+import os
+import threading
+import time
+import requests
+
+PRODUCT_SERVICE_URL = os.getenv("PRODUCT_SERVICE_URL", "http://localhost:5003").rstrip("/")
+CONNECT_TIMEOUT = float(os.getenv("PRODUCT_SERVICE_CONNECT_TIMEOUT", "0.5"))
+READ_TIMEOUT = float(os.getenv("PRODUCT_SERVICE_READ_TIMEOUT", "2.0"))
+POOL_SIZE = int(os.getenv("PRODUCT_SERVICE_POOL_SIZE", "10"))
+CACHE_TTL = float(os.getenv("PRODUCT_CACHE_TTL", "30"))
+# Por quanto tempo uma cópia vencida ainda pode ser servida enquanto é revalidada
+STALE_TTL = float(os.getenv("PRODUCT_CACHE_STALE_TTL", "600"))
+# Idade máxima do catálogo usado para calcular o preço de um pedido
+PRICE_MAX_AGE = float(os.getenv("PRODUCT_PRICE_MAX_AGE", str(CACHE_TTL)))
+
+PRODUCTS_PATH = "/product/api/products"
+CATEGORIES_PATH = "/product/api/categories"
+
+CacheEntry = namedtuple("CacheEntry", ["data", "etag", "fetched_at"])
+
+def _create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+_session = _create_session()
+_cache = {}  # path -> CacheEntry
+_cache_lock = threading.Lock()
+_refreshing = set()  # paths com revalidação em segundo plano em andamento
+_price_table = (None, None, {})  # (lista de produtos de origem, revisão, tabela)
+
+def clear_cache():
+    """Descarta todas as respostas em cache"""
+    global _price_table
+    with _cache_lock:
+        _cache.clear()
+        _price_table = (None, None, {})
+
+def _fetch(path):
+    """Busca (ou revalida) um recurso do product-service e atualiza o cache"""
+    entry = _cache.get(path)
+    headers = {"If-None-Match": entry.etag} if entry and entry.etag else {}
+    response = _session.get(PRODUCT_SERVICE_URL + path, headers=headers,
+                            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+    if response.status_code == 304 and entry:
+        entry = entry._replace(fetched_at=time.monotonic())
+    elif response.status_code == 200:
+        # orjson decodifica o catálogo bem mais rápido que response.json()
+        entry = CacheEntry(json_loads(response.content), response.headers.get("ETag"), time.monotonic())
+    else:
+        response.raise_for_status()
+        raise requests.HTTPError(f"Resposta inesperada do product-service: {response.status_code}")
+
+    with _cache_lock:
+        _cache[path] = entry
+    return entry
+
+def _refresh_in_background(path):
+    """Revalida um recurso sem bloquear a requisição atual (uma revalidação por path)"""
+    with _cache_lock:
+        if path in _refreshing:
+            return
+        _refreshing.add(path)
+
+    def run():
+        try:
+            _fetch(path)
+        except (requests.RequestException, ValueError) as e:
+            print(f"Erro ao revalidar {path}: {e}")
+        finally:
+            with _cache_lock:
+                _refreshing.discard(path)
+
+    threading.Thread(target=run, name="product-client-refresh", daemon=True).start()
+
+def get_entry(path, revalidate=False, max_age=None):
+    """Retorna a entrada de cache de um recurso, buscando-o se necessário (ou None)
+
+    Com max_age (segundos) nunca retorna uma cópia mais antiga que isso: a cópia
+    vencida é revalidada na hora em vez de servida durante a revalidação.
+    """
+    entry = _cache.get(path)
+    age = time.monotonic() - entry.fetched_at if entry else None
+    fresh_ttl = CACHE_TTL if max_age is None else min(CACHE_TTL, max_age)
+
+    if entry and age < fresh_ttl and not revalidate:
+        return entry
+    if entry and age < STALE_TTL and not revalidate and max_age is None:
+        _refresh_in_background(path)
+        return entry
+
+    try:
+        return _fetch(path)
+    except (requests.RequestException, ValueError) as e:
+        print(f"Erro ao buscar {path}: {e}")
+        # Product-service fora do ar: a última cópia conhecida é melhor que nada (dentro do max_age)
+        if entry and (max_age is None or age <= max_age):
+            return entry
+        return None
+
+def get_products():
+    """Produtos disponíveis do product-service (cache local)"""
+    entry = get_entry(PRODUCTS_PATH)
+    return entry.data if entry else []
+
+def get_categories():
+    """Categorias do product-service (cache local)"""
+    entry = get_entry(CATEGORIES_PATH)
+    return entry.data if entry else []
+
+def get_price_table(revalidate=False):
+    """Tabela {product_id: {name, price (Decimal)}} dos produtos disponíveis e a revisão (ETag) do catálogo
+
+    O catálogo usado tem no máximo PRICE_MAX_AGE segundos; sem um catálogo recente
+    o retorno é (None, {}).
+    """
+    global _price_table
+    entry = get_entry(PRODUCTS_PATH, revalidate=revalidate, max_age=PRICE_MAX_AGE)
+    if not entry:
+        return None, {}
+
+    source, revision, table = _price_table
+    # A tabela só é reconstruída quando o catálogo muda (um 304 mantém a mesma lista)
+    if source is not entry.data:
+        table = {
+            product["id"]: {
+                "name": product["name"],
+                "price": Decimal(str(product["price"]))
+            }
+            for product in entry.data
+        }
+        revision = entry.etag
+        _price_table = (entry.data, revision, table)
+    return revision, table
@@ -0,0 +1,220 @@
+# Estatísticas pré-agregadas de pedidos (faturamento, pedidos por status e itens mais vendidos)
+#
+# Cada bucket da coleção order_stats é um contador incrementado junto com a escrita
+# do pedido (create/update_status/delete), então o dashboard lê poucos documentos em
+# vez de varrer a coleção orders. Se os contadores divergirem (falha entre as duas
+# escritas, alteração manual no banco), rebuild_stats() os recalcula com agregações:
+#
+# Pedidos cancelados não são vendas: só aparecem no bucket do seu status. Ao cancelar
+# um pedido, o faturamento do dia/hora e os itens vendidos dele são descontados.
+#
+#     python -m services.stats_service --rebuild
+
+from config.database import get_db
+from datetime import datetime, timedelta
+from pymongo import UpdateOne, ReplaceOne
+from pymongo.errors import PyMongoError
+import sys
+
+db = get_db()
+orders_col = db["orders"]
+stats_col = db["order_stats"]
+
+DAY_FORMAT = "%Y-%m-%d"
+HOUR_FORMAT = "%Y-%m-%dT%H"
+STATS_MAX_DAYS = 366
+STATS_MAX_TOP = 100
+# Status que não contam como venda (faturamento, dia/hora, itens e totais)
+NON_SALE_STATUSES = ("cancelled",)
+
+def _bucket_id(kind, key):
+    return f"{kind}:{key}"
+
+def _merge(deltas, more):
+    for bucket, values in more.items():
+        merged = deltas.setdefault(bucket, {})
+        for field, value in values.items():
+            merged[field] = merged.get(field, 0) + value
+    return deltas
+
+def _sale_deltas(order, sign=1):
+    """Incrementos dos buckets de venda (dia, hora e itens) de um pedido: {(kind, key): {campo: delta}}"""
+    deltas = {}
+
+    def add(kind, key, **values):
+        bucket = deltas.setdefault((kind, key), {})
+        for field, value in values.items():
+            bucket[field] = bucket.get(field, 0) + sign * value
+
+    total = float(order.get("total") or 0)
+    created_at = order.get("created_at")
+    if created_at:
+        add("day", created_at.strftime(DAY_FORMAT), orders=1, revenue=total)
+        add("hour", created_at.strftime(HOUR_FORMAT), orders=1, revenue=total)
+    for item in order.get("items") or []:
+        add("item", item.get("name"), quantity=int(item.get("quantity") or 0), revenue=float(item.get("total") or 0))
+    return deltas
+
+def _order_deltas(order, sign=1):
+    """Incrementos de cada bucket afetado por um pedido: {(kind, key): {campo: delta}}"""
+    status = order.get("status") or "pending"
+    total = float(order.get("total") or 0)
+    deltas = {} if status in NON_SALE_STATUSES else _sale_deltas(order, sign)
+    deltas[("status", status)] = {"orders": sign, "revenue": sign * total}
+    return deltas
+
+def _apply(deltas):
+    """Aplica os incrementos com um único bulk_write (upsert por bucket)"""
+    if not deltas:
+        return
+    operations = [
+        UpdateOne(
+            {"_id": _bucket_id(kind, key)},
+            {"$inc": values, "$set": {"kind": kind, "key": key, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        for (kind, key), values in deltas.items()
+    ]
+    try:
+        stats_col.bulk_write(operations, ordered=False)
+    except PyMongoError as e:
+        # O pedido já foi gravado: a estatística é corrigida no próximo rebuild
+        print(f"⚠️ Erro ao atualizar estatísticas de pedidos: {e}")
+
+def record_orders(orders, sign=1):
+    """Soma (sign=1) ou subtrai (sign=-1) pedidos dos contadores"""
+    deltas = {}
+    for order in orders:
+        _merge(deltas, _order_deltas(order, sign))
+    _apply(deltas)
+
+def record_status_changes(changes):
+    """Move pedidos [(documento antes da alteração, novo status)] entre os buckets de status
+
+    O documento precisa de total, created_at e items: ao entrar em (ou sair de) um
+    status que não é venda, o pedido é descontado dos (ou devolvido aos) buckets de venda.
+    """
+    deltas = {}
+    for order, new_status in changes:
+        old_status = order.get("status") or "pending"
+        if old_status == new_status:
+            continue
+        total = float(order.get("total") or 0)
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            bucket = deltas.setdefault(("status", status), {"orders": 0, "revenue": 0})
+            bucket["orders"] += sign
+            bucket["revenue"] += sign * total
+        was_sale, is_sale = old_status not in NON_SALE_STATUSES, new_status not in NON_SALE_STATUSES
+        if was_sale != is_sale:
+            _merge(deltas, _sale_deltas(order, 1 if is_sale else -1))
+    _apply(deltas)
+
+def record_status_change(order, new_status):
+    """Move um pedido (documento antes da alteração) do bucket do status antigo para o novo"""
+    record_status_changes([(order, new_status)])
+
+def _clamp(value, default, maximum):
+    try:
+        value = int(value) if value else default
+    except (ValueError, TypeError):
+        value = default
+    return max(1, min(value, maximum))
+
+def _bucket_values(doc):
+    values = {"orders": doc.get("orders", 0), "revenue": round(doc.get("revenue", 0), 2)}
+    if doc.get("kind") == "item":
+        values = {"quantity": doc.get("quantity", 0), "revenue": values["revenue"]}
+    return {"key": doc["key"], **values}
+
+def get_stats(days=None, hours=None, top=None):
+    """Faturamento por dia/hora, pedidos por status e itens mais vendidos (lidos dos buckets)"""
+    days = _clamp(days, 30, STATS_MAX_DAYS)
+    hours = _clamp(hours, 24, STATS_MAX_DAYS * 24)
+    top = _clamp(top, 10, STATS_MAX_TOP)
+    now = datetime.utcnow()
+
+    def since(kind, key):
+        return stats_col.find({"kind": kind, "key": {"$gte": key}}).sort("key", 1)
+
+    by_day = [_bucket_values(doc) for doc in since("day", (now - timedelta(days=days - 1)).strftime(DAY_FORMAT))]
+    by_hour = [_bucket_values(doc) for doc in since("hour", (now - timedelta(hours=hours - 1)).strftime(HOUR_FORMAT))]
+    by_status = {doc["key"]: _bucket_values(doc) for doc in stats_col.find({"kind": "status"})}
+    top_items = [_bucket_values(doc) for doc in stats_col.find({"kind": "item"}).sort("quantity", -1).limit(top)]
+
+    sales = [bucket for status, bucket in by_status.items() if status not in NON_SALE_STATUSES]
+    return {
+        "totals": {
+            "orders": sum(bucket["orders"] for bucket in sales),
+            "revenue": round(sum(bucket["revenue"] for bucket in sales), 2),
+        },
+        "by_status": {status: {"orders": bucket["orders"], "revenue": bucket["revenue"]} for status, bucket in by_status.items()},
+        "by_day": by_day,
+        "by_hour": by_hour,
+        "top_items": top_items,
+    }
+
+# Agregações que recalculam cada tipo de bucket a partir de orders (os pedidos
+# arquivados em orders_archive continuam fazendo parte das estatísticas)
+ARCHIVE_UNION = {"$unionWith": "orders_archive"}
+ONLY_SALES = {"$match": {"status": {"$nin": list(NON_SALE_STATUSES)}}}
+REBUILD_PIPELINES = {
+    "day": [
+        ARCHIVE_UNION,
+        ONLY_SALES,
+        {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                    "orders": {"$sum": 1}, "revenue": {"$sum": "$total"}}},
+    ],
+    "hour": [
+        ARCHIVE_UNION,
+        ONLY_SALES,
+        {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%dT%H", "date": "$created_at"}},
+                    "orders": {"$sum": 1}, "revenue": {"$sum": "$total"}}},
+    ],
+    "status": [
+        ARCHIVE_UNION,
+        {"$group": {"_id": {"$ifNull": ["$status", "pending"]}, "orders": {"$sum": 1}, "revenue": {"$sum": "$total"}}},
+    ],
+    "item": [
+        ARCHIVE_UNION,
+        ONLY_SALES,
+        {"$unwind": "$items"},
+        {"$group": {"_id": "$items.name", "quantity": {"$sum": "$items.quantity"}, "revenue": {"$sum": "$items.total"}}},
+    ],
+}
+
+def rebuild_stats():
+    """Recalcula todos os buckets a partir dos pedidos e remove os que não existem mais"""
+    now = datetime.utcnow()
+    operations, bucket_ids = [], []
+    for kind, pipeline in REBUILD_PIPELINES.items():
+        for row in orders_col.aggregate(pipeline, allowDiskUse=True):
+            if row["_id"] is None:
+                continue
+            bucket_id = _bucket_id(kind, row["_id"])
+            values = {field: value for field, value in row.items() if field != "_id"}
+            operations.append(ReplaceOne(
+                {"_id": bucket_id},
+                {"kind": kind, "key": row["_id"], **values, "updated_at": now},
+                upsert=True
+            ))
+            bucket_ids.append(bucket_id)
+
+    if operations:
+        stats_col.bulk_write(operations, ordered=False)
+    removed = stats_col.delete_many({"_id": {"$nin": bucket_ids}}).deleted_count
+    return {"buckets": len(bucket_ids), "removed": removed}
+
+def main(argv=None):
+    """Ponto de entrada do comando de estatísticas"""
+    argv = sys.argv[1:] if argv is None else argv
+    if "--rebuild" in argv:
+        result = rebuild_stats()
+        print(f"✅ Estatísticas recalculadas: {result['buckets']} buckets ({result['removed']} removidos)")
+    stats = get_stats()
+    print(f"📊 {stats['totals']['orders']} pedidos, R$ {stats['totals']['revenue']:.2f}")
+    for status, bucket in stats["by_status"].items():
+        print(f"   {status}: {bucket['orders']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from services.archive_service import archive_orders, archive_query, ARCHIVABLE_STATUSES, main
+
+@pytest.fixture
+def mock_orders_col():
+    with patch('services.archive_service.orders_col') as mock:
+        yield mock
+
+@pytest.fixture
+def mock_archive_col():
+    with patch('services.archive_service.archive_col') as mock:
+        yield mock
+
+def batch(size):
+    return [{'_id': ObjectId(), 'status': 'completed', 'created_at': datetime(2025, 1, 1)} for _ in range(size)]
+
+class TestArchiveService:
+
+    def test_archivable_statuses_are_final(self):
+        assert ARCHIVABLE_STATUSES == ['completed', 'cancelled']
+
+    def test_archive_query(self):
+        now = datetime(2026, 4, 1)
+
+        query = archive_query(30, now=now)
+
+        assert query == {'status': {'$in': ['completed', 'cancelled']}, 'created_at': {'$lt': now - timedelta(days=30)}}
+
+    def test_archive_orders_in_batches(self, mock_orders_col, mock_archive_col):
+        batches = [batch(2), batch(1)]
+        mock_orders_col.find.return_value.sort.return_value.limit.side_effect = batches
+        mock_orders_col.delete_many.side_effect = [MagicMock(deleted_count=2), MagicMock(deleted_count=1)]
+
+        result = archive_orders(batch_size=2)
+
+        assert result == {'archived': 3, 'batches': 2}
+        assert mock_archive_col.insert_many.call_count == 2
+        first_ids = [doc['_id'] for doc in batches[0]]
+        assert mock_orders_col.delete_many.call_args_list[0].args[0] == {
+            '_id': {'$in': first_ids}, 'status': {'$in': ['completed', 'cancelled']}
+        }
+
+    def test_archive_orders_nothing_to_do(self, mock_orders_col, mock_archive_col):
+        mock_orders_col.find.return_value.sort.return_value.limit.return_value = []
+
+        assert archive_orders() == {'archived': 0, 'batches': 0}
+        mock_archive_col.insert_many.assert_not_called()
+
+    def test_archive_orders_max_batches(self, mock_orders_col, mock_archive_col):
+        mock_orders_col.find.return_value.sort.return_value.limit.return_value = batch(2)
+        mock_orders_col.delete_many.return_value = MagicMock(deleted_count=2)
+
+        assert archive_orders(batch_size=2, max_batches=1) == {'archived': 2, 'batches': 1}
+
+    def test_archive_orders_ignores_already_archived(self, mock_orders_col, mock_archive_col):
+        mock_orders_col.find.return_value.sort.return_value.limit.side_effect = [batch(1), []]
+        mock_orders_col.delete_many.return_value = MagicMock(deleted_count=1)
+        mock_archive_col.insert_many.side_effect = BulkWriteError({'writeErrors': [{'index': 0, 'code': 11000}]})
+
+        assert archive_orders(batch_size=5)['archived'] == 1
+
+    def test_archive_orders_other_write_error_keeps_orders(self, mock_orders_col, mock_archive_col):
+        mock_orders_col.find.return_value.sort.return_value.limit.return_value = batch(1)
+        mock_archive_col.insert_many.side_effect = BulkWriteError({'writeErrors': [{'index': 0, 'code': 121}]})
+
+        with pytest.raises(BulkWriteError):
+            archive_orders()
+        mock_orders_col.delete_many.assert_not_called()
+
+    def test_dry_run(self, mock_orders_col, mock_archive_col, capsys):
+        mock_orders_col.count_documents.return_value = 7
+
+        assert main(['--dry-run', '--days', '10']) == 0
+        assert '7 pedidos' in capsys.readouterr().out
+        mock_archive_col.insert_many.assert_not_called()
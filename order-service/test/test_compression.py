@@ -0,0 +1,113 @@
+import gzip
+import pytest
+from unittest.mock import MagicMock, patch
+from flask import Flask, Response, jsonify, url_for
+from config import compression
+from config.compression import init_compression, precompress_static
+
+CSS = b'body { background: #fff; }\n' * 40
+
+@pytest.fixture
+def app(tmp_path):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'styles.css').write_bytes(CSS)
+    (tmp_path / 'css' / 'small.css').write_bytes(b'p { margin: 0; }')
+    app = Flask(__name__, static_folder=str(tmp_path), static_url_path='/static')
+
+    @app.route('/big')
+    def big():
+        return jsonify(items=['x' * 50] * 50)
+
+    @app.route('/small')
+    def small():
+        return jsonify(ok=True)
+
+    @app.route('/stream')
+    def stream():
+        return Response((chunk for chunk in ['data: 1\n\n'] * 200), mimetype='text/event-stream')
+
+    @app.route('/etag')
+    def etag():
+        response = jsonify(items=['x' * 50] * 50)
+        response.set_etag('rev1')
+        return response
+
+    init_compression(app)
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+class TestCompression:
+
+    def test_gzip_large_json(self, client):
+        response = client.get('/big', headers={'Accept-Encoding': 'gzip, deflate'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data).startswith(b'{"items"')
+        assert int(response.headers['Content-Length']) == len(response.data)
+
+    def test_no_compression_without_accept_encoding(self, client):
+        response = client.get('/big')
+
+        assert 'Content-Encoding' not in response.headers
+        assert response.json['items']
+
+    def test_small_response_not_compressed(self, client):
+        response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+
+    def test_streamed_response_not_compressed(self, client):
+        response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+        assert response.data.startswith(b'data: 1')
+
+    def test_compressed_etag_is_weak(self, client):
+        response = client.get('/etag', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['ETag'] == 'W/"rev1"'
+
+    def test_brotli_preferred_when_available(self, client):
+        fake_brotli = MagicMock()
+        fake_brotli.compress.return_value = b'br-data'
+        with patch.object(compression, 'brotli', fake_brotli):
+            response = client.get('/big', headers={'Accept-Encoding': 'gzip, br'})
+
+        assert response.headers['Content-Encoding'] == 'br'
+        assert response.data == b'br-data'
+
+    def test_static_url_is_fingerprinted(self, app):
+        assets = app.extensions['compression']
+        with app.test_request_context():
+            url = url_for('static', filename='css/styles.css')
+
+        assert url == f"/static/css/styles.css?v={assets['css/styles.css'].version}"
+
+    def test_static_versioned_is_immutable_and_precompressed(self, app, client):
+        with app.test_request_context():
+            url = url_for('static', filename='css/styles.css')
+
+        response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == 200
+        assert 'immutable' in response.headers['Cache-Control']
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.data) == CSS
+        response.close()
+
+    def test_static_unversioned_short_cache(self, client):
+        response = client.get('/static/css/small.css', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Cache-Control'] == f'public, max-age={compression.STATIC_UNVERSIONED_MAX_AGE}'
+        # Abaixo do tamanho mínimo: servido como está
+        assert 'Content-Encoding' not in response.headers
+        assert response.data == b'p { margin: 0; }'
+        response.close()
+
+    def test_precompress_static_missing_folder(self):
+        assert precompress_static(None) == {}
+        assert precompress_static('/nao/existe') == {}
@@ -0,0 +1,146 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from datetime import datetime
+from bson import ObjectId
+from services import events
+from services.events import OrderEventBus, kitchen_order, CLOSED
+
+def sample_order(**fields):
+    order = {
+        '_id': ObjectId(),
+        'user_email': 'teste@email.com',
+        'items': [{'name': 'Burger', 'quantity': 2, 'unit_price': 10.0, 'total': 20.0}],
+        'total': 20.0,
+        'status': 'pending',
+        'created_at': datetime(2026, 1, 2, 10, 30)
+    }
+    order.update(fields)
+    return order
+
+class TestEvents:
+
+    def test_kitchen_order(self):
+        order = sample_order()
+
+        assert kitchen_order(order) == {
+            'id': str(order['_id']),
+            'user_email': 'teste@email.com',
+            'status': 'pending',
+            'items': [{'name': 'Burger', 'quantity': 2}],
+            'total': 20.0,
+            'version': 0,
+            'created_at': '2026-01-02T10:30:00'
+        }
+
+    def test_publish_to_subscribers(self):
+        bus = OrderEventBus()
+        first, second = bus.subscribe(), bus.subscribe()
+
+        event = bus.publish('created', {'id': '1'})
+
+        assert first.get_nowait() == event
+        assert second.get_nowait() == event
+        assert event['type'] == 'created'
+
+    def test_subscriber_limit(self):
+        bus = OrderEventBus(max_subscribers=1)
+
+        assert bus.subscribe() is not None
+        assert bus.subscribe() is None
+
+    def test_max_streams_leaves_threads_for_other_requests(self):
+        assert events.max_streams(4) == 2
+        assert events.max_streams(16) == 8
+        assert events.max_streams(4, configured=50) == 3
+        assert events.max_streams(8, configured=2) == 2
+        # Worker sync (uma thread): o SSE seguraria o processo inteiro
+        assert events.max_streams(1) == 0
+
+    def test_slow_subscriber_is_disconnected(self):
+        bus = OrderEventBus(queue_size=1)
+        subscriber = bus.subscribe()
+
+        bus.publish('created', {'id': '1'})
+        bus.publish('created', {'id': '2'})
+
+        assert bus.subscriber_count() == 0
+        assert subscriber.get_nowait() is CLOSED
+
+    @pytest.mark.parametrize('source', ['poll', 'memory'])
+    def test_emit_publishes_local_writes_immediately(self, source):
+        with patch.object(events, 'bus', OrderEventBus()) as bus, \
+             patch.object(events, 'EVENT_SOURCE', source):
+            subscriber = bus.subscribe()
+
+            events.emit('created', sample_order())
+
+            assert subscriber.get_nowait()['order']['items'] == [{'name': 'Burger', 'quantity': 2}]
+
+    def test_emit_skipped_with_change_stream(self):
+        with patch.object(events, 'bus', OrderEventBus()) as bus, \
+             patch.object(events, 'EVENT_SOURCE', 'change_stream'):
+            subscriber = bus.subscribe()
+
+            assert events.emit('created', sample_order()) is None
+            assert subscriber.empty()
+
+    def test_poller_publishes_differences(self):
+        kept, moved, removed, started = (sample_order(version=1), sample_order(), sample_order(), sample_order(status='preparing', version=1))
+        new = sample_order()
+        poller = events.ActiveOrdersPoller()
+
+        with patch.object(events, 'bus', OrderEventBus()), \
+             patch.object(events, 'orders_col') as mock_orders_col:
+            mock_orders_col.find.return_value = [kept, moved, removed, {**started, 'status': 'pending', 'version': 0}]
+            assert poller.poll() == []
+
+            def find(query, projection):
+                if 'status' in query:
+                    assert query == {'status': {'$in': ['pending', 'preparing']}}
+                    return [kept, started, new]
+                assert query == {'_id': {'$in': [moved['_id'], removed['_id']]}}
+                return [{'_id': moved['_id'], 'status': 'ready'}]
+            mock_orders_col.find.side_effect = find
+
+            published = poller.poll()
+
+        assert [(event['type'], event['order']['id'], event['order']['status']) for event in published] == [
+            ('updated', str(started['_id']), 'preparing'),
+            ('created', str(new['_id']), 'pending'),
+            ('updated', str(moved['_id']), 'ready'),
+            ('deleted', str(removed['_id']), 'deleted'),
+        ]
+
+    def test_poll_loop_skips_queries_without_subscribers(self):
+        poller = MagicMock()
+        poller.idle.side_effect = [True, False]
+
+        with patch.object(events, 'bus', OrderEventBus()), \
+             patch.object(events.time, 'sleep', side_effect=[None, StopIteration]):
+            with pytest.raises(StopIteration):
+                events.poll_order_changes(poller)
+
+        # Só a consulta de referência: sem telas conectadas a segunda é pulada
+        poller.poll.assert_called_once()
+
+    def test_ensure_order_watcher_starts_poller_once(self):
+        with patch.object(events, 'EVENT_SOURCE', 'poll'), \
+             patch.object(events, '_watcher_pid', None), \
+             patch.object(events.threading, 'Thread') as mock_thread:
+            events.ensure_order_watcher()
+            events.ensure_order_watcher()
+
+        mock_thread.assert_called_once()
+        assert mock_thread.call_args.kwargs['target'] is events.poll_order_changes
+
+    def test_publish_change(self):
+        order = sample_order(status='preparing')
+        with patch.object(events, 'bus', OrderEventBus()):
+            updated = events._publish_change({'operationType': 'update', 'documentKey': {'_id': order['_id']}, 'fullDocument': order})
+            deleted = events._publish_change({'operationType': 'delete', 'documentKey': {'_id': order['_id']}})
+            ignored = events._publish_change({'operationType': 'drop'})
+
+        assert updated['type'] == 'updated'
+        assert updated['order']['status'] == 'preparing'
+        assert deleted['order'] == kitchen_order({'_id': order['_id'], 'status': 'deleted'})
+        assert ignored is None
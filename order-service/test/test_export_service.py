@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import pytest
+from unittest.mock import patch
+from datetime import datetime
+from bson import ObjectId
+from services.export_service import (
+    build_export_query, export_orders, iter_csv, iter_ndjson, main, EXPORT_PROJECTION
+)
+
+def sample_order(**fields):
+    order = {
+        '_id': ObjectId(),
+        'user_email': 'teste@email.com',
+        'user_id': 'u1',
+        'items': [{'name': 'Burger', 'quantity': 2, 'unit_price': 10.0, 'total': 20.0}],
+        'total': 20.0,
+        'status': 'pending',
+        'created_at': datetime(2026, 1, 2, 10, 30),
+        'updated_at': datetime(2026, 1, 2, 11, 0)
+    }
+    order.update(fields)
+    return order
+
+@pytest.fixture
+def mock_orders_col():
+    with patch('services.export_service.orders_col') as mock:
+        yield mock
+
+@pytest.fixture(autouse=True)
+def mock_archive_col():
+    with patch('services.export_service.archive_col') as mock:
+        mock.find.return_value.sort.return_value.batch_size.return_value.__iter__.return_value = iter([])
+        yield mock
+
+class TestExportService:
+
+    def test_build_export_query(self):
+        query = build_export_query('2026-01-01', '2026-01-31', 'completed, cancelled')
+
+        assert query == {
+            'created_at': {'$gte': datetime(2026, 1, 1), '$lt': datetime(2026, 2, 1)},
+            'status': {'$in': ['completed', 'cancelled']}
+        }
+
+    def test_build_export_query_single_status_and_datetime(self):
+        query = build_export_query(end='2026-01-31T12:00', status='pending')
+
+        assert query == {'created_at': {'$lt': datetime(2026, 1, 31, 12, 0)}, 'status': 'pending'}
+
+    def test_build_export_query_invalid_date(self):
+        with pytest.raises(ValueError):
+            build_export_query(start='ontem')
+
+    def test_iter_ndjson(self):
+        order = sample_order()
+
+        lines = list(iter_ndjson([order]))
+
+        assert len(lines) == 1
+        row = json.loads(lines[0])
+        assert row['id'] == str(order['_id'])
+        assert row['created_at'] == '2026-01-02T10:30:00'
+
+    def test_iter_csv_one_chunk_per_row(self):
+        chunks = list(iter_csv([sample_order(), sample_order(status='completed')]))
+
+        assert len(chunks) == 3
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        assert rows[0]['items'] == '2x Burger'
+        assert rows[0]['items_count'] == '1'
+        assert rows[1]['status'] == 'completed'
+
+    def test_export_orders_uses_projection_and_batch_size(self, mock_orders_col):
+        cursor = mock_orders_col.find.return_value.sort.return_value.batch_size.return_value
+        cursor.__iter__.return_value = iter([sample_order()])
+
+        chunks, content_type, extension = export_orders('ndjson', status='pending')
+
+        mock_orders_col.find.assert_not_called()  # a consulta só roda quando a resposta é consumida
+        assert len(list(chunks)) == 1
+        mock_orders_col.find.assert_called_once_with({'status': 'pending'}, EXPORT_PROJECTION)
+        cursor.close.assert_called_once()
+        assert content_type == 'application/x-ndjson'
+        assert extension == 'ndjson'
+
+    def test_export_orders_invalid_format(self):
+        with pytest.raises(ValueError):
+            export_orders('xml')
+
+    def test_main_writes_file(self, mock_orders_col, tmp_path):
+        cursor = mock_orders_col.find.return_value.sort.return_value.batch_size.return_value
+        cursor.__iter__.return_value = iter([sample_order()])
+        output = tmp_path / 'pedidos.csv'
+
+        assert main(['--format', 'csv', '-o', str(output)]) == 0
+        assert output.read_text(encoding='utf-8').startswith('id,user_email')
+
+    def test_iter_orders_merges_archive(self, mock_orders_col, mock_archive_col):
+        old, duplicate, recent = (sample_order(created_at=datetime(2026, 1, day)) for day in (1, 2, 3))
+        mock_orders_col.find.return_value.sort.return_value.batch_size.return_value.__iter__.return_value = iter([duplicate, recent])
+        mock_archive_col.find.return_value.sort.return_value.batch_size.return_value.__iter__.return_value = iter([old, duplicate])
+
+        chunks, _, _ = export_orders('ndjson')
+
+        ids = [json.loads(line)['id'] for line in chunks]
+        assert ids == [str(old['_id']), str(duplicate['_id']), str(recent['_id'])]
@@ -0,0 +1,132 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta
+from services.idempotency_service import run_idempotent, fingerprint
+
+KEY = 'chave-de-teste-123'
+PAYLOAD = {'user_email': 'teste@email.com', 'items': [{'product_id': 'p1', 'quantity': 1}]}
+
+@pytest.fixture
+def mock_idempotency_col():
+    with patch('services.idempotency_service.idempotency_col') as mock:
+        yield mock
+
+class TestIdempotencyService:
+
+    def test_without_key_runs_operation(self, mock_idempotency_col):
+        operation = MagicMock(return_value=({'order_id': '1'}, 201))
+
+        assert run_idempotent(None, PAYLOAD, operation) == ({'order_id': '1'}, 201, False)
+        mock_idempotency_col.find_one_and_update.assert_not_called()
+
+    def test_first_request_claims_and_stores_response(self, mock_idempotency_col):
+        mock_idempotency_col.find_one_and_update.return_value = None
+        operation = MagicMock(return_value=({'order_id': '1'}, 201))
+
+        response, status, replayed = run_idempotent(KEY, PAYLOAD, operation)
+
+        assert (response, status, replayed) == ({'order_id': '1'}, 201, False)
+        query, update = mock_idempotency_col.find_one_and_update.call_args.args
+        assert query == {'_id': KEY}
+        assert update['$setOnInsert']['fingerprint'] == fingerprint(PAYLOAD)
+        assert mock_idempotency_col.find_one_and_update.call_args.kwargs['upsert'] is True
+        stored = mock_idempotency_col.update_one.call_args.args[1]['$set']
+        assert stored['response'] == {'order_id': '1'}
+        assert stored['status'] == 201
+
+    def test_repeat_replays_original_response(self, mock_idempotency_col):
+        mock_idempotency_col.find_one_and_update.return_value = {
+            '_id': KEY, 'state': 'done', 'fingerprint': fingerprint(PAYLOAD),
+            'response': {'order_id': '1'}, 'status': 201
+        }
+        operation = MagicMock()
+
+        assert run_idempotent(KEY, PAYLOAD, operation) == ({'order_id': '1'}, 201, True)
+        operation.assert_not_called()
+        mock_idempotency_col.find_one.assert_not_called()
+
+    def test_in_flight_request(self, mock_idempotency_col):
+        mock_idempotency_col.find_one_and_update.return_value = {
+            'state': 'pending', 'fingerprint': fingerprint(PAYLOAD), 'lease_until': datetime.utcnow() + timedelta(seconds=30)
+        }
+
+        _, status, _ = run_idempotent(KEY, PAYLOAD, MagicMock())
+
+        assert status == 409
+
+    def test_expired_lease_is_taken_over(self, mock_idempotency_col):
+        expired = datetime.utcnow() - timedelta(seconds=1)
+        mock_idempotency_col.find_one_and_update.side_effect = [
+            {'state': 'pending', 'fingerprint': fingerprint(PAYLOAD), 'lease_until': expired},
+            {'state': 'pending', 'fingerprint': fingerprint(PAYLOAD), 'lease_until': expired},
+        ]
+        operation = MagicMock(return_value=({'order_id': '1'}, 201))
+
+        assert run_idempotent(KEY, PAYLOAD, operation) == ({'order_id': '1'}, 201, False)
+        operation.assert_called_once()
+        query, update = mock_idempotency_col.find_one_and_update.call_args.args
+        assert query == {'_id': KEY, 'state': 'pending', 'lease_until': expired}
+        assert update['$set']['lease_until'] > datetime.utcnow()
+
+    def test_expired_lease_taken_by_another_request(self, mock_idempotency_col):
+        expired = datetime.utcnow() - timedelta(seconds=1)
+        record = {'state': 'pending', 'fingerprint': fingerprint(PAYLOAD), 'lease_until': expired}
+        mock_idempotency_col.find_one_and_update.side_effect = [record, None]
+        operation = MagicMock()
+
+        _, status, _ = run_idempotent(KEY, PAYLOAD, operation)
+
+        # Outra requisição renovou o prazo antes: o filtro pelo prazo antigo não casa mais
+        assert mock_idempotency_col.find_one_and_update.call_args.args[0]['lease_until'] == expired
+        assert status == 409
+        operation.assert_not_called()
+
+    def test_live_lease_is_not_taken_over(self, mock_idempotency_col):
+        mock_idempotency_col.find_one_and_update.return_value = {
+            'state': 'pending', 'fingerprint': fingerprint(PAYLOAD), 'lease_until': datetime.utcnow() + timedelta(seconds=30)
+        }
+
+        _, status, _ = run_idempotent(KEY, PAYLOAD, MagicMock())
+
+        assert status == 409
+        mock_idempotency_col.find_one_and_update.assert_called_once()
+
+    def test_key_reused_with_other_payload(self, mock_idempotency_col):
+        mock_idempotency_col.find_one_and_update.return_value = {'state': 'done', 'fingerprint': 'outro'}
+
+        _, status, _ = run_idempotent(KEY, PAYLOAD, MagicMock())
+
+        assert status == 422
+
+    def test_concurrent_upsert_race(self, mock_idempotency_col):
+        mock_idempotency_col.find_one_and_update.side_effect = DuplicateKeyError('E11000')
+        mock_idempotency_col.find_one.return_value = {'state': 'pending', 'fingerprint': fingerprint(PAYLOAD)}
+        operation = MagicMock()
+
+        _, status, _ = run_idempotent(KEY, PAYLOAD, operation)
+
+        assert status == 409
+        operation.assert_not_called()
+
+    def test_server_error_releases_key(self, mock_idempotency_col):
+        mock_idempotency_col.find_one_and_update.return_value = None
+
+        _, status, _ = run_idempotent(KEY, PAYLOAD, MagicMock(return_value=({'error': 'indisponível'}, 503)))
+
+        assert status == 503
+        mock_idempotency_col.delete_one.assert_called_once_with({'_id': KEY, 'state': 'pending'})
+        mock_idempotency_col.update_one.assert_not_called()
+
+    def test_exception_releases_key(self, mock_idempotency_col):
+        mock_idempotency_col.find_one_and_update.return_value = None
+
+        with pytest.raises(RuntimeError):
+            run_idempotent(KEY, PAYLOAD, MagicMock(side_effect=RuntimeError('falha')))
+        mock_idempotency_col.delete_one.assert_called_once()
+
+    def test_invalid_key(self, mock_idempotency_col):
+        _, status, _ = run_idempotent('curta', PAYLOAD, MagicMock())
+
+        assert status == 400
+        mock_idempotency_col.find_one_and_update.assert_not_called()
@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from pymongo.errors import OperationFailure
+from config import indexes
+from config.indexes import ensure_indexes, index_report, INDEX_SPECS
+
+@pytest.fixture(autouse=True)
+def reset_ensured():
+    with patch.object(indexes, '_ensured', set()):
+        yield
+
+class TestIndexes:
+
+    def test_ensure_indexes_creates_spec(self):
+        db = MagicMock()
+
+        created = ensure_indexes(db, ['users'])
+
+        assert created == ['users.email_unique', 'users.email_lower']
+        db['users'].create_index.assert_any_call([('email', 1)], name='email_unique', unique=True)
+        db['users'].create_index.assert_any_call([('email_lower', 1)], name='email_lower')
+
+    def test_ensure_indexes_is_idempotent(self):
+        db = MagicMock()
+
+        ensure_indexes(db, ['orders'])
+        ensure_indexes(db, ['orders'])
+
+        assert db['orders'].create_index.call_count == len(INDEX_SPECS['orders'])
+
+    def test_ensure_indexes_operation_failure(self):
+        db = MagicMock()
+        db['users'].create_index.side_effect = OperationFailure('duplicate key')
+
+        created = ensure_indexes(db, ['users'])
+
+        assert created == []
+
+    def test_index_report(self):
+        db = MagicMock()
+        col = db['users']
+        col.index_information.return_value = {
+            '_id_': {'key': [('_id', 1)]},
+            'name_1': {'key': [('name', 1)]}
+        }
+        col.aggregate.return_value = [
+            {'name': '_id_', 'accesses': {'ops': 0}},
+            {'name': 'name_1', 'accesses': {'ops': 0}}
+        ]
+
+        report = index_report(db, ['users'])
+
+        assert report['users']['missing'] == ['email_unique', 'email_lower']
+        assert report['users']['unused'] == ['name_1']
+        assert report['users']['unexpected'] == ['name_1']
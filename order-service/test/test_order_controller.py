@@ -1,7 +1,10 @@
 ﻿import pytest
 from unittest.mock import patch, MagicMock
 from flask import Flask
-from controllers.order_controller import order_bp
+from controllers.order_controller import order_bp, gather
+from services import events
+from config import auth
+import time
 
 @pytest.fixture
 def app():
@@ -15,35 +18,84 @@ def app():
 def client(app):
     return app.test_client()
 
+@pytest.fixture(autouse=True)
+def jwt_keys():
+    with patch.object(auth, 'JWT_KEYS', {'k1': 'chave-de-teste-com-pelo-menos-32-bytes'}), patch.object(auth, 'ACTIVE_KID', 'k1'):
+        yield
+    auth.clear_token_cache()
+
+def auth_headers(role='admin', **headers):
+    token = auth.encode_token({'email': 'admin@email.com', 'role': role})
+    return {'Authorization': f'Bearer {token}', **headers}
+
 class TestOrderController:
 
     @patch('controllers.order_controller.render_template')
     @patch('controllers.order_controller.redirect')
     @patch('controllers.order_controller.create_order')
-    @patch('controllers.order_controller.get_all_users')
+    @patch('controllers.order_controller.price_order_items')
     @patch('controllers.order_controller.get_products_from_service')
     @patch('controllers.order_controller.get_categories_from_service')
-    def test_create_order_post_success(self, mock_categories, mock_products, mock_users, mock_create, mock_redirect, mock_render, client):
+    def test_create_order_post_success(self, mock_categories, mock_products, mock_price, mock_create, mock_redirect, mock_render, client):
+        items = [{'product_id': 'p1', 'name': 'Burger', 'quantity': 2, 'unit_price': 10.0, 'total': 20.0}]
+        mock_price.return_value = ({'items': items, 'total': 20.0, 'catalog_revision': '"rev1"'}, 200)
         mock_create.return_value = ({'message': 'Pedido criado com sucesso'}, 201)
         mock_redirect.return_value = 'redirect_response'
 
         response = client.post('/order/create', data={
             'user_email': 'teste@email.com',
+            'item_id': ['p1'],
             'item_name': ['Burger'],
             'item_quantity': ['2'],
             'item_price': ['10.0']
         })
 
-        mock_create.assert_called_once()
+        mock_price.assert_called_once_with([
+            {'product_id': 'p1', 'name': 'Burger', 'quantity': '2', 'expected_price': '10.0'}
+        ])
+        mock_create.assert_called_once_with('teste@email.com', items, 20.0)
+        mock_redirect.assert_called()
+
+    @patch('controllers.order_controller.redirect')
+    @patch('controllers.order_controller.create_order')
+    @patch('controllers.order_controller.price_order_items')
+    def test_create_order_post_rejected_items(self, mock_price, mock_create, mock_redirect, client):
+        mock_price.return_value = ({'error': "Produto 'Burger' está indisponível"}, 409)
+        mock_redirect.return_value = 'redirect_response'
+
+        client.post('/order/create', data={
+            'user_email': 'teste@email.com',
+            'item_id': ['p1'],
+            'item_quantity': ['1']
+        })
+
+        mock_create.assert_not_called()
+        mock_redirect.assert_called()
+
+    @patch('controllers.order_controller.redirect')
+    @patch('controllers.order_controller.run_idempotent')
+    def test_create_order_post_idempotency_key(self, mock_idempotent, mock_redirect, client):
+        mock_idempotent.return_value = ({'message': 'Pedido criado com sucesso'}, 201, True)
+        mock_redirect.return_value = 'redirect_response'
+
+        client.post('/order/create', data={
+            'user_email': 'teste@email.com',
+            'idempotency_key': 'form-key-123',
+            'item_id': ['p1'],
+            'item_quantity': ['1']
+        }, headers={'Idempotency-Key': 'header-key-123'})
+
+        key, payload, _ = mock_idempotent.call_args.args
+        assert key == 'header-key-123'
+        assert payload['user_email'] == 'teste@email.com'
         mock_redirect.assert_called()
 
     @patch('controllers.order_controller.render_template')
     @patch('controllers.order_controller.redirect')
     @patch('controllers.order_controller.create_order')
-    @patch('controllers.order_controller.get_all_users')
     @patch('controllers.order_controller.get_products_from_service')
     @patch('controllers.order_controller.get_categories_from_service')
-    def test_create_order_post_no_items(self, mock_categories, mock_products, mock_users, mock_create, mock_redirect, mock_render, client):
+    def test_create_order_post_no_items(self, mock_categories, mock_products, mock_create, mock_redirect, mock_render, client):
         response = client.post('/order/create', data={
             'user_email': 'teste@email.com',
             'item_name': [],
@@ -55,11 +107,9 @@ class TestOrderController:
         mock_redirect.assert_called()
 
     @patch('controllers.order_controller.render_template')
-    @patch('controllers.order_controller.get_all_users')
     @patch('controllers.order_controller.get_products_from_service')
     @patch('controllers.order_controller.get_categories_from_service')
-    def test_create_order_get(self, mock_categories, mock_products, mock_users, mock_render, client):
-        mock_users.return_value = [{'email': 'teste@email.com', 'name': 'Teste'}]
+    def test_create_order_get(self, mock_categories, mock_products, mock_render, client):
         mock_products.return_value = []
         mock_categories.return_value = []
         mock_render.return_value = 'rendered_template'
@@ -68,11 +118,30 @@ class TestOrderController:
 
         assert response.status_code == 200
         mock_render.assert_called_once()
+        assert mock_render.call_args.kwargs['unavailable'] == []
+        assert len(mock_render.call_args.kwargs['idempotency_key']) == 32
+
+    @patch('controllers.order_controller.render_template')
+    @patch('controllers.order_controller.get_products_from_service')
+    @patch('controllers.order_controller.get_categories_from_service')
+    def test_create_order_get_partial_degradation(self, mock_categories, mock_products, mock_render, client):
+        mock_products.side_effect = Exception('product-service fora do ar')
+        mock_categories.return_value = ['Bebidas']
+        mock_render.return_value = 'rendered_template'
+
+        response = client.get('/order/create')
+
+        assert response.status_code == 200
+        kwargs = mock_render.call_args.kwargs
+        assert kwargs['products'] == []
+        assert kwargs['categories'] == ['Bebidas']
+        assert kwargs['unavailable'] == ['products']
 
     @patch('controllers.order_controller.render_template')
-    @patch('controllers.order_controller.get_all_orders')
-    def test_list_orders(self, mock_get_all, mock_render, client):
-        mock_get_all.return_value = [{'id': '123', 'user_email': 'teste@email.com'}]
+    @patch('controllers.order_controller.get_orders_page')
+    def test_list_orders(self, mock_get_page, mock_render, client):
+        mock_get_page.return_value = ({'orders': [{'id': '123', 'user_email': 'teste@email.com'}],
+                                       'page_size': 20, 'next_cursor': None, 'prev_cursor': None}, 200)
         mock_render.return_value = 'rendered_template'
 
         response = client.get('/order/list')
@@ -80,6 +149,48 @@ class TestOrderController:
         assert response.status_code == 200
         mock_render.assert_called_once()
 
+    @patch('controllers.order_controller.render_template')
+    @patch('controllers.order_controller.get_orders_page')
+    def test_list_orders_with_cursor(self, mock_get_page, mock_render, client):
+        mock_get_page.return_value = ({'orders': [], 'page_size': 5, 'next_cursor': None, 'prev_cursor': None}, 200)
+        mock_render.return_value = 'rendered_template'
+
+        response = client.get('/order/list?cursor=abc&direction=prev&page_size=5')
+
+        assert response.status_code == 200
+        mock_get_page.assert_called_once_with(summary=True, cursor='abc', direction='prev', page_size='5')
+
+    @patch('controllers.order_controller.redirect')
+    @patch('controllers.order_controller.get_orders_page')
+    def test_list_orders_invalid_cursor(self, mock_get_page, mock_redirect, client):
+        mock_get_page.return_value = ({'error': 'Cursor inválido'}, 400)
+        mock_redirect.return_value = 'redirect_response'
+
+        client.get('/order/list?cursor=invalido')
+
+        mock_redirect.assert_called()
+
+    @patch('controllers.order_controller.get_orders_page')
+    def test_api_orders(self, mock_get_page, client):
+        mock_get_page.return_value = ({'orders': [{'id': '123'}], 'page_size': 20,
+                                       'next_cursor': 'abc', 'prev_cursor': None}, 200)
+
+        response = client.get('/order/api/orders?user_email=teste@email.com')
+
+        assert response.status_code == 200
+        assert response.get_json()['next_cursor'] == 'abc'
+        assert mock_get_page.call_args.kwargs['user_email'] == 'teste@email.com'
+        assert mock_get_page.call_args.kwargs['summary'] is False
+
+    @patch('controllers.order_controller.get_orders_page')
+    def test_api_orders_summary_epoch(self, mock_get_page, client):
+        mock_get_page.return_value = ({'orders': [], 'page_size': 20, 'next_cursor': None, 'prev_cursor': None}, 200)
+
+        client.get('/order/api/orders?view=summary&epoch=1')
+
+        assert mock_get_page.call_args.kwargs['summary'] is True
+        assert mock_get_page.call_args.kwargs['epoch'] is True
+
     @patch('controllers.order_controller.render_template')
     @patch('controllers.order_controller.get_order_by_id')
     def test_order_details_found(self, mock_get_order, mock_render, client):
@@ -91,6 +202,16 @@ class TestOrderController:
         assert response.status_code == 200
         mock_render.assert_called_once()
 
+    @patch('controllers.order_controller.render_template')
+    @patch('controllers.order_controller.get_order_by_id')
+    def test_order_details_next_statuses(self, mock_get_order, mock_render, client):
+        mock_get_order.return_value = {'id': '123', 'status': 'preparing', 'version': 1}
+        mock_render.return_value = 'rendered_template'
+
+        client.get('/order/details/123')
+
+        assert mock_render.call_args.kwargs['next_statuses'] == ('ready', 'cancelled')
+
     @patch('controllers.order_controller.redirect')
     @patch('controllers.order_controller.get_order_by_id')
     def test_order_details_not_found(self, mock_get_order, mock_redirect, client):
@@ -102,9 +223,10 @@ class TestOrderController:
         mock_redirect.assert_called()
 
     @patch('controllers.order_controller.render_template')
-    @patch('controllers.order_controller.get_orders_by_user')
-    def test_user_orders(self, mock_get_by_user, mock_render, client):
-        mock_get_by_user.return_value = [{'id': '123', 'user_email': 'teste@email.com'}]
+    @patch('controllers.order_controller.get_orders_page')
+    def test_user_orders(self, mock_get_page, mock_render, client):
+        mock_get_page.return_value = ({'orders': [{'id': '123', 'user_email': 'teste@email.com'}],
+                                       'page_size': 20, 'next_cursor': None, 'prev_cursor': None}, 200)
         mock_render.return_value = 'rendered_template'
 
         response = client.get('/order/user/teste@email.com')
@@ -118,9 +240,9 @@ class TestOrderController:
         mock_update.return_value = ({'message': 'Status atualizado'}, 200)
         mock_redirect.return_value = 'redirect_response'
 
-        response = client.post('/order/update_status/123', data={'status': 'completed'})
+        response = client.post('/order/update_status/123', data={'status': 'completed', 'expected_version': '2'})
 
-        mock_update.assert_called_once_with('123', 'completed')
+        mock_update.assert_called_once_with('123', 'completed', expected_version='2')
         mock_redirect.assert_called()
 
     @patch('controllers.order_controller.redirect')
@@ -141,3 +263,148 @@ class TestOrderController:
 
         mock_delete.assert_called_once_with('123')
         mock_redirect.assert_called()
+
+    @patch('controllers.order_controller.search_users')
+    def test_api_search_users(self, mock_search, client):
+        mock_search.return_value = [{'email': 'teste@email.com', 'name': 'Teste'}]
+
+        response = client.get('/order/api/users/search?q=tes&limit=5')
+
+        assert response.status_code == 200
+        assert response.get_json() == [{'email': 'teste@email.com', 'name': 'Teste'}]
+        mock_search.assert_called_once_with('tes', '5')
+
+    @patch('controllers.order_controller.render_template')
+    @patch('controllers.order_controller.get_active_orders')
+    def test_kitchen_page(self, mock_active, mock_render, client):
+        mock_active.return_value = [{'id': 'abc123', 'status': 'pending', 'items': [], 'created_at': None}]
+        mock_render.return_value = 'kitchen'
+
+        response = client.get('/order/kitchen')
+
+        assert response.status_code == 200
+        mock_render.assert_called_once_with('kitchen.html', orders=mock_active.return_value,
+                                            active_statuses=('pending', 'preparing'))
+
+    def test_kitchen_stream(self, client):
+        bus = events.OrderEventBus()
+        with patch.object(events, 'bus', bus), patch.object(events, 'ensure_order_watcher') as mock_watcher:
+            response = client.get('/order/api/kitchen/stream', buffered=False)
+            chunks = iter(response.response)
+
+            assert response.mimetype == 'text/event-stream'
+            assert next(chunks) == b'retry: 3000\n\n'
+            mock_watcher.assert_called_once()
+            bus.publish('created', {'id': 'abc', 'status': 'pending'})
+            assert next(chunks) == b'id: 1\nevent: created\ndata: {"id": "abc", "status": "pending"}\n\n'
+
+            response.close()
+            assert bus.subscriber_count() == 0
+
+    def test_kitchen_stream_limit(self, client):
+        with patch.object(events, 'bus', events.OrderEventBus(max_subscribers=0)), \
+             patch.object(events, 'ensure_order_watcher') as mock_watcher:
+            response = client.get('/order/api/kitchen/stream')
+
+        assert response.status_code == 503
+        mock_watcher.assert_not_called()
+
+    @patch('controllers.order_controller.export_orders')
+    def test_api_export_orders_streams(self, mock_export, client):
+        mock_export.return_value = (iter(['id,status\r\n', '1,pending\r\n']), 'text/csv; charset=utf-8', 'csv')
+
+        response = client.get('/order/api/orders/export?format=csv&from=2026-01-01&status=pending', headers=auth_headers())
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.get_data(as_text=True) == 'id,status\r\n1,pending\r\n'
+        assert 'attachment; filename=pedidos-' in response.headers['Content-Disposition']
+        mock_export.assert_called_once_with('csv', '2026-01-01', None, 'pending')
+
+    @patch('controllers.order_controller.export_orders')
+    def test_api_export_orders_invalid_filter(self, mock_export, client):
+        mock_export.side_effect = ValueError('Data inválida')
+
+        response = client.get('/order/api/orders/export?from=ontem', headers=auth_headers())
+
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Data inválida'}
+
+    @patch('controllers.order_controller.get_stats')
+    def test_api_stats(self, mock_stats, client):
+        mock_stats.return_value = {'totals': {'orders': 1, 'revenue': 10.0}}
+
+        response = client.get('/order/api/stats?days=7&top=3', headers=auth_headers())
+
+        assert response.status_code == 200
+        assert response.get_json()['totals']['orders'] == 1
+        mock_stats.assert_called_once_with('7', None, '3')
+
+    @patch('controllers.order_controller.update_orders_status_bulk')
+    def test_api_update_orders_status(self, mock_bulk, client):
+        mock_bulk.return_value = ({'updated': 1, 'failed': 0, 'results': []}, 200)
+        transitions = [{'order_id': '123', 'status': 'ready'}]
+
+        response = client.post('/order/api/orders/status', json={'transitions': transitions}, headers=auth_headers())
+
+        assert response.status_code == 200
+        mock_bulk.assert_called_once_with(transitions)
+
+    @patch('controllers.order_controller.create_orders_batch')
+    def test_api_create_orders_batch(self, mock_batch, client):
+        mock_batch.return_value = ({'created': 1, 'failed': 1, 'results': []}, 207)
+        orders = [{'user_email': 'teste@email.com', 'items': [{'product_id': 'p1', 'quantity': 1}]}]
+
+        response = client.post('/order/api/orders/batch', json={'orders': orders}, headers=auth_headers('cliente'))
+
+        assert response.status_code == 207
+        mock_batch.assert_called_once_with(orders)
+        assert 'Idempotent-Replayed' not in response.headers
+
+    @patch('controllers.order_controller.run_idempotent')
+    def test_api_create_orders_batch_replayed(self, mock_idempotent, client):
+        mock_idempotent.return_value = ({'created': 1, 'failed': 0, 'results': []}, 200, True)
+
+        response = client.post('/order/api/orders/batch', json={'orders': []}, headers=auth_headers('cliente', **{'Idempotency-Key': 'lote-123456'}))
+
+        assert response.status_code == 200
+        assert response.headers['Idempotent-Replayed'] == 'true'
+        assert mock_idempotent.call_args.args[0] == 'lote-123456'
+
+class TestGather:
+
+    def test_gather_runs_concurrently(self):
+        def slow():
+            time.sleep(0.2)
+            return 'ok'
+
+        start = time.monotonic()
+        results, failed = gather({'a': (slow, None, 1), 'b': (slow, None, 1), 'c': (slow, None, 1)})
+
+        assert time.monotonic() - start < 0.5
+        assert results == {'a': 'ok', 'b': 'ok', 'c': 'ok'}
+        assert failed == []
+
+    def test_gather_timeout_uses_default(self):
+        results, failed = gather({
+            'lenta': (lambda: time.sleep(0.3) or 'tarde', [], 0.05),
+            'rapida': (lambda: 'ok', None, 1)
+        })
+
+        assert results == {'lenta': [], 'rapida': 'ok'}
+        assert failed == ['lenta']
+
+    @patch('controllers.order_controller.get_stats')
+    @patch('controllers.order_controller.update_orders_status_bulk')
+    @patch('controllers.order_controller.create_orders_batch')
+    def test_write_and_admin_apis_require_token(self, mock_batch, mock_bulk, mock_stats, client):
+        assert client.post('/order/api/orders/batch', json={'orders': []}).status_code == 401
+        assert client.post('/order/api/orders/status', json={'transitions': []}).status_code == 401
+        assert client.get('/order/api/stats', headers={'Authorization': 'Bearer a.b.c'}).status_code == 401
+        # Cliente autenticado não acessa as APIs administrativas
+        assert client.get('/order/api/stats', headers=auth_headers('cliente')).status_code == 403
+        assert client.get('/order/api/orders/export', headers=auth_headers('cliente')).status_code == 403
+        mock_batch.assert_not_called()
+        mock_bulk.assert_not_called()
+        mock_stats.assert_not_called()
+
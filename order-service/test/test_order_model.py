@@ -2,11 +2,54 @@ import unittest
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import datetime
+from bson import ObjectId
 from models import order_model
+from models.order_model import (
+    serialize_order, serialize_order_summary, format_datetime, to_epoch_ms, allowed_previous_statuses
+)
 
 class TestOrderModel(unittest.TestCase):
     def test_example(self):
         self.assertTrue(True)
 
+    def test_format_datetime(self):
+        self.assertEqual(format_datetime(datetime(2026, 3, 4, 5, 6, 59, 123)), '04/03/2026 05:06')
+        self.assertEqual(format_datetime(datetime(2026, 3, 4, 5, 6, 1)), '04/03/2026 05:06')
+        self.assertIsNone(format_datetime(None))
+        self.assertIsNone(format_datetime('2026-03-04'))
+
+    def test_format_datetime_matches_strftime(self):
+        dt = datetime(2026, 12, 31, 23, 59, 30)
+        self.assertEqual(format_datetime(dt), dt.strftime('%d/%m/%Y %H:%M'))
+
+    def test_to_epoch_ms(self):
+        self.assertEqual(to_epoch_ms(datetime(1970, 1, 1, 0, 0, 1, 500000)), 1500)
+        self.assertIsNone(to_epoch_ms(None))
+
+    def test_serialize_order(self):
+        order = {'_id': ObjectId(), 'user_email': 'teste@email.com', 'created_at': datetime(2026, 1, 2, 3, 4)}
+
+        result = serialize_order(order)
+
+        self.assertEqual(result['created_at'], order['created_at'])
+        self.assertEqual(result['created_at_formatted'], '02/01/2026 03:04')
+        self.assertIsNone(result['updated_at_formatted'])
+        self.assertEqual(result['status'], 'pending')
+        self.assertEqual(serialize_order(order, epoch=True)['created_at'], to_epoch_ms(order['created_at']))
+
+    def test_serialize_order_summary(self):
+        order = {'_id': ObjectId(), 'user_email': 'teste@email.com', 'total': 10.0, 'status': 'ready'}
+
+        result = serialize_order_summary(order)
+
+        self.assertEqual(set(result), {'id', 'user_email', 'total', 'status', 'version', 'created_at', 'created_at_formatted'})
+        self.assertEqual(result['status'], 'ready')
+
+    def test_allowed_previous_statuses(self):
+        self.assertEqual(allowed_previous_statuses('preparing'), ['pending'])
+        self.assertEqual(allowed_previous_statuses('cancelled'), ['pending', 'preparing', 'ready'])
+        self.assertEqual(allowed_previous_statuses('pending'), [])
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,9 +3,25 @@ from unittest.mock import patch, MagicMock
 from datetime import datetime
 from bson import ObjectId
 from services.order_service import (
-    create_order, get_order_by_id, get_orders_by_user,
-    get_all_orders, update_order_status, delete_order, get_all_users
+    create_order, get_order_by_id, update_order_status, delete_order,
+    get_orders_page, encode_cursor, decode_cursor, search_users,
+    create_orders_batch, get_active_orders, update_orders_status_bulk
 )
+from decimal import Decimal
+from models.order_model import SUMMARY_PROJECTION
+from pymongo.errors import BulkWriteError
+
+@pytest.fixture(autouse=True)
+def mock_stats_col():
+    with patch('services.stats_service.stats_col') as mock:
+        yield mock
+
+@pytest.fixture(autouse=True)
+def mock_archive_col():
+    with patch('services.order_service.archive_col') as mock:
+        mock.find_one.return_value = None
+        mock.find.return_value.sort.return_value.limit.return_value = []
+        yield mock
 
 @pytest.fixture
 def mock_orders_col():
@@ -64,46 +80,114 @@ class TestOrderService:
 
         assert order is None
 
+    def test_get_order_by_id_archived(self, mock_orders_col, mock_archive_col):
+        order_id = ObjectId()
+        mock_orders_col.find_one.return_value = None
+        mock_archive_col.find_one.return_value = {'_id': order_id, 'status': 'completed', 'created_at': datetime.utcnow()}
+
+        order = get_order_by_id(str(order_id))
+
+        assert order['id'] == str(order_id)
+        assert order['archived'] is True
+        mock_archive_col.find_one.assert_called_once_with({'_id': order_id})
+
     def test_get_order_by_id_invalid_id(self, mock_orders_col):
         order = get_order_by_id('invalid_id')
         assert order is None
 
-    def test_get_orders_by_user(self, mock_orders_col):
-        mock_orders_col.find.return_value.sort.return_value = [
-            {
-                '_id': ObjectId(),
-                'user_email': 'teste@email.com',
-                'items': [],
-                'total': 20.0,
-                'status': 'pending'
-            }
-        ]
+    def test_update_order_status_success(self, mock_orders_col):
+        mock_orders_col.find_one_and_update.return_value = {'_id': ObjectId(), 'status': 'pending', 'total': 20.0}
+
+        response, status = update_order_status(str(ObjectId()), 'completed')
+
+        assert status == 200
+        assert 'message' in response
+
+    def test_update_order_status_emits_event(self, mock_orders_col):
+        order_id = ObjectId()
+        mock_orders_col.find_one_and_update.return_value = {'_id': order_id, 'status': 'pending', 'total': 20.0, 'items': []}
+
+        with patch('services.order_service.events.emit') as mock_emit:
+            update_order_status(str(order_id), 'preparing')
+
+        mock_emit.assert_called_once_with('updated', {'_id': order_id, 'status': 'preparing', 'total': 20.0, 'items': [], 'version': 1})
+
+    def test_update_order_status_conditional_filter(self, mock_orders_col):
+        order_id = ObjectId()
+        mock_orders_col.find_one_and_update.return_value = {'_id': order_id, 'status': 'preparing', 'version': 3}
+
+        response, status = update_order_status(str(order_id), 'ready', expected_version='3')
+
+        assert status == 200
+        assert response['version'] == 4
+        query, update = mock_orders_col.find_one_and_update.call_args.args
+        assert query == {'_id': order_id, 'status': {'$in': ['preparing']}, 'version': 3}
+        assert update['$inc'] == {'version': 1}
+        assert '$unset' not in update
+        mock_orders_col.find_one.assert_not_called()
 
-        orders = get_orders_by_user('teste@email.com')
+    def test_update_order_status_legacy_version_zero(self, mock_orders_col):
+        mock_orders_col.find_one_and_update.return_value = {'_id': ObjectId(), 'status': 'pending'}
 
-        assert len(orders) == 1
-        assert orders[0]['user_email'] == 'teste@email.com'
+        update_order_status(str(ObjectId()), 'preparing', expected_version=0)
 
-    def test_get_all_orders(self, mock_orders_col):
+        query = mock_orders_col.find_one_and_update.call_args.args[0]
+        assert query['version'] == {'$in': [0, None]}
+
+    def test_update_order_status_invalid_transition(self, mock_orders_col):
+        mock_orders_col.find_one_and_update.return_value = None
+        mock_orders_col.find_one.return_value = {'_id': ObjectId(), 'status': 'completed', 'version': 4}
+
+        response, status = update_order_status(str(ObjectId()), 'preparing')
+
+        assert status == 409
+        assert response['current_status'] == 'completed'
+        assert 'Concluído' in response['error']
+
+    def test_update_order_status_version_conflict(self, mock_orders_col):
+        mock_orders_col.find_one_and_update.return_value = None
+        mock_orders_col.find_one.return_value = {'_id': ObjectId(), 'status': 'preparing', 'version': 5}
+
+        response, status = update_order_status(str(ObjectId()), 'ready', expected_version=4)
+
+        assert status == 409
+        assert response['version'] == 5
+        assert 'outra pessoa' in response['error']
+
+    def test_update_order_status_unknown_status(self, mock_orders_col):
+        response, status = update_order_status(str(ObjectId()), 'voando')
+
+        assert status == 400
+        mock_orders_col.find_one_and_update.assert_not_called()
+
+    def test_get_active_orders(self, mock_orders_col):
+        order_id = ObjectId()
         mock_orders_col.find.return_value.sort.return_value = [
-            {'_id': ObjectId(), 'user_email': 'user1@email.com', 'status': 'pending'},
-            {'_id': ObjectId(), 'user_email': 'user2@email.com', 'status': 'completed'}
+            {'_id': order_id, 'user_email': 'teste@email.com', 'items': [], 'total': 20.0, 'status': 'pending'}
         ]
 
-        orders = get_all_orders()
+        orders = get_active_orders()
 
-        assert len(orders) == 2
+        assert orders[0]['id'] == str(order_id)
+        query = mock_orders_col.find.call_args.args[0]
+        assert query == {'status': {'$in': ['pending', 'preparing']}}
+        mock_orders_col.find.return_value.sort.assert_called_once_with('created_at', 1)
 
-    def test_update_order_status_success(self, mock_orders_col):
-        mock_orders_col.update_one.return_value = MagicMock(modified_count=1)
+    def test_update_order_status_moves_stats_bucket(self, mock_orders_col, mock_stats_col):
+        mock_orders_col.find_one_and_update.return_value = {'_id': ObjectId(), 'status': 'pending', 'total': 20.0}
 
-        response, status = update_order_status(str(ObjectId()), 'completed')
+        update_order_status(str(ObjectId()), 'completed')
 
-        assert status == 200
-        assert 'message' in response
+        operations = mock_stats_col.bulk_write.call_args.args[0]
+        increments = {op._filter['_id']: op._doc['$inc'] for op in operations}
+        assert increments == {
+            'status:pending': {'orders': -1, 'revenue': -20.0},
+            'status:completed': {'orders': 1, 'revenue': 20.0},
+        }
 
     def test_update_order_status_not_found(self, mock_orders_col):
-        mock_orders_col.update_one.return_value = MagicMock(modified_count=0)
+        mock_orders_col.find_one_and_update.return_value = None
+        mock_orders_col.find_one.return_value = None
 
         response, status = update_order_status(str(ObjectId()), 'completed')
 
@@ -111,7 +195,7 @@ class TestOrderService:
         assert 'error' in response
 
     def test_update_order_status_invalid_id(self, mock_orders_col):
-        mock_orders_col.update_one.side_effect = Exception('Invalid ID')
+        mock_orders_col.find_one_and_update.side_effect = Exception('Invalid ID')
 
         response, status = update_order_status('invalid_id', 'completed')
 
@@ -119,15 +203,31 @@ class TestOrderService:
         assert 'error' in response
 
     def test_delete_order_success(self, mock_orders_col):
-        mock_orders_col.delete_one.return_value = MagicMock(deleted_count=1)
+        mock_orders_col.find_one_and_delete.return_value = {
+            '_id': ObjectId(), 'status': 'pending', 'total': 20.0,
+            'created_at': datetime(2026, 1, 2, 13, 30), 'items': []
+        }
 
         response, status = delete_order(str(ObjectId()))
 
         assert status == 200
         assert 'message' in response
 
+    def test_delete_order_subtracts_stats(self, mock_orders_col, mock_stats_col):
+        mock_orders_col.find_one_and_delete.return_value = {
+            '_id': ObjectId(), 'status': 'pending', 'total': 20.0,
+            'created_at': datetime(2026, 1, 2, 13, 30), 'items': []
+        }
+
+        delete_order(str(ObjectId()))
+
+        operations = mock_stats_col.bulk_write.call_args.args[0]
+        increments = {op._filter['_id']: op._doc['$inc'] for op in operations}
+        assert increments['day:2026-01-02'] == {'orders': -1, 'revenue': -20.0}
+        assert increments['hour:2026-01-02T13'] == {'orders': -1, 'revenue': -20.0}
+
     def test_delete_order_not_found(self, mock_orders_col):
-        mock_orders_col.delete_one.return_value = MagicMock(deleted_count=0)
+        mock_orders_col.find_one_and_delete.return_value = None
 
         response, status = delete_order(str(ObjectId()))
 
@@ -135,19 +235,297 @@ class TestOrderService:
         assert 'error' in response
 
     def test_delete_order_invalid_id(self, mock_orders_col):
-        mock_orders_col.delete_one.side_effect = Exception('Invalid ID')
+        mock_orders_col.find_one_and_delete.side_effect = Exception('Invalid ID')
 
         response, status = delete_order('invalid_id')
 
         assert status == 400
         assert 'error' in response
 
-    def test_get_all_users(self, mock_users_col):
-        mock_users_col.find.return_value.sort.return_value = [
-            {'email': 'user1@email.com', 'name': 'User 1'},
-            {'email': 'user2@email.com', 'name': 'User 2'}
+    def test_cursor_roundtrip(self):
+        order = {'_id': ObjectId(), 'created_at': datetime(2025, 1, 2, 3, 4, 5)}
+
+        created_at, order_id = decode_cursor(encode_cursor(order))
+
+        assert created_at == order['created_at']
+        assert order_id == order['_id']
+
+    def test_decode_cursor_invalid(self):
+        with pytest.raises(ValueError):
+            decode_cursor('invalido')
+
+    def test_get_orders_page_first_page(self, mock_orders_col):
+        docs = [{'_id': ObjectId(), 'user_email': 'teste@email.com', 'created_at': datetime(2025, 1, 1, 12, i)}
+                for i in (3, 2, 1)]
+        mock_orders_col.find.return_value.sort.return_value.limit.return_value = docs
+
+        page, status = get_orders_page(page_size=2)
+
+        assert status == 200
+        assert len(page['orders']) == 2
+        assert page['prev_cursor'] is None
+        assert decode_cursor(page['next_cursor'])[1] == docs[1]['_id']
+        mock_orders_col.find.return_value.sort.return_value.limit.assert_called_once_with(3)
+
+    def test_get_orders_page_next_uses_keyset_filter(self, mock_orders_col):
+        anchor = {'_id': ObjectId(), 'created_at': datetime(2025, 1, 1, 12, 0)}
+        mock_orders_col.find.return_value.sort.return_value.limit.return_value = [
+            {'_id': ObjectId(), 'user_email': 'teste@email.com', 'created_at': datetime(2025, 1, 1, 11, 0)}
         ]
 
-        users = get_all_users()
+        page, status = get_orders_page(user_email='teste@email.com', cursor=encode_cursor(anchor))
+
+        query = mock_orders_col.find.call_args.args[0]
+        assert query['$and'][0] == {'user_email': 'teste@email.com'}
+        assert query['$and'][1]['$or'][0] == {'created_at': {'$lt': anchor['created_at']}}
+        assert status == 200
+        assert page['next_cursor'] is None
+        assert page['prev_cursor'] is not None
+
+    def test_get_orders_page_prev_reverses_results(self, mock_orders_col):
+        anchor = {'_id': ObjectId(), 'created_at': datetime(2025, 1, 1, 12, 0)}
+        ascending = [{'_id': ObjectId(), 'created_at': datetime(2025, 1, 1, 13, i)} for i in (1, 2)]
+        mock_orders_col.find.return_value.sort.return_value.limit.return_value = list(ascending)
+
+        page, status = get_orders_page(cursor=encode_cursor(anchor), direction='prev', page_size=5)
+
+        mock_orders_col.find.return_value.sort.assert_called_once_with([('created_at', 1), ('_id', 1)])
+        assert [o['id'] for o in page['orders']] == [str(ascending[1]['_id']), str(ascending[0]['_id'])]
+        assert page['prev_cursor'] is None
+        assert page['next_cursor'] is not None
+
+    def test_get_orders_page_user_history_includes_archive(self, mock_orders_col, mock_archive_col):
+        hot = [{'_id': ObjectId(), 'user_email': 'a@email.com', 'created_at': datetime(2026, 1, day)} for day in (9, 5)]
+        archived = [{'_id': ObjectId(), 'user_email': 'a@email.com', 'created_at': datetime(2025, 1, day)} for day in (8, 7)]
+        mock_orders_col.find.return_value.sort.return_value.limit.return_value = hot
+        mock_archive_col.find.return_value.sort.return_value.limit.return_value = archived
+
+        page, status = get_orders_page(user_email='a@email.com', page_size=3)
+
+        assert [o['id'] for o in page['orders']] == [str(hot[0]['_id']), str(hot[1]['_id']), str(archived[0]['_id'])]
+        assert decode_cursor(page['next_cursor'])[1] == archived[0]['_id']
+
+    def test_get_orders_page_all_orders_skip_archive(self, mock_orders_col, mock_archive_col):
+        mock_orders_col.find.return_value.sort.return_value.limit.return_value = []
+
+        get_orders_page()
+
+        mock_archive_col.find.assert_not_called()
+
+    def test_get_orders_page_summary_projection(self, mock_orders_col):
+        mock_orders_col.find.return_value.sort.return_value.limit.return_value = [
+            {'_id': ObjectId(), 'user_email': 'teste@email.com', 'total': 20.0, 'created_at': datetime(1970, 1, 1, 0, 0, 1)}
+        ]
+
+        page, status = get_orders_page(summary=True, epoch=True)
+
+        assert mock_orders_col.find.call_args.args[1] == SUMMARY_PROJECTION
+        assert page['orders'][0]['created_at'] == 1000
+        assert 'items' not in page['orders'][0]
+
+    def test_get_orders_page_invalid_cursor(self, mock_orders_col):
+        response, status = get_orders_page(cursor='invalido')
+
+        assert status == 400
+        mock_orders_col.find.assert_not_called()
+
+    def test_search_users_anchored_prefix(self, mock_users_col):
+        mock_users_col.find.return_value.sort.return_value.limit.return_value = [
+            {'email': 'ana.silva@email.com', 'name': 'Ana'}
+        ]
+
+        users = search_users(' Ana.S ', limit='5')
+
+        assert users == [{'email': 'ana.silva@email.com', 'name': 'Ana'}]
+        query, projection = mock_users_col.find.call_args.args
+        assert query == {'email_lower': {'$regex': '^ana\\.s'}}
+        mock_users_col.find.return_value.sort.assert_called_once_with('email_lower', 1)
+        assert projection == {'email': 1, 'name': 1, '_id': 0}
+        mock_users_col.find.return_value.sort.return_value.limit.assert_called_once_with(5)
+
+    def test_search_users_limit_is_capped(self, mock_users_col):
+        mock_users_col.find.return_value.sort.return_value.limit.return_value = []
+
+        search_users('a', limit=1000)
+
+        mock_users_col.find.return_value.sort.return_value.limit.assert_called_once_with(50)
+
+    def test_search_users_empty_prefix(self, mock_users_col):
+        assert search_users('') == []
+        assert search_users(None) == []
+        mock_users_col.find.assert_not_called()
+
+PRICE_TABLE = ('"rev1"', {
+    'p1': {'name': 'Burger', 'price': Decimal('10.00')},
+    'p2': {'name': 'Fritas', 'price': Decimal('5.50')},
+})
+
+@pytest.fixture
+def price_table():
+    with patch('services.order_service.load_price_table', return_value=PRICE_TABLE) as mock:
+        yield mock
+
+class TestCreateOrdersBatch:
+
+    def test_batch_success_single_round_trips(self, mock_orders_col, mock_users_col, price_table):
+        mock_users_col.find.return_value = [
+            {'_id': ObjectId(), 'email': 'a@email.com'},
+            {'_id': ObjectId(), 'email': 'b@email.com'},
+        ]
+        orders = [
+            {'user_email': 'a@email.com', 'items': [{'product_id': 'p1', 'quantity': 2}]},
+            {'user_email': 'b@email.com', 'items': [{'product_id': 'p2', 'quantity': 1}, {'product_id': 'p1', 'quantity': 1}]},
+        ]
+
+        response, status = create_orders_batch(orders)
+
+        assert status == 200
+        assert response['created'] == 2
+        assert [r['total'] for r in response['results']] == [20.0, 15.5]
+        mock_users_col.find.assert_called_once()
+        price_table.assert_called_once()
+        docs = mock_orders_col.insert_many.call_args.args[0]
+        assert len(docs) == 2
+        assert mock_orders_col.insert_many.call_args.kwargs == {'ordered': False}
+        assert response['results'][0]['order_id'] == str(docs[0]['_id'])
+
+    def test_batch_partial_failure(self, mock_orders_col, mock_users_col, price_table):
+        mock_users_col.find.return_value = [{'_id': ObjectId(), 'email': 'a@email.com'}]
+        orders = [
+            {'user_email': 'a@email.com', 'items': [{'product_id': 'p1', 'quantity': 1}]},
+            {'user_email': 'naoexiste@email.com', 'items': [{'product_id': 'p1', 'quantity': 1}]},
+            {'user_email': 'a@email.com', 'items': [{'product_id': 'x', 'quantity': 1}]},
+            {'items': []},
+        ]
+
+        response, status = create_orders_batch(orders)
+
+        assert status == 207
+        assert [r['status'] for r in response['results']] == [201, 404, 409, 400]
+        assert len(mock_orders_col.insert_many.call_args.args[0]) == 1
+
+    def test_batch_rejects_non_string_fields(self, mock_orders_col, mock_users_col, price_table):
+        mock_users_col.find.return_value = [{'_id': ObjectId(), 'email': 'a@email.com'}]
+        orders = [
+            {'user_email': {'$ne': None}, 'items': [{'product_id': 'p1', 'quantity': 1}]},
+            {'user_email': ['a@email.com'], 'items': [{'product_id': 'p1', 'quantity': 1}]},
+            {'user_email': 'a@email.com', 'items': [{'product_id': ['p1'], 'quantity': 1}]},
+            {'user_email': 'a@email.com', 'items': ['p1']},
+            {'user_email': 'a@email.com', 'items': [{'product_id': 'p1', 'quantity': 1}]},
+        ]
+
+        response, status = create_orders_batch(orders)
+
+        assert status == 207
+        assert [r['status'] for r in response['results']] == [400, 400, 400, 400, 201]
+        assert mock_users_col.find.call_args.args[0] == {'email': {'$in': ['a@email.com']}}
+
+    def test_batch_write_errors_mapped_to_orders(self, mock_orders_col, mock_users_col, price_table):
+        mock_users_col.find.return_value = [{'_id': ObjectId(), 'email': 'a@email.com'}]
+        mock_orders_col.insert_many.side_effect = BulkWriteError(
+            {'writeErrors': [{'index': 1, 'errmsg': 'falha'}]}
+        )
+        orders = [{'user_email': 'a@email.com', 'items': [{'product_id': 'p1', 'quantity': 1}]}] * 2
+
+        response, status = create_orders_batch(orders)
+
+        assert status == 207
+        assert [r['status'] for r in response['results']] == [201, 500]
+
+    def test_batch_invalid_payload(self, mock_orders_col):
+        assert create_orders_batch([])[1] == 400
+        assert create_orders_batch({'orders': []})[1] == 400
+        mock_orders_col.insert_many.assert_not_called()
+
+    def test_batch_too_large(self, mock_orders_col):
+        with patch('services.order_service.ORDER_BATCH_MAX_SIZE', 1):
+            response, status = create_orders_batch([{}, {}])
+
+        assert status == 413
+
+class TestUpdateOrdersStatusBulk:
+
+    def test_bulk_groups_transitions(self, mock_orders_col, mock_stats_col):
+        first, second, third = ObjectId(), ObjectId(), ObjectId()
+
+        def find(query, projection):
+            if 'bulk_transitions.id' in query:
+                transition_id = query['bulk_transitions.id']
+                return [
+                    {'_id': first, 'status': 'ready', 'version': 2, 'total': 10.0,
+                     'bulk_transitions': [{'id': transition_id, 'from': 'preparing', 'version': 2}]},
+                    {'_id': second, 'status': 'ready', 'version': 1, 'total': 5.0,
+                     'bulk_transitions': [{'id': transition_id, 'from': 'preparing', 'version': 1}]},
+                ]
+            assert query == {'_id': {'$in': [third]}}
+            return [{'_id': third, 'status': 'completed', 'version': 7}]
+        mock_orders_col.find.side_effect = find
+
+        response, status = update_orders_status_bulk([
+            {'order_id': str(first), 'status': 'ready'},
+            {'order_id': str(second), 'status': 'ready'},
+            {'order_id': str(third), 'status': 'cancelled'},
+            {'order_id': str(first), 'status': 'completed'},
+            {'order_id': 'invalido', 'status': 'ready'},
+        ])
+
+        assert status == 207
+        assert [r['status'] for r in response['results']] == [200, 200, 409, 409, 400]
+        assert response['results'][0]['version'] == 2
+        # Um update_many por grupo (status destino), com o filtro condicional de origem, e um para limpar as entradas
+        assert mock_orders_col.update_many.call_count == 3
+        query = mock_orders_col.update_many.call_args_list[0].args[0]
+        assert query == {'_id': {'$in': [first, second]}, 'status': {'$in': ['preparing']}}
+        cleanup = mock_orders_col.update_many.call_args_list[2].args[0]
+        assert cleanup['_id'] == {'$in': [first, second]} and 'bulk_transitions.id' in cleanup
+        increments = {op._filter['_id']: op._doc['$inc'] for op in mock_stats_col.bulk_write.call_args.args[0]}
+        assert increments['status:preparing'] == {'orders': -2, 'revenue': -15.0}
+        assert increments['status:ready'] == {'orders': 2, 'revenue': 15.0}
+
+    def test_bulk_reports_own_transition_after_concurrent_update(self, mock_orders_col, mock_stats_col):
+        order_id = ObjectId()
+
+        def find(query, projection):
+            # Outra requisição já levou o pedido de 'preparing' a 'ready' depois deste lote
+            transition_id = query['bulk_transitions.id']
+            return [{'_id': order_id, 'status': 'ready', 'version': 3, 'total': 10.0,
+                     'bulk_transitions': [{'id': ObjectId(), 'from': 'pending', 'version': 1},
+                                          {'id': transition_id, 'from': 'pending', 'version': 2}]}]
+        mock_orders_col.find.side_effect = find
+
+        with patch('services.order_service.events.emit') as mock_emit:
+            response, status = update_orders_status_bulk([{'order_id': str(order_id), 'status': 'preparing'}])
+
+        assert status == 200
+        assert response['results'][0]['order_status'] == 'preparing'
+        assert response['results'][0]['version'] == 2
+        increments = {op._filter['_id']: op._doc['$inc'] for op in mock_stats_col.bulk_write.call_args.args[0]}
+        assert increments == {'status:pending': {'orders': -1, 'revenue': -10.0},
+                              'status:preparing': {'orders': 1, 'revenue': 10.0}}
+        assert mock_emit.call_args.args[1]['status'] == 'preparing'
+
+    def test_bulk_rejects_non_string_expected_status(self, mock_orders_col):
+        mock_orders_col.find.return_value = []
+
+        response, status = update_orders_status_bulk([
+            {'order_id': str(ObjectId()), 'status': 'ready', 'expected_status': ['preparing']},
+            {'order_id': str(ObjectId()), 'status': ['ready']},
+        ])
+
+        assert status == 207
+        assert [r['status'] for r in response['results']] == [400, 400]
+        mock_orders_col.update_many.assert_not_called()
+
+    def test_bulk_not_found(self, mock_orders_col):
+        order_id = ObjectId()
+        mock_orders_col.find.return_value = []
+
+        response, status = update_orders_status_bulk([{'order_id': str(order_id), 'status': 'ready'}])
+
+        assert status == 207
+        assert response['results'][0]['status'] == 404
 
-        assert len(users) == 2
+    def test_bulk_invalid_payload(self, mock_orders_col):
+        assert update_orders_status_bulk([])[1] == 400
+        assert update_orders_status_bulk({'transitions': []})[1] == 400
+        mock_orders_col.update_many.assert_not_called()
@@ -0,0 +1,102 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from services.pricing_service import price_order_items, load_price_table
+
+TABLE = {
+    'p1': {'name': 'Hambúrguer Simples', 'price': Decimal('15.9')},
+    'p2': {'name': 'Coca-Cola 350ml', 'price': Decimal('5.9')}
+}
+
+@pytest.fixture
+def mock_price_table():
+    with patch('services.pricing_service.product_client.get_price_table') as mock:
+        mock.return_value = ('"rev1"', TABLE)
+        yield mock
+
+class TestPricingService:
+
+    def test_totals_computed_with_decimal(self, mock_price_table):
+        response, status = price_order_items([
+            {'product_id': 'p1', 'quantity': '3'},
+            {'product_id': 'p2', 'quantity': 1, 'expected_price': '5.90'}
+        ])
+
+        assert status == 200
+        assert response['total'] == 53.6
+        assert response['items'][0] == {
+            'product_id': 'p1', 'name': 'Hambúrguer Simples', 'quantity': 3, 'unit_price': 15.9, 'total': 47.7
+        }
+        assert response['catalog_revision'] == '"rev1"'
+
+    def test_client_price_is_ignored_for_totals(self, mock_price_table):
+        response, status = price_order_items([{'product_id': 'p2', 'quantity': 2}])
+
+        assert response['total'] == 11.8
+
+    def test_stale_price_rejected(self, mock_price_table):
+        response, status = price_order_items([{'product_id': 'p1', 'quantity': 1, 'expected_price': '0.01'}])
+
+        assert status == 409
+        assert 'mudou' in response['error']
+
+    def test_unavailable_item_rejected(self, mock_price_table):
+        # Produtos indisponíveis não estão na tabela (a API de produtos só lista os disponíveis)
+        response, status = price_order_items([{'product_id': 'p3', 'name': 'Hambúrguer Costela', 'quantity': 1}])
+
+        assert status == 409
+        assert response['error'] == "Produto 'Hambúrguer Costela' não encontrado no cardápio ou indisponível"
+
+    def test_invalid_quantity_rejected(self, mock_price_table):
+        response, status = price_order_items([{'product_id': 'p1', 'quantity': '0'}])
+
+        assert status == 409
+
+    @pytest.mark.parametrize('quantity', [2.5, '2.5', True, -1, '', None, '²'])
+    def test_non_integer_quantity_rejected(self, mock_price_table, quantity):
+        response, status = price_order_items([{'product_id': 'p1', 'quantity': quantity}])
+
+        assert status == 409
+        assert response['error'] == "Quantidade inválida para 'Hambúrguer Simples'"
+
+    def test_integral_float_quantity_accepted(self, mock_price_table):
+        response, status = price_order_items([{'product_id': 'p1', 'quantity': 2.0}])
+
+        assert status == 200
+        assert response['items'][0]['quantity'] == 2
+
+    def test_unknown_product_revalidates_catalog_once(self, mock_price_table):
+        mock_price_table.side_effect = [
+            ('"rev1"', TABLE),
+            ('"rev2"', dict(TABLE, p4={'name': 'Novo', 'price': Decimal('10')}))
+        ]
+
+        response, status = price_order_items([{'product_id': 'p4', 'quantity': 1}])
+
+        assert status == 200
+        assert response['catalog_revision'] == '"rev2"'
+        mock_price_table.assert_called_with(revalidate=True)
+
+    def test_catalog_unavailable(self, mock_price_table):
+        mock_price_table.return_value = (None, {})
+
+        response, status = price_order_items([{'product_id': 'p1', 'quantity': 1}])
+
+        assert status == 503
+
+    def test_no_items(self, mock_price_table):
+        response, status = price_order_items([])
+
+        assert status == 400
+
+    def test_known_products_do_not_revalidate(self, mock_price_table):
+        load_price_table(['p1', 'p2'])
+
+        mock_price_table.assert_called_once_with()
+
+    def test_preloaded_price_table(self, mock_price_table):
+        response, status = price_order_items([{'product_id': 'p1', 'quantity': 1}], price_table=('"rev9"', TABLE))
+
+        assert status == 200
+        assert response['catalog_revision'] == '"rev9"'
+        mock_price_table.assert_not_called()
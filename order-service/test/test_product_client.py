@@ -0,0 +1,121 @@
+import json
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from services import product_client
+from decimal import Decimal
+from services.product_client import get_products, get_categories, get_entry, get_price_table, PRODUCTS_PATH
+
+def make_response(status_code, data=None, etag=None):
+    response = MagicMock(status_code=status_code, headers={'ETag': etag} if etag else {})
+    response.content = json.dumps(data).encode()
+    return response
+
+@pytest.fixture
+def mock_session():
+    product_client.clear_cache()
+    with patch('services.product_client._session') as mock:
+        yield mock
+    product_client.clear_cache()
+
+class TestProductClient:
+
+    def test_get_products_fetches_with_timeouts(self, mock_session):
+        mock_session.get.return_value = make_response(200, [{'id': '1'}], '"rev1"')
+
+        products = get_products()
+
+        assert products == [{'id': '1'}]
+        args, kwargs = mock_session.get.call_args
+        assert args[0].endswith('/product/api/products')
+        assert kwargs['timeout'] == (product_client.CONNECT_TIMEOUT, product_client.READ_TIMEOUT)
+
+    def test_fresh_entry_served_from_cache(self, mock_session):
+        mock_session.get.return_value = make_response(200, ['Bebidas'])
+
+        get_categories()
+        categories = get_categories()
+
+        assert categories == ['Bebidas']
+        mock_session.get.assert_called_once()
+
+    @patch('services.product_client._refresh_in_background')
+    def test_stale_entry_served_while_revalidating(self, mock_refresh, mock_session):
+        mock_session.get.return_value = make_response(200, [{'id': '1'}], '"rev1"')
+        get_products()
+
+        with patch('services.product_client.CACHE_TTL', -1):
+            products = get_products()
+
+        assert products == [{'id': '1'}]
+        mock_refresh.assert_called_once_with(PRODUCTS_PATH)
+        mock_session.get.assert_called_once()
+
+    def test_expired_entry_revalidated_with_etag(self, mock_session):
+        mock_session.get.return_value = make_response(200, [{'id': '1'}], '"rev1"')
+        get_products()
+        mock_session.get.return_value = make_response(304)
+
+        with patch('services.product_client.CACHE_TTL', -1), patch('services.product_client.STALE_TTL', -1):
+            products = get_products()
+
+        assert products == [{'id': '1'}]
+        assert mock_session.get.call_args.kwargs['headers'] == {'If-None-Match': '"rev1"'}
+
+    def test_service_down_serves_last_copy(self, mock_session):
+        mock_session.get.return_value = make_response(200, [{'id': '1'}])
+        get_products()
+        mock_session.get.side_effect = requests.ConnectionError('down')
+
+        with patch('services.product_client.CACHE_TTL', -1), patch('services.product_client.STALE_TTL', -1):
+            products = get_products()
+
+        assert products == [{'id': '1'}]
+
+    def test_service_down_without_cache(self, mock_session):
+        mock_session.get.side_effect = requests.Timeout('timeout')
+
+        assert get_products() == []
+        assert get_entry(PRODUCTS_PATH) is None
+
+    def test_unexpected_status(self, mock_session):
+        mock_session.get.return_value = make_response(500)
+
+        assert get_categories() == []
+
+    def test_price_table_rebuilt_only_when_catalog_changes(self, mock_session):
+        mock_session.get.return_value = make_response(200, [
+            {'id': 'p1', 'name': 'Burger', 'price': 15.9, 'available': True}
+        ], '"rev1"')
+
+        revision, table = get_price_table()
+        mock_session.get.return_value = make_response(304)
+        same_revision, same_table = get_price_table(revalidate=True)
+
+        assert revision == '"rev1"'
+        assert table['p1']['price'] == Decimal('15.9')
+        assert same_table is table
+        assert mock_session.get.call_count == 2
+
+    def test_price_table_never_uses_stale_catalog(self, mock_session):
+        mock_session.get.return_value = make_response(200, [{'id': 'p1', 'name': 'Burger', 'price': 15.9}], '"rev1"')
+        get_price_table()
+        mock_session.get.return_value = make_response(304)
+
+        # Vencida para preços, mas ainda servível (stale-while-revalidate) para as páginas
+        with patch('services.product_client.PRICE_MAX_AGE', -1), \
+             patch('services.product_client._refresh_in_background') as mock_refresh:
+            revision, table = get_price_table()
+            mock_session.get.side_effect = requests.ConnectionError('down')
+            assert get_price_table() == (None, {})
+            assert get_products() == [{'id': 'p1', 'name': 'Burger', 'price': 15.9}]
+
+        # Revalidada na hora, não em segundo plano
+        assert revision == '"rev1"'
+        assert mock_session.get.call_count == 3
+        mock_refresh.assert_not_called()
+
+    def test_price_table_without_catalog(self, mock_session):
+        mock_session.get.side_effect = requests.ConnectionError('down')
+
+        assert get_price_table() == (None, {})
@@ -0,0 +1,131 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from datetime import datetime
+from pymongo.errors import PyMongoError
+from services.stats_service import (
+    record_orders, record_status_change, get_stats, rebuild_stats, _order_deltas
+)
+
+@pytest.fixture
+def mock_stats_col():
+    with patch('services.stats_service.stats_col') as mock:
+        yield mock
+
+@pytest.fixture
+def mock_orders_col():
+    with patch('services.stats_service.orders_col') as mock:
+        yield mock
+
+def order(**fields):
+    doc = {
+        'status': 'pending', 'total': 25.0, 'created_at': datetime(2026, 3, 4, 12, 15),
+        'items': [
+            {'name': 'Burger', 'quantity': 2, 'total': 20.0},
+            {'name': 'Fritas', 'quantity': 1, 'total': 5.0}
+        ]
+    }
+    doc.update(fields)
+    return doc
+
+def increments(mock_stats_col):
+    operations = mock_stats_col.bulk_write.call_args.args[0]
+    return {op._filter['_id']: op._doc['$inc'] for op in operations}
+
+class TestStatsService:
+
+    def test_order_deltas(self):
+        deltas = _order_deltas(order())
+
+        assert deltas[('day', '2026-03-04')] == {'orders': 1, 'revenue': 25.0}
+        assert deltas[('hour', '2026-03-04T12')] == {'orders': 1, 'revenue': 25.0}
+        assert deltas[('status', 'pending')] == {'orders': 1, 'revenue': 25.0}
+        assert deltas[('item', 'Burger')] == {'quantity': 2, 'revenue': 20.0}
+
+    def test_cancelled_order_is_not_a_sale(self):
+        deltas = _order_deltas(order(status='cancelled'), sign=-1)
+
+        assert deltas == {('status', 'cancelled'): {'orders': -1, 'revenue': -25.0}}
+
+    def test_cancelling_subtracts_sales(self, mock_stats_col):
+        record_status_change(order(status='preparing'), 'cancelled')
+
+        result = increments(mock_stats_col)
+        assert result['status:preparing'] == {'orders': -1, 'revenue': -25.0}
+        assert result['status:cancelled'] == {'orders': 1, 'revenue': 25.0}
+        assert result['day:2026-03-04'] == {'orders': -1, 'revenue': -25.0}
+        assert result['hour:2026-03-04T12'] == {'orders': -1, 'revenue': -25.0}
+        assert result['item:Burger'] == {'quantity': -2, 'revenue': -20.0}
+
+    def test_status_change_between_sales_keeps_sales(self, mock_stats_col):
+        record_status_change(order(status='preparing'), 'ready')
+
+        assert set(increments(mock_stats_col)) == {'status:preparing', 'status:ready'}
+
+    def test_record_orders_merges_buckets_in_one_bulk_write(self, mock_stats_col):
+        record_orders([order(), order(total=10.0, items=[{'name': 'Burger', 'quantity': 1, 'total': 10.0}])])
+
+        mock_stats_col.bulk_write.assert_called_once()
+        result = increments(mock_stats_col)
+        assert result['day:2026-03-04'] == {'orders': 2, 'revenue': 35.0}
+        assert result['item:Burger'] == {'quantity': 3, 'revenue': 30.0}
+
+    def test_record_orders_empty(self, mock_stats_col):
+        record_orders([])
+
+        mock_stats_col.bulk_write.assert_not_called()
+
+    def test_record_orders_ignores_database_errors(self, mock_stats_col):
+        mock_stats_col.bulk_write.side_effect = PyMongoError('down')
+
+        record_orders([order()])
+
+    def test_record_status_change_same_status(self, mock_stats_col):
+        record_status_change(order(), 'pending')
+
+        mock_stats_col.bulk_write.assert_not_called()
+
+    def test_get_stats(self, mock_stats_col):
+        def find(query):
+            cursor = MagicMock()
+            docs = {
+                'day': [{'kind': 'day', 'key': '2026-03-04', 'orders': 2, 'revenue': 35.0}],
+                'hour': [],
+                'status': [
+                    {'kind': 'status', 'key': 'pending', 'orders': 1, 'revenue': 25.0},
+                    {'kind': 'status', 'key': 'completed', 'orders': 1, 'revenue': 10.004},
+                    {'kind': 'status', 'key': 'cancelled', 'orders': 1, 'revenue': 50.0}
+                ],
+                'item': [{'kind': 'item', 'key': 'Burger', 'quantity': 3, 'revenue': 30.0}],
+            }[query['kind']]
+            cursor.__iter__.return_value = iter(docs)
+            cursor.sort.return_value = cursor
+            cursor.limit.return_value = cursor
+            return cursor
+        mock_stats_col.find.side_effect = find
+
+        stats = get_stats(days='7', top=5)
+
+        assert stats['totals'] == {'orders': 2, 'revenue': 35.0}
+        assert stats['by_status']['completed'] == {'orders': 1, 'revenue': 10.0}
+        assert stats['by_status']['cancelled'] == {'orders': 1, 'revenue': 50.0}
+        assert stats['by_day'] == [{'key': '2026-03-04', 'orders': 2, 'revenue': 35.0}]
+        assert stats['top_items'] == [{'key': 'Burger', 'quantity': 3, 'revenue': 30.0}]
+
+    def test_rebuild_stats(self, mock_orders_col, mock_stats_col):
+        mock_orders_col.aggregate.side_effect = lambda pipeline, **kwargs: (
+            [{'_id': 'Burger', 'quantity': 3, 'revenue': 30.0}] if {'$unwind': '$items'} in pipeline
+            else [{'_id': 'x', 'orders': 1, 'revenue': 5.0}, {'_id': None, 'orders': 1, 'revenue': 1.0}]
+        )
+        mock_stats_col.delete_many.return_value = MagicMock(deleted_count=2)
+
+        result = rebuild_stats()
+
+        assert result == {'buckets': 4, 'removed': 2}
+        operations = mock_stats_col.bulk_write.call_args.args[0]
+        assert {op._filter['_id'] for op in operations} == {'day:x', 'hour:x', 'status:x', 'item:Burger'}
+        assert all(call.args[0][0] == {'$unionWith': 'orders_archive'} for call in mock_orders_col.aggregate.call_args_list)
+        pipelines = [call.args[0] for call in mock_orders_col.aggregate.call_args_list]
+        only_sales = {'$match': {'status': {'$nin': ['cancelled']}}}
+        # Cancelados ficam fora de dia, hora e itens, mas continuam no bucket de status
+        assert sum(only_sales in pipeline for pipeline in pipelines) == 3
+        mock_stats_col.delete_many.assert_called_once_with({'_id': {'$nin': ['day:x', 'hour:x', 'status:x', 'item:Burger']}})
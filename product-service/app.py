@@ -1,18 +1,50 @@
-from flask import Flask
-from controllers.product_controller import product_bp
 from dotenv import load_dotenv
-import os
 
+# Carrega as variáveis de ambiente do arquivo .env antes dos demais imports:
+# vários módulos leem a configuração (os.getenv) ao serem importados
 load_dotenv()
 
-app = Flask(__name__)
-app.secret_key = os.getenv("SECRET_KEY")
+from flask import Flask, jsonify
+from controllers.product_controller import product_bp
+from config.database import init_indexes, get_pool_stats
+from config.compression import init_compression
+from config.json_provider import init_json
+from config.auth import init_auth
+import os
+
+def create_app():
+    """Cria e configura a aplicação Flask do product-service"""
+    app = Flask(__name__)
+    app.secret_key = os.getenv("SECRET_KEY")
+
+    app.register_blueprint(product_bp, url_prefix='/product')
+
+    # Tokens Bearer inválidos são recusados antes das rotas (verificação local, com cache)
+    init_auth(app)
+
+    # jsonify/get_json com orjson (datetime e ObjectId codificados nativamente)
+    init_json(app)
+
+    # Compressão gzip/brotli das respostas e cache de longa duração dos arquivos estáticos
+    init_compression(app)
+
+    # Garante os índices do MongoDB usados pelas consultas do serviço (idempotente)
+    init_indexes()
+
+    # Estatísticas do pool de conexões do MongoDB do processo que atendeu a requisição
+    @app.route('/health/db')
+    def db_health():
+        return jsonify(get_pool_stats())
+
+    @app.route('/')
+    def index():
+        return '<a href="/product/list">Ver produtos disponíveis</a>'
 
-app.register_blueprint(product_bp, url_prefix='/product')
+    return app
 
-@app.route('/')
-def index():
-    return '<a href="/product/list">Ver produtos disponíveis</a>'
+# Instância usada pelo gunicorn (app:app) e pelo servidor de desenvolvimento
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(host="0.0.0.0", port=5003, debug=True)
+    # Servidor de desenvolvimento do Flask; em produção use: gunicorn -c gunicorn.conf.py app:app
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5003")), debug=os.getenv("FLASK_DEBUG", "1") == "1")
@@ -0,0 +1,78 @@
+# Benchmark da página pública do cardápio (/product/list), sem MongoDB
+#
+#     cd product-service
+#     python -m benchmarks.bench_menu_page [requisições]
+#
+# Compara requisições por segundo da renderização original (cardápio completo
+# renderizado a cada requisição, com a consulta redundante de get_available_products
+# quando há filtro de categoria) com a atual, que serve o fragmento em cache por
+# (revisão do catálogo, categoria). O catálogo vem de data/default_products.json
+# através do cache em memória de product_service.
+
+from unittest.mock import MagicMock, patch
+from bson import ObjectId
+import sys
+import time
+
+# O controller semeia o cardápio ao ser importado: evita acessar o MongoDB
+with patch("services.product_service.initialize_products"):
+    from flask import Flask, render_template, request
+    from controllers.product_controller import product_bp
+    from services import product_service
+    from services.import_service import load_default_products
+
+def legacy_list_products():
+    # Versão anterior de list_products (template completo a cada requisição), só para comparação
+    products = product_service.get_available_products()
+    categories = product_service.get_categories()
+    category_filter = request.args.get("category")
+    if category_filter:
+        products = product_service.get_products_by_category(category_filter)
+    menu_html = render_template("product_menu.html", products=products, categories=categories,
+                                selected_category=category_filter)
+    return render_template("product_list.html", menu_html=menu_html)
+
+def make_app():
+    app = Flask(__name__, template_folder="../templates", static_folder="../static")
+    app.secret_key = "bench"
+    app.register_blueprint(product_bp, url_prefix="/product")
+    app.add_url_rule("/legacy/list", "legacy_list", legacy_list_products)
+    return app
+
+def make_products_col(copies=4):
+    """Coleção falsa com o cardápio padrão repetido (copies vezes)"""
+    products = []
+    for copy in range(copies):
+        for row in load_default_products():
+            products.append({**row, "_id": ObjectId(), "name": f"{row['name']} #{copy}"})
+    products.sort(key=lambda product: (product["category"], product["name"]))
+    col = MagicMock()
+    col.find.return_value.sort.return_value = products
+    col.distinct.return_value = sorted({product["category"] for product in products})
+    return col, len(products)
+
+def measure(client, url, requests):
+    client.get(url)  # aquece caches e templates compilados
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url)
+        assert response.status_code == 200
+    return requests / (time.perf_counter() - start)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    requests = int(argv[0]) if argv else 2000
+    products_col, count = make_products_col()
+    with patch.object(product_service, "products_col", products_col), \
+         patch.object(product_service, "CATALOG_CACHE_TTL", float("inf")):
+        product_service.invalidate_catalog_cache()
+        client = make_app().test_client()
+        print(f"{count} produtos, {requests} requisições por cenário")
+        for name, query in (("todas as categorias", ""), ("categoria", "?category=Hambúrgueres")):
+            before = measure(client, f"/legacy/list{query}", requests)
+            after = measure(client, f"/product/list{query}", requests)
+            print(f"{name:<22} original {before:8.0f} req/s   cache {after:8.0f} req/s   {after / before:5.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# Autenticação sem estado por JWT (Authorization: Bearer <token>)
+#
+# Os tokens são emitidos pelo auth-service (HS256) e verificados localmente por
+# qualquer serviço com as mesmas chaves, sem chamar o auth-service. As chaves ficam em
+# JWT_KEYS ("kid1:segredo1,kid2:segredo2"); a primeira (ou JWT_ACTIVE_KID) assina os
+# tokens novos e as demais continuam válidas para verificação durante a rotação. Sem
+# JWT_KEYS, JWT_SECRET é a chave "default" (tokens antigos sem kid usam a chave ativa).
+#
+# Tokens já verificados ficam em um cache LRU (token -> claims) até o exp, evitando
+# refazer o HMAC a cada requisição do mesmo cliente. Tokens malformados são recusados
+# antes de qualquer decodificação.
+
+from collections import OrderedDict
+from functools import wraps
+from flask import g, jsonify, request
+import datetime
+import os
+import threading
+import time
+import jwt
+
+JWT_ALGORITHM = "HS256"
+JWT_TTL = int(os.getenv("JWT_TTL", str(12 * 3600)))
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "4096"))
+MAX_TOKEN_LENGTH = 4096
+
+def load_keys(keys=None, secret=None):
+    """Chaves de assinatura: {kid: segredo}, na ordem de JWT_KEYS"""
+    keys = os.getenv("JWT_KEYS", "") if keys is None else keys
+    parsed = {}
+    for item in keys.split(","):
+        kid, _, key = item.strip().partition(":")
+        if kid and key:
+            parsed[kid] = key
+    if not parsed:
+        secret = os.getenv("JWT_SECRET") if secret is None else secret
+        if secret:
+            parsed["default"] = secret
+    return parsed
+
+JWT_KEYS = load_keys()
+ACTIVE_KID = os.getenv("JWT_ACTIVE_KID") or next(iter(JWT_KEYS), None)
+
+_cache = OrderedDict()  # token -> (claims, exp)
+_cache_lock = threading.Lock()
+
+class AuthError(Exception):
+    """Token ausente, malformado, expirado ou com assinatura inválida"""
+
+def clear_token_cache():
+    """Descarta os tokens verificados (ex.: após remover uma chave comprometida)"""
+    with _cache_lock:
+        _cache.clear()
+
+def active_key():
+    """(kid, segredo) usados para assinar tokens novos"""
+    kid = ACTIVE_KID if ACTIVE_KID in JWT_KEYS else next(iter(JWT_KEYS), None)
+    if kid is None:
+        raise AuthError("Nenhuma chave JWT configurada (JWT_KEYS ou JWT_SECRET)")
+    return kid, JWT_KEYS[kid]
+
+def encode_token(claims, ttl=None):
+    """Assina um token com a chave ativa; exp/iat são preenchidos a partir de ttl (segundos)"""
+    kid, key = active_key()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    payload = {**claims, "iat": now, "exp": now + datetime.timedelta(seconds=ttl or JWT_TTL)}
+    return jwt.encode(payload, key, algorithm=JWT_ALGORITHM, headers={"kid": kid})
+
+def _verify(token):
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.InvalidTokenError:
+        raise AuthError("Token malformado")
+    if header.get("alg") != JWT_ALGORITHM:
+        raise AuthError("Algoritmo de assinatura não aceito")
+    kid = header.get("kid") or active_key()[0]
+    key = JWT_KEYS.get(kid)
+    if key is None:
+        raise AuthError("Chave de assinatura desconhecida")
+    try:
+        return jwt.decode(token, key, algorithms=[JWT_ALGORITHM], options={"require": ["exp"]})
+    except jwt.ExpiredSignatureError:
+        raise AuthError("Token expirado")
+    except jwt.InvalidTokenError:
+        raise AuthError("Token inválido")
+
+def verify_token(token):
+    """Claims do token (do cache se já verificado e ainda não expirado); levanta AuthError"""
+    if not token or len(token) > MAX_TOKEN_LENGTH or token.count(".") != 2:
+        raise AuthError("Token malformado")
+
+    now = time.time()
+    with _cache_lock:
+        cached = _cache.get(token)
+        if cached is not None:
+            if cached[1] > now:
+                _cache.move_to_end(token)
+                return cached[0]
+            del _cache[token]
+
+    claims = _verify(token)
+    with _cache_lock:
+        _cache[token] = (claims, claims["exp"])
+        if len(_cache) > JWT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return claims
+
+def bearer_token():
+    """Token do header Authorization (None se ausente ou de outro esquema)"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    return token.strip()
+
+def current_claims():
+    """Claims do token da requisição atual (verificado uma vez por requisição); levanta AuthError"""
+    if "auth_claims" not in g:
+        token = bearer_token()
+        g.auth_claims = verify_token(token) if token is not None else None
+    return g.auth_claims
+
+def _unauthorized(message, invalid=True):
+    response = jsonify({"error": message})
+    response.status_code = 401
+    response.headers["WWW-Authenticate"] = 'Bearer error="invalid_token"' if invalid else "Bearer"
+    return response
+
+def require_auth(role=None):
+    """Decorador de rotas: exige um token válido (e o papel informado, ex.: "admin")"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                claims = current_claims()
+            except AuthError as e:
+                return _unauthorized(str(e))
+            if claims is None:
+                return _unauthorized("Autenticação necessária", invalid=False)
+            if role and claims.get("role") != role:
+                return jsonify({"error": "Permissão negada"}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def init_auth(app):
+    """Recusa cedo (antes da rota) requisições com token Bearer inválido"""
+    @app.before_request
+    def reject_invalid_token():
+        try:
+            current_claims()
+        except AuthError as e:
+            return _unauthorized(str(e))
@@ -0,0 +1,80 @@
+# Provedor JSON do Flask baseado em orjson (com fallback para o json da stdlib)
+#
+# init_json(app) troca o provedor de jsonify/request.get_json da aplicação. O orjson
+# codifica datetime nativamente (ISO 8601; datas sem fuso são UTC, como as do MongoDB)
+# e gera bytes direto para a resposta; ObjectId e Decimal passam pelo default. Sem o
+# pacote orjson, a mesma saída é produzida pelo json da stdlib, só mais devagar.
+
+from bson import ObjectId
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+import json
+import uuid
+
+try:
+    import orjson
+except ImportError:
+    # Opcional: sem o pacote orjson o provedor usa o json da stdlib
+    orjson = None
+
+if orjson:
+    ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+def default(value):
+    """Tipos que o JSON não conhece: ObjectId, datas (fallback), Decimal, UUID, Markup"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps_bytes(obj, indent=False):
+    """Codifica obj em JSON (bytes UTF-8)"""
+    if orjson:
+        return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+    return json.dumps(obj, default=default, ensure_ascii=False, indent=2 if indent else None,
+                      separators=None if indent else (",", ":")).encode()
+
+def dumps(obj):
+    """Codifica obj em JSON (str)"""
+    return dumps_bytes(obj).decode()
+
+def loads(data):
+    """Decodifica JSON de str ou bytes; erros são ValueError (json.JSONDecodeError)"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Provedor JSON do Flask que usa orjson quando disponível"""
+
+    def dumps(self, obj, **kwargs):
+        # Chamadas com opções próprias (sort_keys, indent, cls...) seguem pelo json da stdlib
+        if kwargs:
+            kwargs.setdefault("default", default)
+            return json.dumps(obj, **kwargs)
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(dumps_bytes(obj, indent=indent), mimetype=self.mimetype)
+
+def init_json(app):
+    """Instala o provedor JSON rápido na aplicação"""
+    app.json = FastJSONProvider(app)
+    return app.json
@@ -1,26 +1,52 @@
-from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify
+from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify, make_response
 from services.product_service import (
     get_all_products, get_available_products, get_products_by_category,
     get_product_by_id, create_product, update_product, delete_product,
-    get_categories, initialize_products
+    get_categories, initialize_products, get_catalog_revision
 )
+from services.search_service import search_products
+from services.import_service import parse_rows, import_products
+from config.auth import require_auth
+from markupsafe import Markup
+import os
 
 product_bp = Blueprint("product", __name__)
 
 # Initialize products on startup
 initialize_products()
 
+# Fragmentos HTML do cardápio já renderizados por categoria ("" = todas), válidos
+# para uma revisão do catálogo; uma revisão nova descarta todos de uma vez
+_menu_fragments = (None, {})
+
+def render_menu_fragment(category):
+    """HTML do cardápio (filtro + produtos) da categoria, renderizado uma vez por revisão do catálogo"""
+    global _menu_fragments
+    revision, _ = get_catalog_revision()
+    cached_revision, fragments = _menu_fragments
+    if cached_revision != revision:
+        fragments = {}
+        _menu_fragments = (revision, fragments)
+
+    key = category or ""
+    fragment = fragments.get(key)
+    if fragment is None:
+        categories = get_categories()
+        # Uma única consulta ao cache do cardápio: a lista completa só quando não há filtro
+        products = get_products_by_category(category) if category else get_available_products()
+        fragment = Markup(render_template("product_menu.html", products=products,
+                                          categories=categories, selected_category=category))
+        # Só categorias existentes entram no cache (o parâmetro vem da URL)
+        if not category or category in categories:
+            fragments[key] = fragment
+    return fragment
+
 @product_bp.route("/list")
 def list_products():
     """Lista todos os produtos disponíveis"""
-    products = get_available_products()
-    categories = get_categories()
     category_filter = request.args.get('category')
-    
-    if category_filter:
-        products = get_products_by_category(category_filter)
-    
-    return render_template("product_list.html", products=products, categories=categories, selected_category=category_filter)
+    # Só o layout (mensagens flash) é renderizado a cada requisição
+    return render_template("product_list.html", menu_html=render_menu_fragment(category_filter))
 
 @product_bp.route("/admin")
 def admin_products():
@@ -43,7 +69,8 @@ def create():
             category=data["category"],
             price=data["price"],
             ingredients=ingredients,
-            available=available
+            available=available,
+            sku=data.get("sku")
         )
         
         if status != 201:
@@ -69,21 +96,22 @@ def edit(product_id):
         ingredients = [ing.strip() for ing in data["ingredients"].split(",") if ing.strip()]
         available = data.get("available") == "on"
         
-        success = update_product(
+        response, status = update_product(
             product_id=product_id,
             name=data["name"],
             description=data["description"],
             category=data["category"],
             price=data["price"],
             ingredients=ingredients,
-            available=available
+            available=available,
+            sku=data.get("sku")
         )
         
-        if success:
-            flash("Produto atualizado com sucesso!")
-        else:
-            flash("Erro ao atualizar produto.")
+        if status != 200:
+            flash(response["error"])
+            return redirect(url_for("product.edit", product_id=product_id))
         
+        flash("Produto atualizado com sucesso!")
         return redirect(url_for("product.admin_products"))
     
     categories = get_categories()
@@ -100,6 +128,42 @@ def delete(product_id):
     
     return redirect(url_for("product.admin_products"))
 
+def read_import_rows():
+    """Linhas da importação: arquivo enviado (.json/.csv), corpo text/csv ou corpo JSON; levanta ValueError"""
+    upload = request.files.get("file")
+    if upload:
+        fmt = request.values.get("format") or os.path.splitext(upload.filename or "")[1].lstrip(".").lower()
+        try:
+            content = upload.read().decode("utf-8")
+        except UnicodeDecodeError:
+            raise ValueError("Arquivo deve estar em UTF-8")
+        return parse_rows(fmt, content)
+    if request.values.get("format") == "csv" or request.mimetype == "text/csv":
+        return parse_rows("csv", request.get_data(as_text=True))
+    return parse_rows("json", request.get_json(silent=True))
+
+@product_bp.route("/import", methods=["GET", "POST"])
+def import_view():
+    """Importa/atualiza produtos em lote a partir de um arquivo JSON ou CSV"""
+    if request.method == "POST":
+        try:
+            response, status = import_products(read_import_rows())
+        except ValueError as e:
+            flash(str(e))
+            return redirect(url_for("product.import_view"))
+
+        if status >= 400:
+            errors = [f"Linha {row['index'] + 1} ({row['sku']}): {'; '.join(row['errors'])}"
+                      for row in response.get("results", []) if row["status"] == "error"]
+            flash(" | ".join([response["error"]] + errors[:10]))
+            return redirect(url_for("product.import_view"))
+
+        flash(f"Importação concluída: {response['created']} criados, {response['updated']} atualizados"
+              + (f", {response['failed']} com erro" if response["failed"] else ""))
+        return redirect(url_for("product.admin_products"))
+
+    return render_template("import_products.html")
+
 @product_bp.route("/details/<product_id>")
 def details(product_id):
     """Mostra detalhes de um produto"""
@@ -110,19 +174,57 @@ def details(product_id):
     
     return render_template("product_details.html", product=product)
 
+def catalog_json(build_payload):
+    """Resposta JSON condicional do catálogo: 304 se o cliente já tem a revisão atual"""
+    revision, last_modified = get_catalog_revision()
+
+    if request.if_none_match:
+        # Comparação fraca: a compressão transforma o ETag em W/"..."
+        not_modified = request.if_none_match.contains_weak(revision)
+    else:
+        not_modified = bool(request.if_modified_since and request.if_modified_since >= last_modified)
+
+    response = make_response("", 304) if not_modified else jsonify(build_payload())
+    response.set_etag(revision)
+    response.last_modified = last_modified
+    # O cliente pode guardar a resposta, mas deve revalidar a cada uso
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 @product_bp.route("/api/products")
 def api_products():
     """API endpoint para obter produtos (para integração com outros serviços)"""
     category = request.args.get('category')
     if category:
-        products = get_products_by_category(category)
-    else:
-        products = get_available_products()
-    
-    return jsonify(products)
+        return catalog_json(lambda: get_products_by_category(category))
+    return catalog_json(get_available_products)
 
 @product_bp.route("/api/categories")
 def api_categories():
     """API endpoint para obter categorias"""
-    categories = get_categories()
-    return jsonify(categories)
+    return catalog_json(get_categories)
+
+@product_bp.route("/api/search")
+def api_search():
+    """Busca de produtos por nome, descrição e ingredientes (sem acentos), com filtros"""
+    args = request.args
+    response, status = search_products(
+        query=args.get("q", ""),
+        category=args.get("category"),
+        available=args.get("available", "true"),
+        min_price=args.get("min_price"),
+        max_price=args.get("max_price"),
+        limit=args.get("limit")
+    )
+    return jsonify(response), status
+
+@product_bp.route("/api/products/import", methods=["POST"])
+@require_auth("admin")
+def api_import_products():
+    """Importa/atualiza produtos em lote por SKU (JSON, CSV ou arquivo enviado)"""
+    try:
+        rows = read_import_rows()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    response, status = import_products(rows)
+    return jsonify(response), status
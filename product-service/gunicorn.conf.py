@@ -0,0 +1,36 @@
+# Configuração do gunicorn para produção (lida a partir de variáveis de ambiente)
+#
+#     gunicorn -c gunicorn.conf.py app:app
+
+import os
+
+def _cpus():
+    # Respeita o limite de CPUs do container quando disponível
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5003')}"
+
+# Processos e threads por processo: com threads > 1 usa o worker gthread
+workers = int(os.getenv("WEB_CONCURRENCY", str(_cpus() * 2 + 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+
+# Carrega a aplicação antes do fork (workers sobem mais rápido e compartilham memória).
+# Seguro porque cada worker cria o seu próprio MongoClient (config/database.py).
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# Tempo máximo por requisição e prazo para terminar as requisições em andamento no SIGTERM
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recicla workers periodicamente para conter vazamentos de memória (0 desativa)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
@@ -2,6 +2,7 @@
 def serialize_product(product):
     return {
         "id": str(product.get("_id")),
+        "sku": product.get("sku"),
         "name": product.get("name"),
         "description": product.get("description"),
         "category": product.get("category"),
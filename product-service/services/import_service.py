@@ -0,0 +1,238 @@
+# Importação/atualização em lote de produtos (JSON ou CSV)
+#
+# Cada linha é identificada por um SKU estável. Todas as linhas são validadas antes
+# de qualquer escrita; depois um único bulk_write de UpdateOne(upsert=True) por SKU
+# cria os produtos novos e atualiza os existentes, e o cache do cardápio é invalidado
+# uma vez só. Campos opcionais ausentes não sobrescrevem o valor atual do produto.
+#
+#     python -m services.import_service cardapio.csv [--format csv|json]
+#
+# CSV: cabeçalho sku,name,description,category,price,available,ingredients
+# (ingredientes separados por ";").
+#
+# Produtos gravados antes dos SKUs recebem na subida o SKU do produto de mesmo nome de
+# data/default_products.json (backfill_skus); os demais ganham SKU na edição do produto.
+
+from config.database import get_db
+from services.product_service import SKU_PATTERN, invalidate_catalog_cache, parse_price
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+
+db = get_db()
+products_col = db["products"]
+
+IMPORT_MAX_ROWS = int(os.getenv("PRODUCT_IMPORT_MAX_ROWS", "2000"))
+REQUIRED_FIELDS = ("sku", "name", "category", "price")
+# Valor usado só quando o produto é criado e a linha não traz o campo
+OPTIONAL_DEFAULTS = {"description": "", "available": True, "ingredients": []}
+IMPORT_FORMATS = ("json", "csv")
+DEFAULT_PRODUCTS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "default_products.json")
+
+_TRUE = {"true", "1", "sim", "s", "yes", "on"}
+_FALSE = {"false", "0", "não", "nao", "n", "no", "off"}
+
+def parse_rows(fmt, data):
+    """Converte o conteúdo (texto JSON/CSV ou lista já decodificada) em linhas; levanta ValueError"""
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Formato inválido: '{fmt}' (use {', '.join(IMPORT_FORMATS)})")
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(data.lstrip("\ufeff")))
+        # Células vazias do CSV equivalem a campos ausentes
+        return [{key.strip(): value for key, value in row.items() if key and value not in (None, "")} for row in reader]
+
+    if isinstance(data, (str, bytes)):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {e}")
+    if isinstance(data, dict):
+        data = data.get("products")
+    if not isinstance(data, list):
+        raise ValueError("Envie uma lista de produtos (ou {\"products\": [...]})")
+    return data
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"available inválido: '{value}'")
+
+def _parse_ingredients(value):
+    if isinstance(value, list):
+        return [str(ingredient).strip() for ingredient in value if str(ingredient).strip()]
+    return [ingredient.strip() for ingredient in str(value).split(";") if ingredient.strip()]
+
+def validate_row(row):
+    """Valida e normaliza uma linha; retorna (campos do produto, lista de erros)"""
+    if not isinstance(row, dict):
+        return None, ["Linha deve ser um objeto"]
+    errors = [f"Campo obrigatório ausente: {field}" for field in REQUIRED_FIELDS
+              if row.get(field) in (None, "")]
+    if errors:
+        return None, errors
+
+    product = {
+        "sku": str(row["sku"]).strip(),
+        "name": str(row["name"]).strip(),
+        "category": str(row["category"]).strip(),
+    }
+    if not SKU_PATTERN.match(product["sku"]):
+        errors.append(f"SKU inválido: '{row['sku']}'")
+    try:
+        product["price"] = round(parse_price(row["price"]), 2)
+        if product["price"] < 0:
+            errors.append("Preço não pode ser negativo")
+    except ValueError:
+        errors.append("Preço deve ser um número válido")
+    if "description" in row:
+        product["description"] = str(row["description"] or "").strip()
+    if "ingredients" in row:
+        product["ingredients"] = _parse_ingredients(row["ingredients"])
+    if "available" in row:
+        try:
+            product["available"] = _parse_bool(row["available"])
+        except ValueError as e:
+            errors.append(str(e))
+    return (None if errors else product), errors
+
+def _upsert(product):
+    fields = dict(product)
+    sku = fields.pop("sku")
+    defaults = {field: value for field, value in OPTIONAL_DEFAULTS.items() if field not in fields}
+    update = {"$set": fields}
+    if defaults:
+        update["$setOnInsert"] = defaults
+    return UpdateOne({"sku": sku}, update, upsert=True)
+
+def import_products(rows):
+    """Valida todas as linhas e aplica um único bulk_write de upserts por SKU; retorna (resposta, status)"""
+    if not isinstance(rows, list) or not rows:
+        return {"error": "Nenhum produto para importar"}, 400
+    if len(rows) > IMPORT_MAX_ROWS:
+        return {"error": f"Máximo de {IMPORT_MAX_ROWS} produtos por importação"}, 413
+
+    products, results, seen = [], [], {}
+    for index, row in enumerate(rows):
+        product, errors = validate_row(row)
+        sku = product["sku"] if product else (row.get("sku") if isinstance(row, dict) else None)
+        if product and sku in seen:
+            errors = [f"SKU repetido (linha {seen[sku]})"]
+        if errors:
+            results.append({"index": index, "sku": sku, "status": "error", "errors": errors})
+            continue
+        seen[sku] = index
+        products.append(product)
+        results.append({"index": index, "sku": sku, "status": "valid"})
+
+    invalid = [result for result in results if result["status"] == "error"]
+    if invalid:
+        # Nada é gravado se alguma linha for inválida
+        return {"error": f"{len(invalid)} linha(s) inválida(s); nenhum produto foi importado", "results": invalid}, 400
+
+    failed = {}
+    try:
+        result = products_col.bulk_write([_upsert(product) for product in products], ordered=False)
+        upserted_ids, matched = result.upserted_ids, result.matched_count
+    except BulkWriteError as e:
+        details = e.details
+        failed = {error["index"]: error.get("errmsg", "Erro ao gravar") for error in details.get("writeErrors", [])}
+        upserted_ids = {item["index"]: item["_id"] for item in details.get("upserted", [])}
+        matched = details.get("nMatched", 0)
+    except PyMongoError as e:
+        return {"error": f"Erro ao gravar produtos: {e}"}, 503
+    finally:
+        # Uma invalidação por importação, mesmo se parte das linhas falhou
+        invalidate_catalog_cache()
+
+    for index, row_result in enumerate(results):
+        if index in failed:
+            row_result.update(status="error", errors=[failed[index]])
+        elif index in upserted_ids:
+            row_result.update(status="created", id=str(upserted_ids[index]))
+        else:
+            row_result["status"] = "updated"
+
+    response = {
+        "created": len(upserted_ids),
+        "updated": matched,
+        "failed": len(failed),
+        "results": results
+    }
+    if failed:
+        response["error"] = f"{len(failed)} produto(s) não foram gravados"
+        return response, 207
+    response["message"] = f"{len(results)} produto(s) importados com sucesso"
+    return response, 200
+
+def load_default_products(path=DEFAULT_PRODUCTS_FILE):
+    """Produtos iniciais do cardápio (data/default_products.json)"""
+    with open(path, encoding="utf-8") as f:
+        return parse_rows("json", f.read())
+
+# Produtos sem SKU (gravados antes dos SKUs ou criados sem o campo)
+WITHOUT_SKU = {"sku": {"$not": {"$type": "string"}}}
+
+def backfill_skus(defaults=None):
+    """Atribui aos produtos sem SKU o SKU do produto padrão de mesmo nome; retorna (atualizados, ainda sem SKU)"""
+    defaults = load_default_products() if defaults is None else defaults
+    sku_by_name = {row["name"]: row["sku"] for row in defaults}
+    missing = list(products_col.find(WITHOUT_SKU, {"name": 1}))
+    if not missing:
+        return 0, 0
+
+    taken = set(products_col.distinct("sku", {"sku": {"$in": list(sku_by_name.values())}}))
+    operations = []
+    for product in missing:
+        sku = sku_by_name.get(product.get("name"))
+        if sku and sku not in taken:
+            # Nomes repetidos: só o primeiro produto recebe o SKU
+            taken.add(sku)
+            operations.append(UpdateOne({"_id": product["_id"], **WITHOUT_SKU}, {"$set": {"sku": sku}}))
+    if not operations:
+        return 0, len(missing)
+
+    try:
+        updated = products_col.bulk_write(operations, ordered=False).modified_count
+    except BulkWriteError as e:
+        # SKU gravado por outro processo ao mesmo tempo (índice único)
+        updated = e.details.get("nModified", 0)
+    invalidate_catalog_cache()
+    return updated, len(missing) - updated
+
+def main(argv=None):
+    """Ponto de entrada do comando de importação"""
+    parser = argparse.ArgumentParser(description="Importa/atualiza produtos em lote a partir de JSON ou CSV")
+    parser.add_argument("file", help="arquivo .json ou .csv")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="padrão: extensão do arquivo")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or os.path.splitext(args.file)[1].lstrip(".").lower()
+    try:
+        with open(args.file, encoding="utf-8") as f:
+            rows = parse_rows(fmt, f.read())
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    response, status = import_products(rows)
+    for row in response.get("results", []):
+        if row["status"] == "error":
+            print(f"❌ linha {row['index']} ({row['sku']}): {'; '.join(row['errors'])}", file=sys.stderr)
+    if status >= 400:
+        print(f"❌ {response['error']}", file=sys.stderr)
+        return 1
+    print(f"✅ {response['created']} produtos criados, {response['updated']} atualizados")
+    return 0 if status == 200 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,110 @@
 from config.database import get_db
 from models.product_model import serialize_product
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from datetime import datetime, timezone
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
 
 db = get_db()
 products_col = db["products"]
 
-def create_product(name, description, category, price, ingredients, available=True):
+# Cache em memória do cardápio: produtos disponíveis já serializados, agrupados por
+# categoria, e a lista de categorias. É invalidado pelas escritas deste processo,
+# opcionalmente por um change stream do MongoDB (edições feitas por outras réplicas,
+# CATALOG_CHANGE_STREAM=1) e, como último recurso, expira após CATALOG_CACHE_TTL segundos.
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+CATALOG_CHANGE_STREAM = os.getenv("CATALOG_CHANGE_STREAM") == "1"
+_catalog_lock = threading.Lock()
+_catalog = None  # snapshot atual: {"menu", "by_category", "categories", "revision", "modified_at", "loaded_at"}
+_last_revision = (None, None)  # última revisão vista: (hash, data da mudança), sobrevive às invalidações
+
+def invalidate_catalog_cache():
+    """Descarta o cardápio em cache; a próxima leitura recarrega do MongoDB"""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+def _get_catalog():
+    """Retorna o snapshot do cardápio, recarregando do MongoDB se vazio ou expirado"""
+    global _catalog, _last_revision
+    if CATALOG_CHANGE_STREAM:
+        _ensure_catalog_watcher()
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - catalog["loaded_at"] <= CATALOG_CACHE_TTL:
+        return catalog
+
+    with _catalog_lock:
+        # Requisições simultâneas esperam uma única recarga em vez de irem todas ao banco
+        if _catalog is None or time.monotonic() - _catalog["loaded_at"] > CATALOG_CACHE_TTL:
+            menu = [serialize_product(product) for product in
+                    products_col.find({"available": True}).sort([("category", 1), ("name", 1)])]
+            by_category = {}
+            for product in menu:
+                by_category.setdefault(product["category"], []).append(product)
+            categories = sorted(products_col.distinct("category"))
+            revision = _catalog_revision(menu, categories)
+            # Recargas sem mudança de conteúdo (TTL, invalidação) mantêm a data original
+            if revision != _last_revision[0]:
+                _last_revision = (revision, datetime.now(timezone.utc).replace(microsecond=0))
+            _catalog = {
+                "menu": menu,
+                "by_category": by_category,
+                "categories": categories,
+                "revision": revision,
+                "modified_at": _last_revision[1],
+                "loaded_at": time.monotonic()
+            }
+        return _catalog
+
+def _catalog_revision(menu, categories):
+    """Hash do conteúdo do catálogo; muda sempre que algum produto ou categoria muda"""
+    payload = json.dumps([menu, categories], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+def get_catalog_snapshot():
+    """Snapshot atual do cardápio em cache (um objeto novo a cada recarga)"""
+    return _get_catalog()
+
+def get_catalog_revision():
+    """Retorna (revisão, data da última modificação) do catálogo em cache"""
+    catalog = _get_catalog()
+    return catalog["revision"], catalog["modified_at"]
+
+# Identificador estável usado pela importação em lote (services/import_service.py)
+SKU_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+def parse_price(value):
+    """Converte o preço (aceita vírgula decimal); levanta ValueError se não for um número finito"""
+    price = float(str(value).replace(",", "."))
+    if not math.isfinite(price):
+        raise ValueError("Preço deve ser um número finito")
+    return price
+
+def normalize_sku(sku):
+    """SKU sem espaços nas pontas (None se vazio); levanta ValueError se o formato for inválido"""
+    sku = str(sku or "").strip()
+    if not sku:
+        return None
+    if not SKU_PATTERN.match(sku):
+        raise ValueError(f"SKU inválido: '{sku}' (letras, números, _ . -; até 64 caracteres)")
+    return sku
+
+def create_product(name, description, category, price, ingredients, available=True, sku=None):
     """Cria um novo produto"""
     try:
-        price = float(price)
+        price = parse_price(price)
     except (ValueError, TypeError):
         return {"error": "Preço deve ser um número válido"}, 400
+    try:
+        sku = normalize_sku(sku)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     
     product = {
         "name": name,
@@ -20,7 +114,13 @@ def create_product(name, description, category, price, ingredients, available=Tr
         "available": available,
         "ingredients": ingredients
     }
-    result = products_col.insert_one(product)
+    if sku:
+        product["sku"] = sku
+    try:
+        result = products_col.insert_one(product)
+    except DuplicateKeyError:
+        return {"error": f"Já existe um produto com o SKU '{sku}'"}, 409
+    invalidate_catalog_cache()
     return {"message": "Produto criado com sucesso", "id": str(result.inserted_id)}, 201
 
 def get_all_products():
@@ -29,14 +129,12 @@ def get_all_products():
     return [serialize_product(product) for product in products]
 
 def get_available_products():
-    """Retorna apenas produtos disponíveis"""
-    products = list(products_col.find({"available": True}).sort([("category", 1), ("name", 1)]))
-    return [serialize_product(product) for product in products]
+    """Retorna apenas produtos disponíveis (do cache do cardápio)"""
+    return _get_catalog()["menu"]
 
 def get_products_by_category(category):
-    """Retorna produtos por categoria"""
-    products = list(products_col.find({"category": category, "available": True}).sort("name", 1))
-    return [serialize_product(product) for product in products]
+    """Retorna produtos disponíveis de uma categoria, ordenados por nome (do cache do cardápio)"""
+    return _get_catalog()["by_category"].get(category, [])
 
 def get_product_by_id(product_id):
     """Retorna um produto pelo ID"""
@@ -48,149 +146,104 @@ def get_product_by_id(product_id):
     except:
         return None
 
-def update_product(product_id, name, description, category, price, ingredients, available):
-    """Atualiza um produto"""
+def update_product(product_id, name, description, category, price, ingredients, available, sku=None):
+    """Atualiza um produto (sku vazio mantém o atual)"""
     try:
-        price = float(price)
-        result = products_col.update_one(
-            {"_id": ObjectId(product_id)},
-            {"$set": {
-                "name": name,
-                "description": description,
-                "category": category,
-                "price": price,
-                "available": available,
-                "ingredients": ingredients
-            }}
-        )
-        return result.modified_count > 0
-    except:
-        return False
+        product_id = ObjectId(product_id)
+    except Exception:
+        return {"error": "ID de produto inválido"}, 400
+    try:
+        price = parse_price(price)
+    except (ValueError, TypeError):
+        return {"error": "Preço deve ser um número válido"}, 400
+    try:
+        sku = normalize_sku(sku)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    fields = {
+        "name": name,
+        "description": description,
+        "category": category,
+        "price": price,
+        "available": available,
+        "ingredients": ingredients
+    }
+    if sku:
+        fields["sku"] = sku
+    try:
+        result = products_col.update_one({"_id": product_id}, {"$set": fields})
+    except DuplicateKeyError:
+        return {"error": f"Já existe um produto com o SKU '{sku}'"}, 409
+    if result.matched_count == 0:
+        return {"error": "Produto não encontrado"}, 404
+    # Salvar sem alterações não muda o catálogo: o cache continua válido
+    if result.modified_count > 0:
+        invalidate_catalog_cache()
+    return {"message": "Produto atualizado com sucesso"}, 200
 
 def delete_product(product_id):
     """Deleta um produto"""
     try:
         result = products_col.delete_one({"_id": ObjectId(product_id)})
-        return result.deleted_count > 0
+        if result.deleted_count > 0:
+            invalidate_catalog_cache()
+            return True
+        return False
     except:
         return False
 
 def get_categories():
-    """Retorna todas as categorias únicas"""
-    categories = products_col.distinct("category")
-    return sorted(categories)
+    """Retorna todas as categorias únicas (do cache do cardápio)"""
+    return _get_catalog()["categories"]
+
+def watch_catalog_changes():
+    """Invalida o cache a cada alteração na coleção de produtos (requer replica set)"""
+    while True:
+        try:
+            with products_col.watch() as stream:
+                # Alterações feitas enquanto o stream estava fechado não foram vistas
+                invalidate_catalog_cache()
+                for _ in stream:
+                    invalidate_catalog_cache()
+        except PyMongoError as e:
+            # Sem replica set o change stream não é suportado; o TTL continua valendo
+            print(f"⚠️ Change stream de produtos indisponível: {e}")
+            time.sleep(CATALOG_CACHE_TTL)
+
+def start_catalog_watcher():
+    """Inicia o change stream do catálogo em uma thread de segundo plano"""
+    thread = threading.Thread(target=watch_catalog_changes, name="catalog-watcher", daemon=True)
+    thread.start()
+    return thread
+
+# Processo em que o change stream foi iniciado: threads não sobrevivem ao fork dos workers
+_watcher_pid = None
+
+def _ensure_catalog_watcher():
+    """Inicia o change stream uma vez por processo"""
+    global _watcher_pid
+    if _watcher_pid != os.getpid():
+        _watcher_pid = os.getpid()
+        start_catalog_watcher()
 
 def initialize_products():
-    """Inicializa produtos padrão se não existirem"""
+    """Inicializa produtos padrão (data/default_products.json) se não existirem"""
     if products_col.count_documents({}) == 0:
-        default_products = [
-            # Hambúrgueres
-            {
-                "name": "Hambúrguer Simples",
-                "description": "Pão, carne e queijo",
-                "category": "Hambúrgueres",
-                "price": 15.90,
-                "available": True,
-                "ingredients": ["pão", "carne", "queijo"]
-            },
-            {
-                "name": "Hambúrguer Salada",
-                "description": "Pão, carne, queijo, alface e tomate",
-                "category": "Hambúrgueres",
-                "price": 18.90,
-                "available": True,
-                "ingredients": ["pão", "carne", "queijo", "alface", "tomate"]
-            },
-            {
-                "name": "Hambúrguer Cheddar",
-                "description": "Pão, carne, cheddar, alface e tomate",
-                "category": "Hambúrgueres",
-                "price": 21.90,
-                "available": True,
-                "ingredients": ["pão", "carne", "cheddar", "alface", "tomate"]
-            },
-            {
-                "name": "Hambúrguer Bacon",
-                "description": "Pão, carne, queijo, bacon, alface e tomate",
-                "category": "Hambúrgueres",
-                "price": 23.90,
-                "available": True,
-                "ingredients": ["pão", "carne", "queijo", "bacon", "alface", "tomate"]
-            },
-            {
-                "name": "Hambúrguer Cheddar Bacon",
-                "description": "Pão, carne, cheddar, bacon, alface e tomate",
-                "category": "Hambúrgueres",
-                "price": 26.90,
-                "available": True,
-                "ingredients": ["pão", "carne", "cheddar", "bacon", "alface", "tomate"]
-            },
-            {
-                "name": "Hambúrguer Costela",
-                "description": "Hambúrguer de costela, pão, queijo, alface e tomate",
-                "category": "Hambúrgueres",
-                "price": 28.90,
-                "available": True,
-                "ingredients": ["pão", "hambúrguer de costela", "queijo", "alface", "tomate"]
-            },
-            {
-                "name": "Hambúrguer Frango",
-                "description": "Hambúrguer de frango, pão, queijo, alface e tomate",
-                "category": "Hambúrgueres",
-                "price": 19.90,
-                "available": True,
-                "ingredients": ["pão", "hambúrguer de frango", "queijo", "alface", "tomate"]
-            },
-            {
-                "name": "Duplo Hambúrguer",
-                "description": "Pão, queijo, duas carnes, alface e tomate",
-                "category": "Hambúrgueres",
-                "price": 32.90,
-                "available": True,
-                "ingredients": ["pão", "queijo", "duas carnes", "alface", "tomate"]
-            },
-            # Bebidas
-            {
-                "name": "Coca-Cola 350ml",
-                "description": "Refrigerante de cola gelado",
-                "category": "Refrigerantes e Sucos",
-                "price": 5.90,
-                "available": True,
-                "ingredients": ["água", "açúcar", "extrato de cola"]
-            },
-            {
-                "name": "Guaraná Antarctica 350ml",
-                "description": "Refrigerante de guaraná gelado",
-                "category": "Refrigerantes e Sucos",
-                "price": 5.90,
-                "available": True,
-                "ingredients": ["água", "açúcar", "extrato de guaraná"]
-            },
-            {
-                "name": "Fanta Laranja 350ml",
-                "description": "Refrigerante sabor laranja gelado",
-                "category": "Refrigerantes e Sucos",
-                "price": 5.90,
-                "available": True,
-                "ingredients": ["água", "açúcar", "sabor laranja"]
-            },
-            {
-                "name": "Suco de Laranja Natural",
-                "description": "Suco natural de laranja",
-                "category": "Refrigerantes e Sucos",
-                "price": 8.90,
-                "available": True,
-                "ingredients": ["laranja natural"]
-            },
-            {
-                "name": "Água Mineral 500ml",
-                "description": "Água mineral sem gás",
-                "category": "Refrigerantes e Sucos",
-                "price": 3.90,
-                "available": True,
-                "ingredients": ["água mineral"]
-            }
-        ]
-        
-        products_col.insert_many(default_products)
-        print("✅ Produtos iniciais criados com sucesso!")
+        # Import local: import_service depende deste módulo
+        from services.import_service import import_products, load_default_products
+
+        response, status = import_products(load_default_products())
+        if status == 200:
+            print("✅ Produtos iniciais criados com sucesso!")
+        else:
+            print(f"⚠️ Erro ao criar produtos iniciais: {response.get('error')}")
+    else:
+        # Bancos semeados antes dos SKUs: sem eles a importação duplicaria o cardápio
+        from services.import_service import backfill_skus
+
+        updated, missing = backfill_skus()
+        if updated:
+            print(f"✅ SKU atribuído a {updated} produto(s) do cardápio padrão")
+        if missing:
+            print(f"⚠️ {missing} produto(s) sem SKU: defina o SKU na edição do produto antes de importá-los")
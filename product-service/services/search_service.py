@@ -0,0 +1,149 @@
+# Busca de produtos no servidor por nome, descrição, ingredientes e categoria
+#
+# Um índice invertido em memória (termo normalizado -> produtos) é reconstruído
+# sempre que o cache do cardápio é recarregado (escritas, change stream ou TTL em
+# product_service). Os termos são normalizados sem acentos e em minúsculas, então
+# "hamburguer" encontra "Hambúrguer" e "guarana" encontra "Guaraná"; cada termo da
+# busca casa também por prefixo ("hamb bac"), e todos precisam casar.
+
+from config.database import get_db
+from models.product_model import serialize_product
+from services.product_service import get_catalog_snapshot
+import bisect
+import re
+import threading
+import unicodedata
+
+db = get_db()
+products_col = db["products"]
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+# Peso de cada campo no ranking
+FIELD_WEIGHTS = {"name": 3.0, "ingredients": 2.0, "category": 1.0, "description": 1.0}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def normalize(text):
+    """Texto sem acentos e em minúsculas"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+class SearchIndex:
+    """Índice invertido dos produtos: termo -> {posição do produto: peso}"""
+
+    def __init__(self, products):
+        self.products = products
+        self.categories = [normalize(product.get("category")) for product in products]
+        postings = {}
+        for position, product in enumerate(products):
+            fields = {
+                "name": product.get("name"),
+                "ingredients": " ".join(product.get("ingredients") or []),
+                "category": product.get("category"),
+                "description": product.get("description"),
+            }
+            for field, text in fields.items():
+                for token in tokenize(text):
+                    entry = postings.setdefault(token, {})
+                    entry[position] = entry.get(position, 0) + FIELD_WEIGHTS[field]
+        self.postings = postings
+        self.vocabulary = sorted(postings)  # para casar termos por prefixo com bisect
+
+    def _match(self, term):
+        """Produtos que têm algum termo começando por term; termo exato vale mais"""
+        scores = {}
+        start = bisect.bisect_left(self.vocabulary, term)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            factor = 1.0 if token == term else 0.5
+            for position, weight in self.postings[token].items():
+                scores[position] = max(scores.get(position, 0), weight * factor)
+        return scores
+
+    def search(self, query="", category=None, available=True, min_price=None, max_price=None, limit=SEARCH_DEFAULT_LIMIT):
+        """Retorna (total de resultados, [(pontuação, produto)]) ordenados por relevância"""
+        terms = tokenize(query)
+        if terms:
+            scores = None
+            # Começa pelo termo mais raro: a interseção encolhe mais rápido
+            for matches in sorted((self._match(term) for term in terms), key=len):
+                if scores is None:
+                    scores = dict(matches)
+                else:
+                    scores = {position: score + matches[position] for position, score in scores.items() if position in matches}
+                if not scores:
+                    break
+            candidates = scores or {}
+        else:
+            candidates = dict.fromkeys(range(len(self.products)), 0.0)
+
+        category = normalize(category) if category else None
+        results = []
+        for position, score in candidates.items():
+            product = self.products[position]
+            if available is not None and product.get("available", True) != available:
+                continue
+            if category and self.categories[position] != category:
+                continue
+            price = product.get("price") or 0
+            if (min_price is not None and price < min_price) or (max_price is not None and price > max_price):
+                continue
+            results.append((score, product))
+
+        # Mais relevantes primeiro; empate (ou busca sem termos) em ordem de categoria e nome
+        results.sort(key=lambda result: (-result[0], result[1].get("category") or "", result[1].get("name") or ""))
+        return len(results), results[:limit]
+
+_index_lock = threading.Lock()
+_index = (None, None)  # (snapshot do cardápio de origem, índice)
+
+def get_search_index():
+    """Índice da versão atual do cardápio, reconstruído quando o cache do cardápio é recarregado"""
+    global _index
+    snapshot = get_catalog_snapshot()
+    source, index = _index
+    if source is snapshot:
+        return index
+    with _index_lock:
+        source, index = _index
+        if source is not snapshot:
+            # O índice também cobre produtos indisponíveis (filtro available=all)
+            products = [serialize_product(product) for product in products_col.find()]
+            index = SearchIndex(products)
+            _index = (snapshot, index)
+        return index
+
+def _parse_price(value):
+    if value in (None, ""):
+        return None
+    try:
+        return float(str(value).replace(",", "."))
+    except ValueError:
+        raise ValueError(f"Preço inválido: '{value}'")
+
+def search_products(query="", category=None, available="true", min_price=None, max_price=None, limit=None):
+    """Busca produtos com filtros; retorna (resposta, status)"""
+    try:
+        min_price, max_price = _parse_price(min_price), _parse_price(max_price)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    try:
+        limit = int(limit) if limit else SEARCH_DEFAULT_LIMIT
+    except (ValueError, TypeError):
+        limit = SEARCH_DEFAULT_LIMIT
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    # available: "true" (padrão), "false" ou "all"
+    available = {"false": False, "all": None}.get(str(available).lower(), True)
+
+    total, results = get_search_index().search(query or "", category, available, min_price, max_price, limit)
+    return {
+        "query": query or "",
+        "total": total,
+        "results": [{**product, "score": round(score, 2)} for score, product in results]
+    }, 200
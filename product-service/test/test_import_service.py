@@ -0,0 +1,169 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, PyMongoError
+from services.import_service import parse_rows, validate_row, import_products, load_default_products, backfill_skus
+
+@pytest.fixture
+def mock_products_col():
+    with patch('services.import_service.products_col') as mock:
+        yield mock
+
+@pytest.fixture
+def mock_invalidate():
+    with patch('services.import_service.invalidate_catalog_cache') as mock:
+        yield mock
+
+ROWS = [
+    {'sku': 'HAMB-BACON', 'name': 'Hambúrguer Bacon', 'category': 'Hambúrgueres', 'price': '23,90',
+     'ingredients': 'pão; carne; bacon'},
+    {'sku': 'BEB-COCA-350', 'name': 'Coca-Cola 350ml', 'category': 'Refrigerantes e Sucos', 'price': 5.9,
+     'available': 'false'},
+]
+
+class TestImportService:
+
+    def test_parse_csv(self):
+        content = '\ufeffsku,name,category,price,available,ingredients\nHAMB-1,Burger,Hambúrgueres,"20,50",sim,pão;carne\nBEB-1,Água,Bebidas,3,,\n'
+
+        rows = parse_rows('csv', content)
+
+        assert rows[0] == {'sku': 'HAMB-1', 'name': 'Burger', 'category': 'Hambúrgueres', 'price': '20,50',
+                           'available': 'sim', 'ingredients': 'pão;carne'}
+        # Células vazias não viram campos
+        assert 'available' not in rows[1]
+
+    def test_parse_json(self):
+        assert parse_rows('json', '[{"sku": "A1"}]') == [{'sku': 'A1'}]
+        assert parse_rows('json', {'products': [{'sku': 'A1'}]}) == [{'sku': 'A1'}]
+        with pytest.raises(ValueError):
+            parse_rows('json', '{"sku": "A1"}')
+        with pytest.raises(ValueError):
+            parse_rows('json', 'not json')
+        with pytest.raises(ValueError):
+            parse_rows('xml', '<a/>')
+
+    def test_validate_row(self):
+        product, errors = validate_row(ROWS[0])
+
+        assert errors == []
+        assert product == {'sku': 'HAMB-BACON', 'name': 'Hambúrguer Bacon', 'category': 'Hambúrgueres',
+                           'price': 23.9, 'ingredients': ['pão', 'carne', 'bacon']}
+
+    def test_validate_row_errors(self):
+        assert validate_row({'sku': 'A1', 'name': 'X'})[1] == ['Campo obrigatório ausente: category',
+                                                                  'Campo obrigatório ausente: price']
+        product, errors = validate_row({'sku': 'a b', 'name': 'X', 'category': 'Y', 'price': 'caro', 'available': 'talvez'})
+        assert product is None
+        assert len(errors) == 3
+
+    @pytest.mark.parametrize('price', ['nan', 'inf', '-inf'])
+    def test_validate_row_rejects_non_finite_price(self, price):
+        product, errors = validate_row({'sku': 'HAMB-1', 'name': 'Burger', 'category': 'Hambúrgueres', 'price': price})
+
+        assert product is None
+        assert errors == ['Preço deve ser um número válido']
+
+    def test_import_single_bulk_write(self, mock_products_col, mock_invalidate):
+        new_id = ObjectId()
+        mock_products_col.bulk_write.return_value = MagicMock(upserted_ids={1: new_id}, matched_count=1)
+
+        response, status = import_products(ROWS)
+
+        assert status == 200
+        assert response['created'] == 1
+        assert response['updated'] == 1
+        assert [row['status'] for row in response['results']] == ['updated', 'created']
+        assert response['results'][1]['id'] == str(new_id)
+        mock_products_col.bulk_write.assert_called_once()
+        mock_invalidate.assert_called_once()
+
+        operations = mock_products_col.bulk_write.call_args[0][0]
+        assert operations[0]._filter == {'sku': 'HAMB-BACON'}
+        assert operations[0]._upsert is True
+        # Campos ausentes só recebem o padrão na criação
+        assert operations[0]._doc['$setOnInsert'] == {'description': '', 'available': True}
+        assert operations[1]._doc['$set']['available'] is False
+
+    def test_import_invalid_rows_writes_nothing(self, mock_products_col, mock_invalidate):
+        rows = ROWS + [{'sku': 'HAMB-BACON', 'name': 'Outro', 'category': 'X', 'price': 1}, {'name': 'Sem SKU'}]
+
+        response, status = import_products(rows)
+
+        assert status == 400
+        assert [row['index'] for row in response['results']] == [2, 3]
+        assert 'SKU repetido' in response['results'][0]['errors'][0]
+        mock_products_col.bulk_write.assert_not_called()
+        mock_invalidate.assert_not_called()
+
+    def test_import_partial_write_failure(self, mock_products_col, mock_invalidate):
+        new_id = ObjectId()
+        mock_products_col.bulk_write.side_effect = BulkWriteError({
+            'writeErrors': [{'index': 0, 'code': 11000, 'errmsg': 'duplicate key'}],
+            'upserted': [{'index': 1, '_id': new_id}],
+            'nMatched': 0
+        })
+
+        response, status = import_products(ROWS)
+
+        assert status == 207
+        assert response['failed'] == 1
+        assert response['results'][0]['status'] == 'error'
+        assert response['results'][1]['status'] == 'created'
+        mock_invalidate.assert_called_once()
+
+    def test_import_database_error(self, mock_products_col, mock_invalidate):
+        mock_products_col.bulk_write.side_effect = PyMongoError('down')
+
+        response, status = import_products(ROWS)
+
+        assert status == 503
+
+    def test_import_limits(self, mock_products_col):
+        assert import_products([])[1] == 400
+        with patch('services.import_service.IMPORT_MAX_ROWS', 1):
+            assert import_products(ROWS)[1] == 413
+
+    def test_default_products_are_valid(self):
+        rows = load_default_products()
+
+        assert len(rows) > 0
+        assert all(validate_row(row)[1] == [] for row in rows)
+        assert len({row['sku'] for row in rows}) == len(rows)
+
+class TestBackfillSkus:
+
+    DEFAULTS = [{'sku': 'HAMB-SIMPLES', 'name': 'Hambúrguer Simples'}, {'sku': 'BEB-AGUA', 'name': 'Água'}]
+
+    def test_backfill_matches_default_names(self, mock_products_col, mock_invalidate):
+        first, repeated, custom = ObjectId(), ObjectId(), ObjectId()
+        mock_products_col.find.return_value = [
+            {'_id': first, 'name': 'Hambúrguer Simples'},
+            {'_id': repeated, 'name': 'Hambúrguer Simples'},
+            {'_id': custom, 'name': 'Criado na tela'},
+        ]
+        mock_products_col.distinct.return_value = []
+        mock_products_col.bulk_write.return_value = MagicMock(modified_count=1)
+
+        updated, missing = backfill_skus(self.DEFAULTS)
+
+        assert (updated, missing) == (1, 2)
+        operations = mock_products_col.bulk_write.call_args.args[0]
+        assert len(operations) == 1
+        assert operations[0]._filter == {'_id': first, 'sku': {'$not': {'$type': 'string'}}}
+        assert operations[0]._doc == {'$set': {'sku': 'HAMB-SIMPLES'}}
+        mock_invalidate.assert_called_once()
+
+    def test_backfill_skips_taken_skus(self, mock_products_col, mock_invalidate):
+        mock_products_col.find.return_value = [{'_id': ObjectId(), 'name': 'Água'}]
+        mock_products_col.distinct.return_value = ['BEB-AGUA']
+
+        assert backfill_skus(self.DEFAULTS) == (0, 1)
+        mock_products_col.bulk_write.assert_not_called()
+
+    def test_backfill_nothing_missing(self, mock_products_col, mock_invalidate):
+        mock_products_col.find.return_value = []
+
+        assert backfill_skus(self.DEFAULTS) == (0, 0)
+        mock_products_col.distinct.assert_not_called()
+        mock_invalidate.assert_not_called()
@@ -0,0 +1,70 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+from bson import ObjectId
+from flask import Flask, jsonify, request
+from config import json_provider
+from config.json_provider import init_json, dumps, loads
+
+OID = ObjectId('65a1b2c3d4e5f60718293a4b')
+PAYLOAD = {'id': OID, 'created_at': datetime(2026, 1, 1, 12, 30), 'total': Decimal('10.50'), 'nome': 'Pão'}
+EXPECTED = {'id': str(OID), 'created_at': '2026-01-01T12:30:00+00:00', 'total': '10.50', 'nome': 'Pão'}
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    init_json(app)
+
+    @app.route('/data')
+    def data():
+        return jsonify(PAYLOAD)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify(request.get_json())
+
+    return app
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def backend(request):
+    if request.param == 'orjson':
+        yield
+    else:
+        with patch.object(json_provider, 'orjson', None):
+            yield
+
+class TestJsonProvider:
+
+    def test_dumps_native_types(self, backend):
+        assert json.loads(dumps(PAYLOAD)) == EXPECTED
+
+    def test_aware_datetime(self, backend):
+        value = datetime(2026, 1, 1, 9, 0, tzinfo=timezone.utc)
+
+        assert json.loads(dumps({'at': value})) == {'at': '2026-01-01T09:00:00+00:00'}
+
+    def test_unknown_type(self, backend):
+        with pytest.raises(TypeError):
+            dumps({'value': object()})
+
+    def test_loads(self, backend):
+        assert loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+        with pytest.raises(ValueError):
+            loads('{invalid')
+
+    def test_jsonify(self, app, backend):
+        response = app.test_client().get('/data')
+
+        assert response.mimetype == 'application/json'
+        assert response.json == EXPECTED
+
+    def test_get_json(self, app, backend):
+        client = app.test_client()
+
+        assert client.post('/echo', json={'items': [{'sku': 'A1'}]}).json == {'items': [{'sku': 'A1'}]}
+        assert client.post('/echo', data='{invalid', content_type='application/json').status_code == 400
+
+    def test_dumps_with_options_uses_stdlib(self, app):
+        assert app.json.dumps({'b': 1, 'a': OID}, sort_keys=True) == f'{{"a": "{OID}", "b": 1}}'
@@ -1,10 +1,13 @@
 ﻿import pytest
+from datetime import datetime, timezone
+import io
 from unittest.mock import patch, MagicMock
 
 # IMPORTANTE: Mockar initialize_products ANTES de importar o controller
 with patch('services.product_service.initialize_products'):
     from flask import Flask
     from controllers.product_controller import product_bp
+    from config import auth
 
 @pytest.fixture
 def app():
@@ -18,6 +21,28 @@ def app():
 def client(app):
     return app.test_client()
 
+CATALOG_MODIFIED_AT = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture(autouse=True)
+def catalog_revision():
+    with patch('controllers.product_controller.get_catalog_revision',
+               return_value=('rev1', CATALOG_MODIFIED_AT)) as mock:
+        yield mock
+
+@pytest.fixture(autouse=True)
+def jwt_keys():
+    with patch.object(auth, 'JWT_KEYS', {'k1': 'chave-de-teste-com-pelo-menos-32-bytes'}), patch.object(auth, 'ACTIVE_KID', 'k1'):
+        yield
+    auth.clear_token_cache()
+
+def auth_headers(role='admin', email='admin@email.com'):
+    return {'Authorization': f"Bearer {auth.encode_token({'email': email, 'role': role})}"}
+
+@pytest.fixture(autouse=True)
+def menu_fragments():
+    with patch('controllers.product_controller._menu_fragments', (None, {})):
+        yield
+
 class TestProductController:
 
     @patch('controllers.product_controller.render_template')
@@ -31,7 +56,8 @@ class TestProductController:
         response = client.get('/product/list')
 
         assert response.status_code == 200
-        mock_render.assert_called_once()
+        # Fragmento do cardápio + página
+        assert [call.args[0] for call in mock_render.call_args_list] == ['product_menu.html', 'product_list.html']
 
     @patch('controllers.product_controller.render_template')
     @patch('controllers.product_controller.get_available_products')
@@ -47,6 +73,44 @@ class TestProductController:
 
         assert response.status_code == 200
         mock_by_category.assert_called_once_with('Hambúrgueres')
+        mock_available.assert_not_called()
+
+    @patch('controllers.product_controller.get_available_products')
+    @patch('controllers.product_controller.get_products_by_category')
+    @patch('controllers.product_controller.get_categories')
+    def test_list_products_fragment_cache(self, mock_categories, mock_by_category, mock_available, client, catalog_revision):
+        mock_available.return_value = [{'id': '1', 'name': 'Burger X', 'category': 'Hambúrgueres', 'price': 20.0,
+                                        'description': 'Pão e carne', 'ingredients': ['pão'], 'available': True}]
+        mock_by_category.return_value = []
+        mock_categories.return_value = ['Hambúrgueres']
+
+        with patch('controllers.product_controller.render_template', side_effect=lambda name, **context: name):
+            client.get('/product/list')
+            client.get('/product/list')
+            client.get('/product/list?category=Inexistente')
+            client.get('/product/list?category=Inexistente')
+            assert mock_available.call_count == 1
+            # Categoria desconhecida não fica em cache
+            assert mock_by_category.call_count == 2
+
+            catalog_revision.return_value = ('rev2', CATALOG_MODIFIED_AT)
+            client.get('/product/list')
+            assert mock_available.call_count == 2
+
+    @patch('controllers.product_controller.get_available_products')
+    @patch('controllers.product_controller.get_categories')
+    def test_list_products_renders_menu(self, mock_categories, mock_available, app, client):
+        app.template_folder = '../templates'
+        mock_available.return_value = [{'id': '1', 'name': 'Burger <X>', 'category': 'Hambúrgueres', 'price': 20.0,
+                                        'description': 'Pão e carne', 'ingredients': ['pão'], 'available': True}]
+        mock_categories.return_value = ['Hambúrgueres']
+
+        response = client.get('/product/list')
+
+        html = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert 'Burger &lt;X&gt;' in html
+        assert 'R$ 20.00' in html
 
     @patch('controllers.product_controller.render_template')
     @patch('controllers.product_controller.get_all_products')
@@ -84,10 +148,12 @@ class TestProductController:
             'category': 'Hambúrgueres',
             'price': '25.90',
             'ingredients': 'pão, carne, queijo',
-            'available': 'on'
+            'available': 'on',
+            'sku': 'HAMB-X'
         })
 
         mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs['sku'] == 'HAMB-X'
         mock_redirect.assert_called()
 
     @patch('controllers.product_controller.redirect')
@@ -135,7 +201,7 @@ class TestProductController:
     @patch('controllers.product_controller.update_product')
     def test_edit_product_post_success(self, mock_update, mock_get_product, mock_redirect, client):
         mock_get_product.return_value = {'id': '123', 'name': 'Burger X'}
-        mock_update.return_value = True
+        mock_update.return_value = ({'message': 'Produto atualizado com sucesso'}, 200)
         mock_redirect.return_value = 'redirect_response'
 
         response = client.post('/product/edit/123', data={
@@ -155,7 +221,7 @@ class TestProductController:
     @patch('controllers.product_controller.update_product')
     def test_edit_product_post_error(self, mock_update, mock_get_product, mock_redirect, client):
         mock_get_product.return_value = {'id': '123', 'name': 'Burger X'}
-        mock_update.return_value = False
+        mock_update.return_value = ({'error': "Já existe um produto com o SKU 'HAMB-X'"}, 409)
         mock_redirect.return_value = 'redirect_response'
 
         response = client.post('/product/edit/123', data={
@@ -164,10 +230,14 @@ class TestProductController:
             'category': 'Hambúrgueres',
             'price': '25.00',
             'ingredients': 'pão',
-            'available': 'on'
+            'available': 'on',
+            'sku': 'HAMB-X'
         })
 
-        mock_redirect.assert_called()
+        # Volta para o formulário de edição com a mensagem do erro
+        assert mock_redirect.call_args.args[0] == '/product/edit/123'
+        with client.session_transaction() as session:
+            assert session['_flashes'] == [('message', "Já existe um produto com o SKU 'HAMB-X'")]
 
     @patch('controllers.product_controller.redirect')
     @patch('controllers.product_controller.delete_product')
@@ -237,3 +307,95 @@ class TestProductController:
 
         assert response.status_code == 200
         assert response.json == ['Hambúrgueres', 'Bebidas']
+
+    @patch('controllers.product_controller.get_available_products')
+    def test_api_products_sets_etag(self, mock_products, client):
+        mock_products.return_value = [{'id': '123', 'name': 'Burger X'}]
+
+        response = client.get('/product/api/products')
+
+        assert response.headers['ETag'] == '"rev1"'
+        assert response.headers['Last-Modified'] == 'Wed, 01 Jan 2025 12:00:00 GMT'
+        assert response.headers['Cache-Control'] == 'no-cache'
+
+    @patch('controllers.product_controller.get_available_products')
+    def test_api_products_not_modified(self, mock_products, client):
+        response = client.get('/product/api/products', headers={'If-None-Match': '"rev1"'})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == '"rev1"'
+        mock_products.assert_not_called()
+
+    @patch('controllers.product_controller.get_categories')
+    def test_api_categories_stale_etag(self, mock_categories, client):
+        mock_categories.return_value = ['Bebidas']
+
+        response = client.get('/product/api/categories', headers={'If-None-Match': '"rev0"'})
+
+        assert response.status_code == 200
+        assert response.json == ['Bebidas']
+
+    @patch('controllers.product_controller.get_categories')
+    def test_api_categories_if_modified_since(self, mock_categories, client):
+        response = client.get('/product/api/categories',
+                              headers={'If-Modified-Since': 'Wed, 01 Jan 2025 12:00:00 GMT'})
+
+        assert response.status_code == 304
+        mock_categories.assert_not_called()
+
+    @patch('controllers.product_controller.search_products')
+    def test_api_search(self, mock_search, client):
+        mock_search.return_value = ({'query': 'bacon', 'total': 0, 'results': []}, 200)
+
+        response = client.get('/product/api/search?q=bacon&category=Porções&max_price=30')
+
+        assert response.status_code == 200
+        mock_search.assert_called_once_with(query='bacon', category='Porções', available='true',
+                                            min_price=None, max_price='30', limit=None)
+
+    @patch('controllers.product_controller.import_products')
+    def test_api_import_json(self, mock_import, client):
+        mock_import.return_value = ({'created': 1, 'updated': 0, 'failed': 0, 'results': []}, 200)
+
+        response = client.post('/product/api/products/import', json=[{'sku': 'A1'}], headers=auth_headers())
+
+        assert response.status_code == 200
+        mock_import.assert_called_once_with([{'sku': 'A1'}])
+
+    @patch('controllers.product_controller.import_products')
+    def test_api_import_csv_body(self, mock_import, client):
+        mock_import.return_value = ({'created': 1, 'updated': 0, 'failed': 0, 'results': []}, 200)
+
+        response = client.post('/product/api/products/import', data='sku,name\nA1,Burger\n',
+                               content_type='text/csv', headers=auth_headers())
+
+        assert response.status_code == 200
+        mock_import.assert_called_once_with([{'sku': 'A1', 'name': 'Burger'}])
+
+    @patch('controllers.product_controller.import_products')
+    def test_api_import_uploaded_file(self, mock_import, client):
+        mock_import.return_value = ({'created': 1, 'updated': 0, 'failed': 0, 'results': []}, 200)
+
+        response = client.post('/product/api/products/import',
+                               data={'file': (io.BytesIO('sku,name\nA1,Pão\n'.encode()), 'menu.csv')},
+                               content_type='multipart/form-data', headers=auth_headers())
+
+        assert response.status_code == 200
+        mock_import.assert_called_once_with([{'sku': 'A1', 'name': 'Pão'}])
+
+    @patch('controllers.product_controller.import_products')
+    def test_api_import_invalid_body(self, mock_import, client):
+        response = client.post('/product/api/products/import', data='not json', content_type='application/json',
+                               headers=auth_headers())
+
+        assert response.status_code == 400
+        mock_import.assert_not_called()
+
+    @patch('controllers.product_controller.import_products')
+    def test_api_import_requires_admin(self, mock_import, client):
+        assert client.post('/product/api/products/import', json=[{'sku': 'A1'}]).status_code == 401
+        response = client.post('/product/api/products/import', json=[{'sku': 'A1'}], headers=auth_headers('cliente'))
+        assert response.status_code == 403
+        mock_import.assert_not_called()
+
@@ -1,16 +1,20 @@
 ﻿import pytest
 from unittest.mock import patch, MagicMock
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from services.product_service import (
     create_product, get_all_products, get_available_products,
     get_products_by_category, get_product_by_id, update_product,
-    delete_product, get_categories, initialize_products
+    delete_product, get_categories, initialize_products, invalidate_catalog_cache,
+    get_catalog_revision
 )
 
 @pytest.fixture
 def mock_products_col():
+    invalidate_catalog_cache()
     with patch('services.product_service.products_col') as mock:
         yield mock
+    invalidate_catalog_cache()
 
 class TestProductService:
 
@@ -29,6 +33,32 @@ class TestProductService:
         assert status == 400
         assert 'error' in response
 
+    @pytest.mark.parametrize('price', ['nan', 'inf', '-Infinity'])
+    def test_create_product_rejects_non_finite_price(self, mock_products_col, price):
+        response, status = create_product('Burger X', 'Delicious burger', 'Hambúrgueres', price, ['pão'])
+
+        assert status == 400
+        mock_products_col.insert_one.assert_not_called()
+
+    def test_create_product_with_sku(self, mock_products_col):
+        mock_products_col.insert_one.return_value = MagicMock(inserted_id=ObjectId())
+
+        response, status = create_product('Burger X', 'Delicious', 'Hambúrgueres', '25,90', ['pão'], sku=' HAMB-X ')
+
+        assert status == 201
+        product = mock_products_col.insert_one.call_args.args[0]
+        assert product['sku'] == 'HAMB-X'
+        assert product['price'] == 25.9
+
+    def test_create_product_invalid_or_duplicate_sku(self, mock_products_col):
+        assert create_product('Burger X', 'Desc', 'Hambúrgueres', '10', [], sku='sku inválido')[1] == 400
+        mock_products_col.insert_one.side_effect = DuplicateKeyError('E11000')
+
+        response, status = create_product('Burger X', 'Desc', 'Hambúrgueres', '10', [], sku='HAMB-X')
+
+        assert status == 409
+        assert 'HAMB-X' in response['error']
+
     def test_get_all_products(self, mock_products_col):
         mock_products_col.find.return_value.sort.return_value = [
             {'_id': ObjectId(), 'name': 'Burger 1', 'price': 20.0, 'available': True},
@@ -51,13 +81,65 @@ class TestProductService:
 
     def test_get_products_by_category(self, mock_products_col):
         mock_products_col.find.return_value.sort.return_value = [
-            {'_id': ObjectId(), 'name': 'Burger 1', 'category': 'Hambúrgueres', 'available': True}
+            {'_id': ObjectId(), 'name': 'Burger 1', 'category': 'Hambúrgueres', 'available': True},
+            {'_id': ObjectId(), 'name': 'Coca-Cola', 'category': 'Bebidas', 'available': True}
         ]
 
         products = get_products_by_category('Hambúrgueres')
 
         assert len(products) == 1
-        mock_products_col.find.assert_called_with({'category': 'Hambúrgueres', 'available': True})
+        assert products[0]['name'] == 'Burger 1'
+        assert get_products_by_category('Sobremesas') == []
+        mock_products_col.find.assert_called_once_with({'available': True})
+
+    def test_catalog_reads_are_cached(self, mock_products_col):
+        mock_products_col.find.return_value.sort.return_value = [
+            {'_id': ObjectId(), 'name': 'Burger 1', 'category': 'Hambúrgueres', 'available': True}
+        ]
+        mock_products_col.distinct.return_value = ['Hambúrgueres']
+
+        get_available_products()
+        get_categories()
+        get_products_by_category('Hambúrgueres')
+        get_available_products()
+
+        mock_products_col.find.assert_called_once()
+        mock_products_col.distinct.assert_called_once()
+
+    def test_catalog_cache_expires_after_ttl(self, mock_products_col):
+        mock_products_col.find.return_value.sort.return_value = []
+
+        get_available_products()
+        with patch('services.product_service.CATALOG_CACHE_TTL', -1):
+            get_available_products()
+
+        assert mock_products_col.find.call_count == 2
+
+    def test_writes_invalidate_catalog_cache(self, mock_products_col):
+        mock_products_col.find.return_value.sort.return_value = []
+        mock_products_col.insert_one.return_value = MagicMock(inserted_id=ObjectId())
+        mock_products_col.update_one.return_value = MagicMock(modified_count=1)
+        mock_products_col.delete_one.return_value = MagicMock(deleted_count=1)
+
+        get_available_products()
+        create_product('Burger X', 'Delicious burger', 'Hambúrgueres', '25.90', ['pão'])
+        get_available_products()
+        update_product(str(ObjectId()), 'Burger X', 'Desc', 'Hambúrgueres', '20.0', [], True)
+        get_available_products()
+        delete_product(str(ObjectId()))
+        get_available_products()
+
+        assert mock_products_col.find.call_count == 4
+
+    def test_failed_update_keeps_catalog_cache(self, mock_products_col):
+        mock_products_col.find.return_value.sort.return_value = []
+        mock_products_col.update_one.return_value = MagicMock(modified_count=0)
+
+        get_available_products()
+        update_product(str(ObjectId()), 'Burger X', 'Desc', 'Hambúrgueres', '20.0', [], True)
+        get_available_products()
+
+        mock_products_col.find.assert_called_once()
 
     def test_get_product_by_id_found(self, mock_products_col):
         product_id = ObjectId()
@@ -85,25 +167,66 @@ class TestProductService:
         assert product is None
 
     def test_update_product_success(self, mock_products_col):
-        mock_products_col.update_one.return_value = MagicMock(modified_count=1)
+        mock_products_col.update_one.return_value = MagicMock(matched_count=1, modified_count=1)
 
-        result = update_product(str(ObjectId()), 'New Name', 'New Desc', 'Category', '30.0', ['ingredient'], True)
+        response, status = update_product(str(ObjectId()), 'New Name', 'New Desc', 'Category', '30.0', ['ingredient'], True)
 
-        assert result is True
+        assert status == 200
+        assert response['message'] == 'Produto atualizado com sucesso'
+        assert 'sku' not in mock_products_col.update_one.call_args.args[1]['$set']
 
-    def test_update_product_not_modified(self, mock_products_col):
-        mock_products_col.update_one.return_value = MagicMock(modified_count=0)
+    def test_update_product_sets_sku(self, mock_products_col):
+        mock_products_col.update_one.return_value = MagicMock(matched_count=1, modified_count=1)
 
-        result = update_product(str(ObjectId()), 'New Name', 'New Desc', 'Category', '30.0', ['ingredient'], True)
+        _, status = update_product(str(ObjectId()), 'Name', 'Desc', 'Category', '30.0', [], True, sku='HAMB-X')
 
-        assert result is False
+        assert status == 200
+        assert mock_products_col.update_one.call_args.args[1]['$set']['sku'] == 'HAMB-X'
+
+    @pytest.mark.parametrize('price', ['nan', 'inf', 'abc'])
+    def test_update_product_invalid_price(self, mock_products_col, price):
+        response, status = update_product(str(ObjectId()), 'Name', 'Desc', 'Category', price, [], True)
 
-    def test_update_product_exception(self, mock_products_col):
-        mock_products_col.update_one.side_effect = Exception('DB Error')
+        assert status == 400
+        assert response['error'] == 'Preço deve ser um número válido'
+        mock_products_col.update_one.assert_not_called()
 
-        result = update_product('invalid_id', 'Name', 'Desc', 'Category', '30.0', ['ingredient'], True)
+    def test_update_product_invalid_sku(self, mock_products_col):
+        response, status = update_product(str(ObjectId()), 'Name', 'Desc', 'Category', '30.0', [], True, sku='SKU com espaço')
 
-        assert result is False
+        assert status == 400
+        assert 'SKU' in response['error']
+        mock_products_col.update_one.assert_not_called()
+
+    def test_update_product_duplicate_sku(self, mock_products_col):
+        mock_products_col.update_one.side_effect = DuplicateKeyError('E11000')
+
+        response, status = update_product(str(ObjectId()), 'Name', 'Desc', 'Category', '30.0', [], True, sku='HAMB-X')
+
+        assert status == 409
+        assert response['error'] == "Já existe um produto com o SKU 'HAMB-X'"
+
+    def test_update_product_not_found(self, mock_products_col):
+        mock_products_col.update_one.return_value = MagicMock(matched_count=0, modified_count=0)
+
+        response, status = update_product(str(ObjectId()), 'New Name', 'New Desc', 'Category', '30.0', ['ingredient'], True)
+
+        assert status == 404
+        assert response['error'] == 'Produto não encontrado'
+
+    def test_update_product_unchanged(self, mock_products_col):
+        mock_products_col.update_one.return_value = MagicMock(matched_count=1, modified_count=0)
+
+        _, status = update_product(str(ObjectId()), 'New Name', 'New Desc', 'Category', '30.0', ['ingredient'], True)
+
+        assert status == 200
+
+    def test_update_product_invalid_id(self, mock_products_col):
+        response, status = update_product('invalid_id', 'Name', 'Desc', 'Category', '30.0', ['ingredient'], True)
+
+        assert status == 400
+        assert response['error'] == 'ID de produto inválido'
+        mock_products_col.update_one.assert_not_called()
 
     def test_delete_product_success(self, mock_products_col):
         mock_products_col.delete_one.return_value = MagicMock(deleted_count=1)
@@ -137,13 +260,36 @@ class TestProductService:
     def test_initialize_products_empty_db(self, mock_products_col):
         mock_products_col.count_documents.return_value = 0
 
-        initialize_products()
+        with patch('services.import_service.products_col') as mock_import_col:
+            mock_import_col.bulk_write.return_value = MagicMock(upserted_ids={0: ObjectId()}, matched_count=0)
+            initialize_products()
 
-        mock_products_col.insert_many.assert_called_once()
+        # Seed de data/default_products.json em um único bulk_write por SKU
+        mock_import_col.bulk_write.assert_called_once()
 
     def test_initialize_products_has_data(self, mock_products_col):
         mock_products_col.count_documents.return_value = 10
 
-        initialize_products()
-
-        mock_products_col.insert_many.assert_not_called()
+        with patch('services.import_service.products_col') as mock_import_col, \
+             patch('services.import_service.backfill_skus', return_value=(0, 0)) as mock_backfill:
+            initialize_products()
+
+        mock_import_col.bulk_write.assert_not_called()
+        # Bancos já semeados recebem os SKUs do cardápio padrão
+        mock_backfill.assert_called_once_with()
+
+    def test_catalog_revision_changes_with_content(self, mock_products_col):
+        product = {'_id': ObjectId(), 'name': 'Burger 1', 'category': 'Hambúrgueres', 'price': 20.0, 'available': True}
+        mock_products_col.find.return_value.sort.return_value = [product]
+        mock_products_col.distinct.return_value = ['Hambúrgueres']
+
+        revision, modified_at = get_catalog_revision()
+        invalidate_catalog_cache()
+        same_revision, same_modified_at = get_catalog_revision()
+        invalidate_catalog_cache()
+        mock_products_col.find.return_value.sort.return_value = [dict(product, price=22.0)]
+        new_revision, _ = get_catalog_revision()
+
+        assert revision == same_revision
+        assert modified_at == same_modified_at
+        assert new_revision != revision
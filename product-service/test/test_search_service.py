@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import patch
+from bson import ObjectId
+from services import search_service
+from services.search_service import SearchIndex, normalize, tokenize, search_products, get_search_index
+
+PRODUCTS = [
+    {'id': '1', 'name': 'Hambúrguer Bacon', 'description': 'Pão, carne, queijo e bacon', 'category': 'Hambúrgueres',
+     'price': 23.9, 'available': True, 'ingredients': ['pão', 'carne', 'queijo', 'bacon']},
+    {'id': '2', 'name': 'Hambúrguer Frango', 'description': 'Hambúrguer de frango', 'category': 'Hambúrgueres',
+     'price': 19.9, 'available': True, 'ingredients': ['pão', 'hambúrguer de frango', 'queijo']},
+    {'id': '3', 'name': 'Guaraná Antarctica 350ml', 'description': 'Refrigerante de guaraná', 'category': 'Refrigerantes e Sucos',
+     'price': 5.9, 'available': True, 'ingredients': ['água', 'açúcar', 'extrato de guaraná']},
+    {'id': '4', 'name': 'Batata com Bacon', 'description': 'Batata frita com bacon', 'category': 'Porções',
+     'price': 24.9, 'available': False, 'ingredients': ['batata', 'bacon']},
+]
+
+@pytest.fixture
+def index():
+    return SearchIndex(PRODUCTS)
+
+def ids(results):
+    return [product['id'] for _, product in results]
+
+class TestSearchService:
+
+    def test_normalize_removes_accents(self):
+        assert normalize('Hambúrguer Guaraná AÇÚCAR') == 'hamburguer guarana acucar'
+        assert tokenize('Coca-Cola 350ml') == ['coca', 'cola', '350ml']
+
+    def test_search_accent_insensitive(self, index):
+        total, results = index.search('guarana')
+
+        assert total == 1
+        assert ids(results) == ['3']
+
+    def test_search_prefix_and_all_terms(self, index):
+        total, results = index.search('hamb bac')
+
+        assert ids(results) == ['1']
+
+    def test_search_ranks_name_above_ingredients(self, index):
+        _, results = index.search('frango')
+
+        assert ids(results) == ['2']
+        _, results = index.search('queijo')
+        # "queijo" aparece nos ingredientes e na descrição do Bacon, só nos ingredientes do Frango
+        assert ids(results) == ['1', '2']
+
+    def test_search_availability_filter(self, index):
+        assert ids(index.search('bacon')[1]) == ['1']
+        assert ids(index.search('bacon', available=False)[1]) == ['4']
+        assert sorted(ids(index.search('bacon', available=None)[1])) == ['1', '4']
+
+    def test_search_category_and_price_filters(self, index):
+        assert ids(index.search(category='hamburgueres', max_price=20)[1]) == ['2']
+        assert ids(index.search(min_price=20, available=None)[1]) == ['1', '4']
+
+    def test_search_without_terms_orders_by_category_and_name(self, index):
+        total, results = index.search()
+
+        assert total == 3
+        assert ids(results) == ['1', '2', '3']
+
+    def test_search_no_match(self, index):
+        assert index.search('pizza') == (0, [])
+        assert index.search('bacon pizza') == (0, [])
+
+    def test_search_limit(self, index):
+        total, results = index.search('hamburguer', limit=1)
+
+        assert total == 2
+        assert len(results) == 1
+
+    def test_index_rebuilt_when_catalog_reloads(self):
+        first, second = {}, {}
+        with patch.object(search_service, '_index', (None, None)), \
+             patch('services.search_service.products_col') as mock_products_col, \
+             patch('services.search_service.get_catalog_snapshot', side_effect=[first, first, second]):
+            mock_products_col.find.return_value = [{'_id': ObjectId(), 'name': 'Burger', 'available': True}]
+
+            index = get_search_index()
+            assert get_search_index() is index
+            assert get_search_index() is not index
+
+            assert mock_products_col.find.call_count == 2
+
+    def test_search_products_params(self, index):
+        with patch('services.search_service.get_search_index', return_value=index):
+            response, status = search_products('bacon', available='all', max_price='24,00', limit='500')
+
+        assert status == 200
+        assert response['total'] == 1
+        assert response['results'][0]['id'] == '1'
+        assert response['results'][0]['score'] > 0
+
+    def test_search_products_invalid_price(self):
+        response, status = search_products('bacon', min_price='barato')
+
+        assert status == 400
+        assert 'error' in response
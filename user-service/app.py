@@ -1,18 +1,56 @@
-from flask import Flask
-from controllers.user_controller import user_bp
 from dotenv import load_dotenv
-import os
 
+# Carrega as variáveis de ambiente do arquivo .env antes dos demais imports:
+# vários módulos leem a configuração (os.getenv) ao serem importados
 load_dotenv()
 
-app = Flask(__name__)
-app.secret_key = os.getenv("SECRET_KEY")
+from flask import Flask, jsonify
+from controllers.user_controller import user_bp
+from services.user_service import backfill_email_lower
+from config.database import init_indexes, get_pool_stats
+from config.compression import init_compression
+from config.json_provider import init_json
+from config.auth import init_auth
+import os
+
+def create_app():
+    """Cria e configura a aplicação Flask do user-service"""
+    app = Flask(__name__)
+    app.secret_key = os.getenv("SECRET_KEY")
+
+    app.register_blueprint(user_bp, url_prefix='/user')
+
+    # Tokens Bearer inválidos são recusados antes das rotas (verificação local, com cache)
+    init_auth(app)
+
+    # jsonify/get_json com orjson (datetime e ObjectId codificados nativamente)
+    init_json(app)
+
+    # Compressão gzip/brotli das respostas e cache de longa duração dos arquivos estáticos
+    init_compression(app)
+
+    # Garante os índices do MongoDB usados pelas consultas do serviço (idempotente)
+    init_indexes()
+
+    # Usuários cadastrados antes do email_lower ficariam fora da busca por prefixo
+    updated = backfill_email_lower()
+    if updated:
+        print(f"✅ email_lower preenchido em {updated} usuário(s)")
+
+    # Estatísticas do pool de conexões do MongoDB do processo que atendeu a requisição
+    @app.route('/health/db')
+    def db_health():
+        return jsonify(get_pool_stats())
+
+    @app.route('/')
+    def index():
+        return '<a href="/user/create">Cadastrar novo usuário</a>'
 
-app.register_blueprint(user_bp, url_prefix='/user')
+    return app
 
-@app.route('/')
-def index():
-    return '<a href="/user/create">Cadastrar novo usuário</a>'
+# Instância usada pelo gunicorn (app:app) e pelo servidor de desenvolvimento
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(host="0.0.0.0", port=5001, debug=True)
+    # Servidor de desenvolvimento do Flask; em produção use: gunicorn -c gunicorn.conf.py app:app
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5001")), debug=os.getenv("FLASK_DEBUG", "1") == "1")
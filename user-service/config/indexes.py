@@ -0,0 +1,111 @@
+# Gerenciador de índices das coleções compartilhadas do burguer_app_db
+#
+# Cada serviço garante (de forma idempotente) os índices das coleções que consulta
+# ao subir, e o relatório pode ser executado manualmente:
+#
+#     python -m config.indexes            # relatório de índices ausentes/não utilizados
+#     python -m config.indexes --ensure   # cria os índices ausentes
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+import sys
+
+# Especificação dos índices esperados por coleção: nome -> (chaves, opções)
+INDEX_SPECS = {
+    "users": {
+        "email_unique": ([("email", ASCENDING)], {"unique": True}),
+        # Autocompletar de clientes sem diferenciar maiúsculas (search_users do order-service)
+        "email_lower": ([("email_lower", ASCENDING)], {}),
+    },
+    "orders": {
+        "user_email_created_at": ([("user_email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "status_created_at": ([("status", ASCENDING), ("created_at", DESCENDING)], {}),
+        "created_at_id": ([("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+    },
+    "orders_archive": {
+        "user_email_created_at": ([("user_email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+    },
+    "order_stats": {
+        "kind_key": ([("kind", ASCENDING), ("key", ASCENDING)], {}),
+    },
+    "order_idempotency": {
+        # Chaves de idempotência expiram 24h depois de criadas
+        "created_at_ttl": ([("created_at", ASCENDING)], {"expireAfterSeconds": 86400}),
+    },
+    "products": {
+        "available_category_name": ([("available", ASCENDING), ("category", ASCENDING), ("name", ASCENDING)], {}),
+        "category_name": ([("category", ASCENDING), ("name", ASCENDING)], {}),
+        # SKU estável usado pela importação em lote; produtos antigos sem SKU ficam fora do índice
+        "sku_unique": ([("sku", ASCENDING)], {"unique": True, "partialFilterExpression": {"sku": {"$type": "string"}}}),
+    },
+}
+
+# Coleções já verificadas neste processo (torna ensure_indexes idempotente e barato)
+_ensured = set()
+
+def ensure_indexes(db, collections=None):
+    """Cria os índices ausentes das coleções informadas; retorna os nomes criados"""
+    created = []
+    for col_name in collections or INDEX_SPECS:
+        if col_name in _ensured:
+            continue
+        col = db[col_name]
+        for name, (keys, options) in INDEX_SPECS.get(col_name, {}).items():
+            try:
+                col.create_index(keys, name=name, **options)
+                created.append(f"{col_name}.{name}")
+            except OperationFailure as e:
+                # Ex.: e-mails duplicados impedem o índice único, ou índice com mesmo nome e opções diferentes
+                print(f"⚠️ Não foi possível criar o índice {col_name}.{name}: {e}")
+            except PyMongoError as e:
+                print(f"⚠️ Erro ao criar índices de {col_name}: {e}")
+                return created
+        _ensured.add(col_name)
+    return created
+
+def index_report(db, collections=None):
+    """Compara os índices existentes com a especificação e coleta estatísticas de uso"""
+    report = {}
+    for col_name in collections or INDEX_SPECS:
+        col = db[col_name]
+        existing = {name: tuple(info["key"]) for name, info in col.index_information().items()}
+        expected = INDEX_SPECS.get(col_name, {})
+        expected_keys = {tuple(keys) for keys, _ in expected.values()}
+
+        missing = [name for name, (keys, _) in expected.items() if tuple(keys) not in existing.values()]
+        unexpected = sorted(name for name, keys in existing.items() if name != "_id_" and keys not in expected_keys)
+
+        # $indexStats informa quantas operações usaram cada índice desde o último restart do mongod
+        try:
+            usage = {stat["name"]: stat["accesses"]["ops"] for stat in col.aggregate([{"$indexStats": {}}])}
+        except OperationFailure:
+            usage = {}
+        unused = sorted(name for name, ops in usage.items() if ops == 0 and name != "_id_")
+
+        report[col_name] = {"missing": missing, "unused": unused, "unexpected": unexpected, "usage": usage}
+    return report
+
+def main(argv=None):
+    """Ponto de entrada do comando de verificação de índices"""
+    from config.database import get_db
+
+    argv = sys.argv[1:] if argv is None else argv
+    db = get_db()
+    if "--ensure" in argv:
+        for name in ensure_indexes(db):
+            print(f"✅ Índice garantido: {name}")
+
+    problems = 0
+    for col_name, info in index_report(db).items():
+        print(f"📚 {col_name}")
+        for name in info["missing"]:
+            print(f"   ❌ ausente: {name}")
+        for name in info["unused"]:
+            print(f"   💤 sem uso: {name} (0 operações desde o restart)")
+        for name in info["unexpected"]:
+            print(f"   ❔ fora da especificação: {name}")
+        problems += len(info["missing"])
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# Política de hash de senhas
+#
+# O algoritmo e o custo vêm do ambiente (PASSWORD_HASH_ALGORITHM = scrypt | pbkdf2 |
+# argon2, mais os parâmetros de cada um), então cada implantação ajusta o custo ao seu
+# hardware. Hashes gravados com outra política continuam válidos e são refeitos no
+# próximo login (needs_rehash). argon2 requer o pacote argon2-cffi; sem ele o scrypt
+# é usado.
+#
+# O KDF roda em um pool limitado de threads (PASSWORD_WORKERS): uma rajada de logins
+# ocupa no máximo esse número de núcleos e, com a fila cheia (PASSWORD_QUEUE_SIZE),
+# falha rápido com PasswordBusyError em vez de segurar as threads do servidor.
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+import os
+import threading
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:
+    # Opcional: sem argon2-cffi só scrypt e pbkdf2 estão disponíveis
+    PasswordHasher = None
+
+PASSWORD_HASH_ALGORITHM = os.getenv("PASSWORD_HASH_ALGORITHM", "scrypt")
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", "32768"))
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "600000"))
+ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "1"))
+
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+# Tarefas aguardando ou rodando no pool; acima disso a requisição recebe PasswordBusyError
+PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", "16"))
+PASSWORD_TIMEOUT = float(os.getenv("PASSWORD_TIMEOUT", "10"))
+
+class PasswordBusyError(Exception):
+    """Pool de hash de senhas saturado: a requisição deve ser repetida depois"""
+
+def _argon2_hasher():
+    return PasswordHasher(time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST,
+                          parallelism=ARGON2_PARALLELISM)
+
+def current_method():
+    """Identificador da política atual ("argon2" ou o método do werkzeug, ex.: "scrypt:32768:8:1")"""
+    if PASSWORD_HASH_ALGORITHM == "argon2" and PasswordHasher is not None:
+        return "argon2"
+    if PASSWORD_HASH_ALGORITHM == "pbkdf2":
+        return f"pbkdf2:sha256:{PBKDF2_ITERATIONS}"
+    return f"scrypt:{SCRYPT_N}:{SCRYPT_R}:{SCRYPT_P}"
+
+def hash_password(password):
+    """Hash da senha com a política atual"""
+    method = current_method()
+    if method == "argon2":
+        return _argon2_hasher().hash(password)
+    return generate_password_hash(password, method=method)
+
+def verify_password(stored_hash, password):
+    """True se a senha confere com o hash gravado (de qualquer política suportada)"""
+    if not stored_hash or not password:
+        return False
+    if stored_hash.startswith("$argon2"):
+        if PasswordHasher is None:
+            return False
+        try:
+            return _argon2_hasher().verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    try:
+        return check_password_hash(stored_hash, password)
+    except ValueError:
+        # Método desconhecido ou hash corrompido
+        return False
+
+def needs_rehash(stored_hash):
+    """True se o hash foi gerado com outro algoritmo ou custo que o da política atual"""
+    method = current_method()
+    if stored_hash.startswith("$argon2"):
+        return method != "argon2" or _argon2_hasher().check_needs_rehash(stored_hash)
+    return stored_hash.split("$", 1)[0] != method
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="password")
+_slots = threading.BoundedSemaphore(PASSWORD_QUEUE_SIZE)
+
+def _run(slots, fn, args):
+    try:
+        return fn(*args)
+    finally:
+        # Libera a vaga antes de o resultado ficar disponível para quem espera
+        slots.release()
+
+def submit(fn, *args):
+    """Agenda fn no pool de senhas; levanta PasswordBusyError se a fila estiver cheia"""
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        raise PasswordBusyError("Muitas operações de senha simultâneas")
+    try:
+        return _executor.submit(_run, slots, fn, args)
+    except Exception:
+        slots.release()
+        raise
+
+def run_bounded(fn, *args):
+    """Executa fn no pool de senhas e espera o resultado (até PASSWORD_TIMEOUT segundos)"""
+    try:
+        return submit(fn, *args).result(timeout=PASSWORD_TIMEOUT)
+    except FutureTimeoutError:
+        raise PasswordBusyError("Tempo esgotado aguardando o hash da senha")
+
+def verify_password_bounded(stored_hash, password):
+    """verify_password executado no pool limitado"""
+    return run_bounded(verify_password, stored_hash, password)
+
+def hash_password_bounded(password):
+    """hash_password executado no pool limitado"""
+    return run_bounded(hash_password, password)
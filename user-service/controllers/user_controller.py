@@ -1,5 +1,6 @@
-from flask import Blueprint, request, render_template, redirect, url_for, flash
+from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify
 from services.user_service import create_user, get_user_by_email, update_user, delete_user
+from config.auth import require_auth, current_claims
 
 user_bp = Blueprint("user", __name__)
 
@@ -45,3 +46,13 @@ def delete(email):
     delete_user(email)
     flash("Usuário excluído com sucesso.")
     return redirect(url_for("user.create"))
+
+@user_bp.route("/api/me")
+@require_auth()
+def api_me():
+    """Perfil do usuário do token (Authorization: Bearer), sem consultar o auth-service"""
+    user = get_user_by_email(current_claims().get("email"))
+    if not user:
+        return jsonify({"error": "Usuário não encontrado"}), 404
+    return jsonify(user)
+
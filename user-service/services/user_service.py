@@ -1,5 +1,6 @@
 from config.database import get_db
-from werkzeug.security import generate_password_hash
+from pymongo.errors import PyMongoError
+from config.passwords import hash_password_bounded, PasswordBusyError
 from models.user_model import serialize_user
 
 db = get_db()
@@ -10,9 +11,15 @@ def create_user(email, password, name, address, role="cliente"):
     if users_col.find_one({"email": email}):
         return {"error": "Usuário já existe"}, 400
 
-    hashed_pw = generate_password_hash(password)
+    # Hash com a política configurada (config/passwords.py), no pool limitado
+    try:
+        hashed_pw = hash_password_bounded(password)
+    except PasswordBusyError:
+        return {"error": "Muitos cadastros no momento. Tente novamente em instantes."}, 503
     user = {
         "email": email,
+        # Cópia em minúsculas usada na busca por prefixo (o email continua como digitado)
+        "email_lower": email.lower(),
         "password": hashed_pw,
         "name": name,
         "address": address,
@@ -35,3 +42,15 @@ def update_user(email, name, address):
 
 def delete_user(email):
     users_col.delete_one({"email": email})
+
+def backfill_email_lower():
+    """Grava email_lower nos usuários cadastrados antes do campo; retorna quantos foram atualizados"""
+    try:
+        result = users_col.update_many(
+            {"email_lower": {"$exists": False}},
+            [{"$set": {"email_lower": {"$toLower": "$email"}}}]
+        )
+    except PyMongoError as e:
+        print(f"⚠️ Não foi possível preencher email_lower dos usuários: {e}")
+        return 0
+    return result.modified_count
@@ -0,0 +1,129 @@
+import datetime
+import pytest
+import jwt
+from unittest.mock import patch
+from flask import Flask, jsonify
+from config import auth
+from config.auth import AuthError, encode_token, verify_token, require_auth, init_auth, load_keys
+
+KEY_1 = 'chave-de-teste-numero-1-com-32-bytes!'
+KEY_2 = 'chave-de-teste-numero-2-com-32-bytes!'
+
+@pytest.fixture(autouse=True)
+def jwt_keys():
+    with patch.object(auth, 'JWT_KEYS', {'k2': KEY_2, 'k1': KEY_1}), patch.object(auth, 'ACTIVE_KID', 'k2'):
+        auth.clear_token_cache()
+        yield
+    auth.clear_token_cache()
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    init_auth(app)
+
+    @app.route('/public')
+    def public():
+        return 'ok'
+
+    @app.route('/me')
+    @require_auth()
+    def me():
+        return jsonify(auth.current_claims())
+
+    @app.route('/admin')
+    @require_auth('admin')
+    def admin():
+        return 'admin'
+
+    return app
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+class TestAuth:
+
+    def test_load_keys(self):
+        assert load_keys('k2:novo, k1:antigo', '') == {'k2': 'novo', 'k1': 'antigo'}
+        assert load_keys('', 'segredo') == {'default': 'segredo'}
+        assert load_keys('', '') == {}
+
+    def test_encode_uses_active_kid(self):
+        token = encode_token({'email': 'a@b.com', 'role': 'cliente'})
+
+        assert jwt.get_unverified_header(token)['kid'] == 'k2'
+        assert verify_token(token)['email'] == 'a@b.com'
+
+    def test_rotated_key_still_verifies(self):
+        old_token = jwt.encode({'email': 'a@b.com', 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                               KEY_1, algorithm='HS256', headers={'kid': 'k1'})
+
+        assert verify_token(old_token)['email'] == 'a@b.com'
+        with patch.object(auth, 'JWT_KEYS', {'k2': KEY_2}):
+            auth.clear_token_cache()
+            with pytest.raises(AuthError):
+                verify_token(old_token)
+
+    def test_verified_tokens_are_cached(self):
+        token = encode_token({'email': 'a@b.com'})
+
+        with patch('config.auth.jwt.decode', wraps=jwt.decode) as mock_decode:
+            verify_token(token)
+            verify_token(token)
+
+        assert mock_decode.call_count == 1
+
+    def test_cache_respects_expiry(self):
+        token = encode_token({'email': 'a@b.com'}, ttl=60)
+        verify_token(token)
+        exp = auth._cache[token][1]
+
+        # Depois do exp o cache não é mais usado: o token é verificado de novo
+        with patch('config.auth.time.time', return_value=exp + 1), \
+             patch('config.auth.jwt.decode', side_effect=jwt.ExpiredSignatureError):
+            with pytest.raises(AuthError):
+                verify_token(token)
+        assert token not in auth._cache
+
+    def test_cache_is_bounded(self):
+        with patch.object(auth, 'JWT_CACHE_SIZE', 2):
+            tokens = [encode_token({'email': f'{i}@b.com'}) for i in range(3)]
+            for token in tokens:
+                verify_token(token)
+
+        assert list(auth._cache) == tokens[1:]
+
+    @pytest.mark.parametrize('token', ['', 'abc', 'a.b', 'a.b.c', 'x' * 5000])
+    def test_malformed_tokens_rejected(self, token):
+        with pytest.raises(AuthError):
+            verify_token(token)
+
+    def test_rejects_other_algorithms_and_unknown_kid(self):
+        exp = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        unsigned = jwt.encode({'email': 'a@b.com', 'exp': exp}, None, algorithm='none')
+        unknown = jwt.encode({'email': 'a@b.com', 'exp': exp}, KEY_1, algorithm='HS256', headers={'kid': 'k9'})
+        without_exp = jwt.encode({'email': 'a@b.com'}, KEY_2, algorithm='HS256', headers={'kid': 'k2'})
+
+        for token in (unsigned, unknown, without_exp):
+            with pytest.raises(AuthError):
+                verify_token(token)
+
+    def test_require_auth(self, app):
+        client = app.test_client()
+
+        assert client.get('/me').status_code == 401
+        response = client.get('/me', headers=bearer(encode_token({'email': 'a@b.com', 'role': 'cliente'})))
+        assert response.status_code == 200
+        assert response.json['email'] == 'a@b.com'
+
+    def test_require_role(self, app):
+        client = app.test_client()
+
+        assert client.get('/admin', headers=bearer(encode_token({'role': 'cliente'}))).status_code == 403
+        assert client.get('/admin', headers=bearer(encode_token({'role': 'admin'}))).status_code == 200
+
+    def test_invalid_token_rejected_early(self, app):
+        response = app.test_client().get('/public', headers=bearer('a.b.c'))
+
+        assert response.status_code == 401
+        assert 'invalid_token' in response.headers['WWW-Authenticate']
+        assert app.test_client().get('/public').status_code == 200
@@ -2,6 +2,7 @@
 from unittest.mock import patch, MagicMock
 from flask import Flask
 from controllers.user_controller import user_bp
+from config import auth
 
 @pytest.fixture
 def app():
@@ -15,6 +16,15 @@ def app():
 def client(app):
     return app.test_client()
 
+@pytest.fixture(autouse=True)
+def jwt_keys():
+    with patch.object(auth, 'JWT_KEYS', {'k1': 'chave-de-teste-com-pelo-menos-32-bytes'}), patch.object(auth, 'ACTIVE_KID', 'k1'):
+        yield
+    auth.clear_token_cache()
+
+def auth_headers(role='admin', email='admin@email.com'):
+    return {'Authorization': f"Bearer {auth.encode_token({'email': email, 'role': role})}"}
+
 class TestUserController:
 
     @patch('controllers.user_controller.render_template')
@@ -120,3 +130,28 @@ class TestUserController:
 
         mock_delete.assert_called_once_with('teste@email.com')
         mock_redirect.assert_called_once()
+
+    @patch('controllers.user_controller.get_user_by_email')
+    def test_api_me(self, mock_get_user, client):
+        mock_get_user.return_value = {'email': 'teste@email.com', 'name': 'João Silva', 'address': 'Rua A', 'role': 'cliente'}
+
+        response = client.get('/user/api/me', headers=auth_headers('cliente', 'teste@email.com'))
+
+        assert response.status_code == 200
+        assert response.json['name'] == 'João Silva'
+        mock_get_user.assert_called_once_with('teste@email.com')
+
+    @patch('controllers.user_controller.get_user_by_email')
+    def test_api_me_requires_token(self, mock_get_user, client):
+        assert client.get('/user/api/me').status_code == 401
+        assert client.get('/user/api/me', headers={'Authorization': 'Bearer invalido'}).status_code == 401
+        mock_get_user.assert_not_called()
+
+    @patch('controllers.user_controller.get_user_by_email')
+    def test_api_me_user_not_found(self, mock_get_user, client):
+        mock_get_user.return_value = None
+
+        response = client.get('/user/api/me', headers=auth_headers('cliente', 'sumiu@email.com'))
+
+        assert response.status_code == 404
+
@@ -1,6 +1,8 @@
 ﻿import pytest
 from unittest.mock import patch, MagicMock
-from services.user_service import create_user, get_user_by_email, update_user, delete_user
+from services.user_service import create_user, get_user_by_email, update_user, delete_user, backfill_email_lower
+from pymongo.errors import PyMongoError
+from config.passwords import PasswordBusyError, verify_password
 
 @pytest.fixture
 def mock_db():
@@ -14,7 +16,7 @@ class TestUserService:
         mock_db.insert_one.return_value = MagicMock()
 
         response, status = create_user(
-            email="teste@email.com",
+            email="Teste@Email.com",
             password="senha123",
             name="João Silva",
             address="Rua Teste, 123",
@@ -24,6 +26,25 @@ class TestUserService:
         assert status == 201
         assert response["message"] == "Usuário criado com sucesso"
         mock_db.insert_one.assert_called_once()
+        assert mock_db.insert_one.call_args[0][0]["email"] == "Teste@Email.com"
+        assert mock_db.insert_one.call_args[0][0]["email_lower"] == "teste@email.com"
+        stored = mock_db.insert_one.call_args[0][0]["password"]
+        assert stored != "senha123"
+        assert verify_password(stored, "senha123")
+
+    @patch('services.user_service.hash_password_bounded', side_effect=PasswordBusyError)
+    def test_create_user_password_pool_busy(self, mock_hash, mock_db):
+        mock_db.find_one.return_value = None
+
+        response, status = create_user(
+            email="teste@email.com",
+            password="senha123",
+            name="João Silva",
+            address="Rua Teste, 123"
+        )
+
+        assert status == 503
+        mock_db.insert_one.assert_not_called()
 
     def test_create_user_duplicate_email(self, mock_db):
         mock_db.find_one.return_value = {"email": "teste@email.com"}
@@ -65,3 +86,16 @@ class TestUserService:
         mock_db.delete_one.return_value = MagicMock()
         delete_user("teste@email.com")
         mock_db.delete_one.assert_called_once()
+
+    def test_backfill_email_lower(self, mock_db):
+        mock_db.update_many.return_value = MagicMock(modified_count=3)
+
+        assert backfill_email_lower() == 3
+        query, pipeline = mock_db.update_many.call_args.args
+        assert query == {"email_lower": {"$exists": False}}
+        assert pipeline == [{"$set": {"email_lower": {"$toLower": "$email"}}}]
+
+    def test_backfill_email_lower_database_error(self, mock_db):
+        mock_db.update_many.side_effect = PyMongoError("sem conexão")
+
+        assert backfill_email_lower() == 0